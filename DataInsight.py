@@ -7,9 +7,12 @@ Save as DataInsight_Milo.py and run:
 python DataInsight_Milo.py
 """
 
+import gc
 import os
-import tempfile
+import queue
 import threading
+import time
+from functools import partial, wraps
 from tkinter import filedialog, ttk, messagebox
 import tkinter as tk
 import customtkinter as ctk
@@ -17,7 +20,13 @@ import pandas as pd
 import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-from fpdf import FPDF
+from milo_engine import (
+    COMBINE_MODES, CORR_METHODS, CORR_PREVIEW_ROWS, EXCEL_EXTS, FOLLOW_INTERVAL_MS, GROUP_AGGS, HIST_MAX_BINS,
+    LOD_MIN_POINTS, AppendBuffer, CleaningHistory, CleaningPlan, DatasetProfile, ExportCancelled, FileTail, FileTruncated,
+    FrameCache, LineLOD, LiveProfile, LoadCancelled, PerfLog, ScatterRaster, SearchIndex, Workspace, build_pdf_report,
+    combine_frames, draw_heatmap, excel_sheets, export_frame, format_bytes, frame_stats, heatmap_view, parse_cell_range,
+    profile_file, read_data_cached,
+)
 
 # ---------- Appearance ----------
 # set a modern dark theme by default; user may change via the Appearance menu
@@ -26,25 +35,229 @@ ctk.set_default_color_theme("dark-blue")  # built-in: "blue", "green", "dark-blu
 
 APP_TITLE = "📊 Milo – Data Insight Pro"
 
-# ---------- Helper functions ----------
-def try_read_data(path):
-    """Try common separators and formats to read a file robustly."""
-    ext = os.path.splitext(path)[1].lower()
-    if ext in (".xlsx", ".xls"):
-        return pd.read_excel(path)
-    if ext == ".json":
-        return pd.read_json(path)
-    # For text-based files, try multiple separators
-    for sep in [",", ";", "\t", "|"]:
-        try:
-            df = pd.read_csv(path, sep=sep, engine="python")
-            # simple heuristic: must have more than 1 column
-            if df.shape[1] > 1:
-                return df
-        except Exception:
-            continue
-    # fallback to plain read_csv (may raise)
-    return pd.read_csv(path)
+# ---------- Settings ----------
+SEARCH_DEBOUNCE_MS = 250          # wait for typing to pause before filtering
+PERF_VIEW_ROWS = 200              # newest operations listed in the Performance tab
+UI_POLL_MS = 50                   # how often results queued by worker threads are picked up
+
+
+def instrumented(op):
+    """Time a ``DataInsightPro`` method in ``self.perf`` and note the frame shape it left behind."""
+    def decorate(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.perf.measure(op) as rec:
+                result = method(self, *args, **kwargs)
+                if self.df is not None:
+                    rec.update(rows=len(self.df), cols=len(self.df.columns))
+            if threading.current_thread() is threading.main_thread():
+                self._refresh_perf_view()
+            return result
+        return wrapper
+    return decorate
+
+
+# ---------- Widgets ----------
+class VirtualTable(ttk.Frame):
+    """Treeview that only holds the rows currently in view.
+
+    The DataFrame is never copied into the widget: a fixed pool of items is refilled from
+    ``df.iloc`` as the user scrolls, so memory and per-scroll cost do not depend on row count.
+    ``positions`` (optional integer array) restricts the view to a subset of rows, e.g. search hits.
+    """
+
+    def __init__(self, master, formatter=str, **kwargs):
+        super().__init__(master, **kwargs)
+        self.formatter = formatter
+        self.df = None
+        self.positions = None
+        self.limit = None
+        self.top = 0
+        self._columns = []
+        self._items = []
+
+        self.tree = ttk.Treeview(self, show="headings", height=20, selectmode="browse")
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.hsb = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.hsb.set)
+        self.info = ttk.Label(self, anchor="e")
+
+        self.info.pack(side="bottom", fill="x")
+        self.vsb.pack(side="right", fill="y")
+        self.hsb.pack(side="bottom", fill="x")
+        self.tree.pack(expand=True, fill="both")
+
+        self.tree.bind("<Configure>", lambda e: self._resize_pool())
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Up>", lambda e: self.scroll(-1))
+        self.tree.bind("<Down>", lambda e: self.scroll(1))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self._page()))
+        self.tree.bind("<Next>", lambda e: self.scroll(self._page()))
+
+    # -- data --
+    def set_data(self, df, positions=None, limit=None):
+        """Show ``df`` (optionally only ``positions``, and at most ``limit`` rows) from the top."""
+        self.df = df
+        self.positions = positions
+        self.limit = limit
+        cols = list(df.columns)
+        if cols != self._columns:
+            self._columns = cols
+            ids = [f"c{i}" for i in range(len(cols))]
+            self.tree.configure(columns=ids)
+            for cid, name in zip(ids, cols):
+                self.tree.heading(cid, text=str(name))
+                self.tree.column(cid, width=120, minwidth=40, anchor="w", stretch=False)
+        self.top = 0
+        self.refresh()
+
+    def total_rows(self):
+        if self.df is None:
+            return 0
+        n = len(self.positions) if self.positions is not None else len(self.df)
+        return min(n, self.limit) if self.limit is not None else n
+
+    # -- scrolling --
+    def _page(self):
+        return max(1, len(self._items) - 1)
+
+    def scroll(self, delta):
+        self._goto(self.top + delta)
+        return "break"
+
+    def _goto(self, top):
+        top = max(0, min(int(top), max(0, self.total_rows() - len(self._items))))
+        if top != self.top:
+            self.top = top
+            self.refresh()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._goto(float(args[1]) * self.total_rows())
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.scroll(step * self._page() if args[2] == "pages" else step)
+
+    def _on_wheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _resize_pool(self):
+        """Keep exactly one tree item per visible line."""
+        row_h = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        header_h = 26
+        wanted = max(1, (self.tree.winfo_height() - header_h) // row_h)
+        if wanted == len(self._items):
+            return
+        while len(self._items) < wanted:
+            self._items.append(self.tree.insert("", "end"))
+        while len(self._items) > wanted:
+            self.tree.delete(self._items.pop())
+        self.tree.configure(height=wanted)
+        self.top = max(0, min(self.top, self.total_rows() - wanted))
+        self.refresh()
+
+    # -- rendering --
+    def refresh(self):
+        total = self.total_rows()
+        n = len(self._items)
+        end = min(total, self.top + n)
+        if self.df is not None and end > self.top:
+            if self.positions is not None:
+                block = self.df.iloc[self.positions[self.top:end]]
+            else:
+                block = self.df.iloc[self.top:end]
+            # format column by column: only the visible cells are ever turned into strings
+            cells = [[self.formatter(v) for v in block.iloc[:, j]] for j in range(block.shape[1])]
+            rows = list(zip(*cells)) if cells else [()] * (end - self.top)
+        else:
+            rows = []
+        for i, iid in enumerate(self._items):
+            self.tree.item(iid, values=rows[i] if i < len(rows) else ())
+        if total:
+            self.vsb.set(self.top / total, end / total)
+            self.info.configure(text=f"Rows {self.top + 1:,}–{end:,} of {total:,}")
+        else:
+            self.vsb.set(0, 1)
+            self.info.configure(text="")
+
+
+class PlotCanvas:
+    """One long-lived Figure, Tk canvas and toolbar that every plot in a container draws on.
+
+    ``axes(kind, key)`` returns ``(ax, reused)``: the current axes when the same ``kind`` of
+    plot is redrawn with an equal, non-None ``key`` (update the artists in ``artists`` in place
+    with ``set_data`` / ``set_array``), else one fresh subplot on the cleared figure. Artists
+    registered with ``animate`` are excluded from the cached background so ``blit()`` can
+    repaint just them; anything that changes limits, ticks or labels must go through ``draw()``.
+    """
+
+    def __init__(self, master, figsize=(8,5), toolbar=True):
+        self.figure = Figure(figsize=figsize, dpi=100)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.widget = self.canvas.get_tk_widget()
+        self.toolbar = NavigationToolbar2Tk(self.canvas, master, pack_toolbar=False) if toolbar else None
+        self.kind = None
+        self.key = None
+        self.ax = None
+        self.artists = {}
+        self._animated = []
+        self._background = None
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def show(self):
+        if self.widget.winfo_manager():
+            return
+        if self.toolbar is not None:
+            self.toolbar.pack(side="bottom", fill="x")
+        self.widget.pack(expand=True, fill="both")
+
+    def hide(self):
+        self.widget.pack_forget()
+        if self.toolbar is not None:
+            self.toolbar.pack_forget()
+
+    def axes(self, kind, key=None):
+        if self.ax is not None and kind == self.kind and key is not None and key == self.key:
+            return self.ax, True
+        self.clear()
+        self.ax = self.figure.add_subplot(111)
+        self.kind, self.key = kind, key
+        return self.ax, False
+
+    def clear(self):
+        """Drop the current plot (axes, colorbars, artists and the zoom history)."""
+        self.figure.clear()
+        self.ax = self.kind = self.key = None
+        self.artists = {}
+        self._animated = []
+        self._background = None
+        if self.toolbar is not None:
+            self.toolbar.update()
+
+    def animate(self, *artists):
+        for artist in artists:
+            artist.set_animated(True)
+        self._animated.extend(artists)
+
+    def draw(self):
+        self.canvas.draw_idle()
+
+    def blit(self):
+        """Repaint only the animated artists over the background captured at the last full draw."""
+        if self._background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._background)
+        for artist in self._animated:
+            self.figure.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox) if self._animated else None
+        for artist in self._animated:
+            self.figure.draw_artist(artist)
 
 
 # ---------- App ----------
@@ -66,6 +279,43 @@ class DataInsightPro(ctk.CTk):
         # Data
         self.df = None
         self.current_file = None
+        self.df_version = 0           # bumped by _set_df; caches are keyed on it
+        self._search_index = None
+        self._search_job = None
+        self._preview_head_only = True
+        self._profile = None
+        self._dashboard_version = None
+        self._plot_lod = None             # keeps zoom callbacks of the current plot alive
+        self._plot_job = 0                # bumped per plot request; stale background results are dropped
+
+        # Cleaning results, for undo / redo / revert
+        self.history = CleaningHistory()
+
+        # Parsed frames are cached on disk so unchanged files reopen without re-parsing
+        self.frame_cache = FrameCache()
+
+        # Other worker threads hand their results to the Tk thread here (see _post_ui)
+        self._ui_queue = queue.Queue()
+
+        # Background loading (worker thread -> queue -> drained with after())
+        self._load_queue = queue.Queue()
+        self._load_cancel = None
+        self._load_thread = None
+        self._load_started_size = None
+        self._loaded_size = None          # bytes of the file that are in the current frame
+        self._excel_choice = {}           # path -> {"sheet": ..., "cell_range": ...} picked for a workbook
+
+        # Follow mode: (FileTail, StreamingStats) while a growing file is being tailed
+        self._follow = None
+        self._follow_job = None
+        self._follow_after_load = False   # start following once the pending reload finishes
+
+        # Per-operation timings shown in the Performance tab
+        self.perf = PerfLog()
+
+        # Open datasets (LRU-spilled under one memory budget); self.df is the active one's frame
+        self.workspace = Workspace()
+        self._active = None
 
         # Layout frames
         self.sidebar = ctk.CTkFrame(self, width=300, corner_radius=0)
@@ -77,6 +327,7 @@ class DataInsightPro(ctk.CTk):
         # build UI
         self._build_sidebar()
         self._build_main()
+        self.after(UI_POLL_MS, self._drain_ui_queue)
 
     # ---------- appearance handler ----------
     def change_appearance(self, new_mode):
@@ -97,6 +348,22 @@ class DataInsightPro(ctk.CTk):
         ctk.CTkButton(self.sidebar, text="📂  Load Data", command=self.load_file).pack(padx=20, pady=8, fill="x")
         ctk.CTkButton(self.sidebar, text="🔁  Reload Last", command=self.reload_last).pack(padx=20, pady=6, fill="x")
         ctk.CTkButton(self.sidebar, text="🔍  Preview / Refresh", command=self.preview_data).pack(padx=20, pady=6, fill="x")
+        self.optimize_var = ctk.BooleanVar(value=False)
+        ctk.CTkSwitch(self.sidebar, text="Optimize memory on load", variable=self.optimize_var).pack(anchor="w", padx=20, pady=6)
+        self.follow_var = ctk.BooleanVar(value=False)
+        ctk.CTkSwitch(self.sidebar, text="Follow file (live tail)", variable=self.follow_var,
+                      command=self.toggle_follow).pack(anchor="w", padx=20, pady=6)
+
+        # Workspace
+        ctk.CTkLabel(self.sidebar, text="🗂  Open Datasets").pack(anchor="w", padx=20, pady=(8,0))
+        self.dataset_menu = ctk.CTkOptionMenu(self.sidebar, values=["(none)"], command=self.switch_dataset)
+        self.dataset_menu.pack(padx=20, pady=6, fill="x")
+        dataset_row = ctk.CTkFrame(self.sidebar, fg_color="transparent")
+        dataset_row.pack(padx=20, pady=(0,4), fill="x")
+        ctk.CTkButton(dataset_row, text="🔗 Combine", width=100, command=self.combine_datasets).pack(side="left", expand=True, fill="x", padx=(0,4))
+        ctk.CTkButton(dataset_row, text="✖ Close", width=100, command=self.close_dataset).pack(side="left", expand=True, fill="x", padx=(4,0))
+        self.workspace_label = ctk.CTkLabel(self.sidebar, text="", anchor="w", justify="left")
+        self.workspace_label.pack(padx=20, fill="x")
 
         # separator
         ctk.CTkFrame(self.sidebar, height=1, corner_radius=1, fg_color="#2b2b2b").pack(fill="x", padx=16, pady=(12,12))
@@ -104,6 +371,14 @@ class DataInsightPro(ctk.CTk):
         # Cleaning
         ctk.CTkLabel(self.sidebar, text="🧹  Data Cleaning").pack(anchor="w", padx=20)
         ctk.CTkButton(self.sidebar, text="✨  Clean Data Options", command=self.clean_data).pack(padx=20, pady=6, fill="x")
+        history_row = ctk.CTkFrame(self.sidebar, fg_color="transparent")
+        history_row.pack(padx=20, pady=6, fill="x")
+        self.undo_btn = ctk.CTkButton(history_row, text="↩ Undo", width=70, command=self.undo_clean, state="disabled")
+        self.undo_btn.pack(side="left", expand=True, fill="x", padx=(0,4))
+        self.redo_btn = ctk.CTkButton(history_row, text="↪ Redo", width=70, command=self.redo_clean, state="disabled")
+        self.redo_btn.pack(side="left", expand=True, fill="x", padx=4)
+        self.revert_btn = ctk.CTkButton(history_row, text="⏮ Revert", width=70, command=self.revert_clean, state="disabled")
+        self.revert_btn.pack(side="left", expand=True, fill="x", padx=(4,0))
 
         ctk.CTkFrame(self.sidebar, height=1, corner_radius=1, fg_color="#2b2b2b").pack(fill="x", padx=16, pady=(12,12))
 
@@ -111,6 +386,7 @@ class DataInsightPro(ctk.CTk):
         ctk.CTkLabel(self.sidebar, text="📈  Exploratory Analysis").pack(anchor="w", padx=20)
         ctk.CTkButton(self.sidebar, text="🧾  Dashboard / Summary", command=self.show_dashboard).pack(padx=20, pady=6, fill="x")
         ctk.CTkButton(self.sidebar, text="🧭  Correlation Heatmap", command=self.show_correlation).pack(padx=20, pady=6, fill="x")
+        ctk.CTkButton(self.sidebar, text="🌊  Profile Large File", command=self.profile_large_file).pack(padx=20, pady=6, fill="x")
 
         ctk.CTkLabel(self.sidebar, text="📊  Visualizations").pack(anchor="w", padx=20, pady=(8,0))
         ctk.CTkButton(self.sidebar, text="🔢  Plot: Column vs Column", command=self.plot_two_columns).pack(padx=20, pady=6, fill="x")
@@ -120,7 +396,7 @@ class DataInsightPro(ctk.CTk):
 
         # Export
         ctk.CTkLabel(self.sidebar, text="📦  Export").pack(anchor="w", padx=20)
-        ctk.CTkButton(self.sidebar, text="💾  Export Cleaned CSV", command=self.export_csv).pack(padx=20, pady=6, fill="x")
+        ctk.CTkButton(self.sidebar, text="💾  Export Data (CSV / Parquet / Arrow)", command=self.export_data).pack(padx=20, pady=6, fill="x")
         ctk.CTkButton(self.sidebar, text="📄  Export PDF Report", command=self.export_pdf_report).pack(padx=20, pady=6, fill="x")
 
         ctk.CTkLabel(self.sidebar, text="🎨  Appearance").pack(anchor="w", padx=20, pady=(12,0))
@@ -129,16 +405,21 @@ class DataInsightPro(ctk.CTk):
         self.appearance_option.pack(padx=20, pady=6, fill="x")
 
         ctk.CTkLabel(self.sidebar, text="Status:").pack(anchor="w", padx=20, pady=(12,2))
-        self.status_label = ctk.CTkLabel(self.sidebar, text="No file loaded", anchor="w")
-        self.status_label.pack(padx=20, pady=(0,10), fill="x")
+        self.status_label = ctk.CTkLabel(self.sidebar, text="No file loaded", anchor="w", justify="left")
+        self.status_label.pack(padx=20, pady=(0,4), fill="x")
+        self.load_progress = ctk.CTkProgressBar(self.sidebar)
+        self.load_progress.set(0)
+        self.cancel_load_btn = ctk.CTkButton(self.sidebar, text="✖  Cancel Load", command=self.cancel_load,
+                                             fg_color="#8b1e1e", hover_color="#a52a2a")
 
     # ---------- main (tabs) ----------
     def _build_main(self):
-        self.tabview = ctk.CTkTabview(self.main)
+        self.tabview = ctk.CTkTabview(self.main, command=self._refresh_perf_view)
         self.tabview.pack(expand=True, fill="both", padx=12, pady=12)
         self.tabview.add("Preview")
         self.tabview.add("Dashboard")
         self.tabview.add("Plot")
+        self.tabview.add("Performance")
 
         # Preview tab
         self.preview_frame = self.tabview.tab("Preview")
@@ -152,6 +433,10 @@ class DataInsightPro(ctk.CTk):
         self.plot_frame = self.tabview.tab("Plot")
         self._build_plot_area()
 
+        # Performance tab
+        self.perf_frame = self.tabview.tab("Performance")
+        self._build_performance()
+
     # ---------- Preview ----------
     def _build_preview(self):
         top = ctk.CTkFrame(self.preview_frame)
@@ -161,69 +446,68 @@ class DataInsightPro(ctk.CTk):
         self.search_var = ctk.StringVar()
         search_entry = ctk.CTkEntry(top, textvariable=self.search_var, placeholder_text="type to filter rows (substring across all columns)")
         search_entry.pack(side="left", padx=(0,8), fill="x", expand=True)
-        search_entry.bind("<KeyRelease>", lambda e: self.preview_data())
+        search_entry.bind("<KeyRelease>", lambda e: self._schedule_search())
 
         btn_frame = ctk.CTkFrame(top, fg_color="transparent")
         btn_frame.pack(side="right")
         ctk.CTkButton(btn_frame, text="Show Head", width=90, command=lambda: self.preview_data(head_only=True)).pack(side="left", padx=6)
-        ctk.CTkButton(btn_frame, text="Show All (200 rows)", width=130, command=lambda: self.preview_data(head_only=False)).pack(side="left", padx=6)
+        ctk.CTkButton(btn_frame, text="Show All Rows", width=130, command=lambda: self.preview_data(head_only=False)).pack(side="left", padx=6)
 
         self.table_container = ctk.CTkFrame(self.preview_frame)
         self.table_container.pack(expand=True, fill="both", padx=10, pady=(6,10))
 
         self.empty_label = ctk.CTkLabel(self.table_container, text="Load a dataset to preview", anchor="center")
         self.empty_label.pack(expand=True)
+        # created once and refilled on every refresh
+        self.table = VirtualTable(self.table_container, formatter=self._format_value)
 
-    def preview_data(self, head_only=True):
-        for w in self.table_container.winfo_children():
-            w.destroy()
+    def _show_preview_message(self, text):
+        self.table.pack_forget()
+        self.empty_label.configure(text=text)
+        self.empty_label.pack(expand=True)
+
+    def _schedule_search(self):
+        """Debounce the search box: only the last keystroke in a burst triggers a query."""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DEBOUNCE_MS, self._run_search)
 
+    def _run_search(self):
+        self._search_job = None
+        self.preview_data(head_only=self._preview_head_only)
+
+    @instrumented("preview")
+    def preview_data(self, head_only=True):
+        self._preview_head_only = head_only
+        if self.df is None and self._profile is not None:
+            self._show_preview_message("Profiled out-of-core: rows are not kept in memory.\nSee the Dashboard tab.")
+            return
         if self.df is None or self.df.empty:
-            self.empty_label = ctk.CTkLabel(self.table_container, text="Load a dataset to preview", anchor="center")
-            self.empty_label.pack(expand=True)
+            self._show_preview_message("Load a dataset to preview")
+            return
+        if not len(self.df.columns):
+            self._show_preview_message("No columns to display")
             return
 
-        df = self.df.copy()
+        df = self.df
+        positions = None
         q = self.search_var.get().strip().lower()
         if q:
             try:
-                mask = df.apply(lambda row: row.astype(str).str.lower().str.contains(q).any(), axis=1)
-                df = df[mask]
+                if self._search_index is None:
+                    self._search_index = SearchIndex(df)
+                positions = self._search_index.search(q)
             except Exception:
                 pass
 
-        display_rows = 200 if not head_only else min(50, len(df))
-        if display_rows == 0:
-            self.empty_label = ctk.CTkLabel(self.table_container, text="No rows to display after filtering", anchor="center")
-            self.empty_label.pack(expand=True)
-            return
-        display_df = df.head(display_rows)
-
-        container = ttk.Frame(self.table_container)
-        container.pack(expand=True, fill="both")
-
-        cols = list(display_df.columns)
-        if not cols:
-            self.empty_label = ctk.CTkLabel(self.table_container, text="No columns to display", anchor="center")
-            self.empty_label.pack(expand=True)
+        total = len(positions) if positions is not None else len(df)
+        if total == 0:
+            self._show_preview_message("No rows to display after filtering")
             return
 
-        tree = ttk.Treeview(container, columns=cols, show="headings", height=20)
-        vsb = ttk.Scrollbar(container, orient="vertical", command=tree.yview)
-        hsb = ttk.Scrollbar(container, orient="horizontal", command=tree.xview)
-        tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-
-        vsb.pack(side="right", fill="y")
-        hsb.pack(side="bottom", fill="x")
-        tree.pack(expand=True, fill="both")
-
-        for c in cols:
-            tree.heading(c, text=c)
-            tree.column(c, width=120, anchor="w")
-
-        for _, row in display_df.iterrows():
-            vals = [self._format_value(row[c]) for c in cols]
-            tree.insert("", "end", values=vals)
+        self.empty_label.pack_forget()
+        self.table.pack(expand=True, fill="both")
+        self.table.set_data(df, positions, limit=50 if head_only else None)
 
     # ---------- Dashboard ----------
     def _build_dashboard(self):
@@ -241,21 +525,27 @@ class DataInsightPro(ctk.CTk):
 
         self.dashboard_plot_container = ctk.CTkFrame(self.dashboard_frame)
         self.dashboard_plot_container.pack(expand=True, fill="both", padx=10, pady=(0,10))
+        self.dashboard_canvas = PlotCanvas(self.dashboard_plot_container, figsize=(6,3), toolbar=False)
+        self.dashboard_empty = ctk.CTkLabel(self.dashboard_plot_container,
+                                            text="Not enough numeric columns for correlation preview")
 
+    @instrumented("dashboard")
     def show_dashboard(self):
-        if self.df is None or self.df.empty:
+        if self._no_data():
             messagebox.showwarning("No data", "Please load a file first.")
             return
 
-        rows, cols = self.df.shape
-        missing_pct = round(self.df.isna().sum().sum() / (rows * cols) * 100, 2) if rows * cols > 0 else 0
-        numeric_count = len(self.df.select_dtypes(include=[np.number]).columns)
+        profile = self._get_profile()
+        if self._dashboard_version == profile.version:
+            # nothing changed since the dashboard was last drawn
+            self.tabview.set("Dashboard")
+            return
 
         card_values = [
-            ("Rows", str(rows)),
-            ("Columns", str(cols)),
-            ("Missing %", f"{missing_pct}%"),
-            ("Numeric cols", str(numeric_count)),
+            ("Rows", str(profile.rows)),
+            ("Columns", str(profile.cols)),
+            ("Missing %", f"{profile.missing_pct}%"),
+            ("Numeric cols", str(len(profile.numeric_columns))),
         ]
         for frame, (title, value) in zip(self.card_frames, card_values):
             for w in frame.winfo_children():
@@ -263,41 +553,22 @@ class DataInsightPro(ctk.CTk):
             ctk.CTkLabel(frame, text=title, font=ctk.CTkFont(size=12)).pack(pady=(14,6))
             ctk.CTkLabel(frame, text=value, font=ctk.CTkFont(size=20, weight="bold")).pack()
 
-        buf = []
-        buf.append("=== Top 10 rows preview ===\n")
-        buf.append(self.df.head(10).to_string())
-        buf.append("\n\n=== Summary statistics (numeric) ===\n")
-        buf.append(self.df.describe().transpose().to_string())
-        buf.append("\n\n=== Top categorical counts ===\n")
-        cats = self.df.select_dtypes(include=["object", "category"]).columns
-        for c in cats[:6]:
-            buf.append(f"\n-- {c} --")
-            buf.append(self.df[c].value_counts().head(3).to_string())
-
         self.summary_text.delete("0.0", "end")
-        self.summary_text.insert("0.0", "\n".join(buf))
-
-        for w in self.dashboard_plot_container.winfo_children():
-            w.destroy()
-
-        num_df = self.df.select_dtypes(include=[np.number])
-        if num_df.shape[1] >= 2:
-            fig = Figure(figsize=(6,3), dpi=100)
-            ax = fig.add_subplot(111)
-            c = num_df.corr()
-            im = ax.matshow(c, fignum=False)
-            ax.set_xticks(range(len(c.columns)))
-            ax.set_xticklabels(c.columns, rotation=45, fontsize=8)
-            ax.set_yticks(range(len(c.columns)))
-            ax.set_yticklabels(c.columns, fontsize=8)
-            ax.set_title("Correlation (preview)")
-            fig.colorbar(im, ax=ax)
-            canvas = FigureCanvasTkAgg(fig, master=self.dashboard_plot_container)
-            canvas.draw()
-            canvas.get_tk_widget().pack(expand=True, fill="both")
+        self.summary_text.insert("0.0", profile.summary_text)
+
+        # a sampled matrix is plenty for the thumbnail; the exact one is reused if already known
+        result = profile.correlation(sample_rows=CORR_PREVIEW_ROWS)
+        if result is not None:
+            c, note = heatmap_view(result.matrix)
+            self.dashboard_empty.pack_forget()
+            self._show_heatmap(self.dashboard_canvas, c, "Correlation (preview)", note or result.describe())
+            self.dashboard_canvas.show()
         else:
-            ctk.CTkLabel(self.dashboard_plot_container, text="Not enough numeric columns for correlation preview").pack(expand=True)
+            self.dashboard_canvas.hide()
+            self.dashboard_canvas.clear()
+            self.dashboard_empty.pack(expand=True)
 
+        self._dashboard_version = profile.version
         self.tabview.set("Dashboard")
 
     # ---------- Cleaning ----------
@@ -308,51 +579,100 @@ class DataInsightPro(ctk.CTk):
 
         dialog = ctk.CTkToplevel(self)
         dialog.title("Clean Data")
-        dialog.geometry("420x260")
+        dialog.geometry("420x440")
 
         ctk.CTkLabel(dialog, text="Cleaning Options", font=ctk.CTkFont(size=15, weight="bold")).pack(pady=12)
 
-        dropna = ctk.BooleanVar(value=False)
-        fillna = ctk.BooleanVar(value=False)
-        dup = ctk.BooleanVar(value=False)
-
-        ctk.CTkCheckBox(dialog, text="Drop rows with any NA", variable=dropna).pack(anchor="w", padx=20, pady=6)
-        ctk.CTkCheckBox(dialog, text="Fill NA: numeric->0, others->''", variable=fillna).pack(anchor="w", padx=20, pady=6)
-        ctk.CTkCheckBox(dialog, text="Remove duplicate rows", variable=dup).pack(anchor="w", padx=20, pady=6)
+        options = (
+            ("trim", "Trim whitespace in text"),
+            ("coerce", "Convert numeric-looking text to numbers"),
+            ("dropna", "Drop rows with any NA"),
+            ("fillna", "Fill NA: numeric->0, others->''"),
+            ("clip", "Clip numeric outliers (1.5 x IQR)"),
+            ("dedup", "Remove duplicate rows"),
+        )
+        chosen = {}
+        for step, text in options:
+            chosen[step] = ctk.BooleanVar(value=False)
+            ctk.CTkCheckBox(dialog, text=text, variable=chosen[step]).pack(anchor="w", padx=20, pady=6)
+        keys_entry = ctk.CTkEntry(dialog, placeholder_text="Duplicate key columns, comma separated (blank = all)")
+        keys_entry.pack(fill="x", padx=20, pady=6)
 
         def apply_clean():
-            df = self.df.copy()
-            if dropna.get():
-                df = df.dropna()
-            if fillna.get():
-                num_cols = df.select_dtypes(include=[np.number]).columns
-                obj_cols = df.select_dtypes(exclude=[np.number]).columns
-                df[num_cols] = df[num_cols].fillna(0)
-                df[obj_cols] = df[obj_cols].fillna("")
-            if dup.get():
-                df = df.drop_duplicates()
-            self.df = df.reset_index(drop=True)
-            self.status_label.configure(text=f"Cleaned | Rows: {len(self.df)} | Cols: {len(self.df.columns)}")
+            keys = [k.strip() for k in keys_entry.get().split(",") if k.strip()]
+            plan = CleaningPlan((step for step, var in chosen.items() if var.get()), keys)
+            if not plan.steps:
+                dialog.destroy()
+                return
+            self._sync_follow()
+            try:
+                with self.perf.measure("clean", steps=plan.label(), rows_in=len(self.df)) as rec:
+                    cleaned = plan.execute(self.df)
+                    rec.update(rows=len(cleaned), cols=len(cleaned.columns))
+            except KeyError as e:
+                self._refresh_perf_view()
+                messagebox.showerror("Clean", e.args[0])
+                return
+            if self.follow_var.get():
+                # appended rows arrive raw, so following stops once the frame is cleaned
+                self.follow_var.set(False)
+                self._stop_follow()
+            self._set_df(cleaned)
+            self.history.push(self.df, plan.label())
+            self._update_history_buttons()
+            self.status_label.configure(text=f"Cleaned ({plan.label()}) | Rows: {len(self.df)} | Cols: {len(self.df.columns)}")
             dialog.destroy()
             self.preview_data()
-            messagebox.showinfo("Clean", "Data cleaning applied.")
+            removed = plan.removed
+            messagebox.showinfo("Clean", f"Data cleaning applied.\nRows with NA dropped: {removed.get('dropna', 0)}"
+                                         f"\nDuplicate rows removed: {removed.get('dedup', 0)}")
 
         btn = ctk.CTkFrame(dialog)
         btn.pack(fill="x", pady=8, padx=10)
         ctk.CTkButton(btn, text="Apply", command=apply_clean).pack(side="right", padx=8)
         ctk.CTkButton(btn, text="Cancel", command=dialog.destroy).pack(side="right")
 
+    def _update_history_buttons(self):
+        self.undo_btn.configure(state="normal" if self.history.can_undo() else "disabled")
+        self.redo_btn.configure(state="normal" if self.history.can_redo() else "disabled")
+        self.revert_btn.configure(state="normal" if self.history.can_undo() else "disabled")
+
+    def _show_history_state(self, df):
+        if df is None or df is self.df:
+            return
+        self._set_df(df)
+        label = self.history.current[0]
+        self.status_label.configure(text=f"{label} ({self.history.pos}/{len(self.history.states) - 1}) | Rows: {len(df)} | Cols: {len(df.columns)}")
+        self._update_history_buttons()
+        self.preview_data()
+
+    def undo_clean(self):
+        self._show_history_state(self.history.undo())
+
+    def redo_clean(self):
+        self._show_history_state(self.history.redo())
+
+    def revert_clean(self):
+        self._show_history_state(self.history.revert())
+
     # ---------- Plot area ----------
     def _build_plot_area(self):
         controls = ctk.CTkFrame(self.plot_frame)
         controls.pack(fill="x", padx=10, pady=(8,6))
 
         ctk.CTkLabel(controls, text="Plot Controls").pack(side="left", padx=6)
+        # live bin count for the histogram on screen; hidden for every other plot
+        self.bins_label = ctk.CTkLabel(controls, text="")
+        self.bins_slider = ctk.CTkSlider(controls, from_=2, to=HIST_MAX_BINS, number_of_steps=HIST_MAX_BINS - 2,
+                                         command=self._on_bins_slider)
+        self._hist = None
         self.plot_info = ctk.CTkLabel(controls, text="")
         self.plot_info.pack(side="right", padx=6)
 
         self.plot_container = ctk.CTkFrame(self.plot_frame)
         self.plot_container.pack(expand=True, fill="both", padx=10, pady=(6,10))
+        # every plot reuses this figure and canvas; only the axes and artists change
+        self.plot_canvas = PlotCanvas(self.plot_container)
 
     def prompt_two_columns(self):
         if self.df is None or self.df.empty:
@@ -360,7 +680,7 @@ class DataInsightPro(ctk.CTk):
             return
         dialog = ctk.CTkToplevel(self)
         dialog.title("Select Columns")
-        dialog.geometry("420x260")
+        dialog.geometry("420x330")
 
         cols = list(self.df.columns)
         ctk.CTkLabel(dialog, text="X column:").pack(pady=(12,4))
@@ -374,70 +694,153 @@ class DataInsightPro(ctk.CTk):
         plot_type.set("Line")
         ctk.CTkLabel(dialog, text="Plot type:").pack(pady=(12,4))
         plot_type.pack()
+        ctk.CTkLabel(dialog, text="Bar aggregation (text X):").pack(pady=(12,4))
+        agg_menu = ctk.CTkOptionMenu(dialog, values=list(GROUP_AGGS))
+        agg_menu.pack()
 
         def do_plot():
             x = xmenu.get()
             y = ymenu.get()
             t = plot_type.get()
+            agg = agg_menu.get()
             dialog.destroy()
-            self._plot_columns(x, y, t)
+            self._plot_columns(x, y, t, agg)
 
         ctk.CTkButton(dialog, text="Plot", command=do_plot).pack(pady=12)
 
     def plot_two_columns(self):
         self.prompt_two_columns()
 
-    def _plot_columns(self, xcol, ycol, ptype="Line"):
-        for w in self.plot_container.winfo_children():
-            w.destroy()
-        fig = Figure(figsize=(8,5), dpi=100)
-        ax = fig.add_subplot(111)
+    def _clear_plot_area(self):
+        self._plot_job += 1
+        self._plot_lod = None
+        self._hist = None
+        self.bins_slider.pack_forget()
+        self.bins_label.pack_forget()
+
+    def _post_ui(self, fn, *args):
+        """Run ``fn(*args)`` on the Tk thread. Worker threads must use this, never ``after`` or Tk calls."""
+        self._ui_queue.put((fn, args))
+
+    def _drain_ui_queue(self):
+        """Run the callbacks queued by ``_post_ui``; reschedules itself for the life of the window."""
+        try:
+            while True:
+                try:
+                    fn, args = self._ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                fn(*args)
+        finally:
+            self.after(UI_POLL_MS, self._drain_ui_queue)
+
+    def _in_background(self, op, work, done):
+        """Run ``work()`` off the Tk thread, then ``done(result)`` on it unless a newer plot was requested."""
+        job = self._plot_job
+
+        def worker():
+            try:
+                with self.perf.measure(op):
+                    result = work()
+            except Exception as e:
+                self._post_ui(messagebox.showerror, "Plot error", str(e))
+                return
+            self._post_ui(lambda: job == self._plot_job and done(result))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _show_heatmap(self, pc, c, title, note):
+        """Draw ``c`` on ``pc``; the same labels again only swap the image data."""
+        ax, reused = pc.axes("heatmap", tuple(c.columns))
+        if reused:
+            pc.artists["image"].set_data(c.to_numpy())
+            ax.set_title(f"{title} ({note})" if note else title)
+        else:
+            im = draw_heatmap(ax, c, list(c.columns), title, note)
+            pc.figure.colorbar(im, ax=ax)
+            pc.artists["image"] = im
+        pc.draw()
+
+    def _plot_columns(self, xcol, ycol, ptype="Line", agg="mean"):
+        self._sync_follow()
+        self._clear_plot_area()
+        try:
+            grouped = ptype == "Bar" and xcol in self.df and not pd.api.types.is_numeric_dtype(self.df[xcol])
+            if grouped:
+                # top groups plus "Other"; cached on the profile per (x, y, agg) and version
+                profile = self._get_profile()
+                self.plot_info.configure(text=f"Aggregating {ycol} by {xcol} ({agg})...")
+                self._in_background("plot:aggregate", lambda: profile.group_aggregate(xcol, ycol, agg),
+                                    partial(self._draw_columns, xcol, ycol, ptype))
+        except Exception as e:
+            messagebox.showerror("Plot error", str(e))
+            return
+        if not grouped:
+            self._draw_columns(xcol, ycol, ptype)
+
+    @instrumented("plot")
+    def _draw_columns(self, xcol, ycol, ptype, grouped=None):
+        pc = self.plot_canvas
         try:
             x = self.df[xcol]
             y = self.df[ycol]
-            if ptype == "Line":
-                ax.plot(x, y, linewidth=1.5)
+            x_is_axis = pd.api.types.is_numeric_dtype(x) or pd.api.types.is_datetime64_any_dtype(x)
+            large = len(self.df) > LOD_MIN_POINTS
+            line_lod = ptype == "Line" and large and x_is_axis
+            # a plain line plotted again for the same columns (e.g. after rows arrived) keeps its artist
+            ax, reused = pc.axes("plot", (xcol, ycol) if ptype == "Line" and not line_lod else None)
+            if line_lod:
+                # decimated to screen resolution; re-decimated on zoom/pan
+                self._plot_lod = LineLOD(ax, x, y, linewidth=1.5)
+            elif ptype == "Line" and reused:
+                pc.artists["line"].set_data(x, y)
+                ax.relim()
+                ax.autoscale_view()
+            elif ptype == "Line":
+                pc.artists["line"], = ax.plot(x, y, linewidth=1.5)
+            elif ptype == "Scatter" and large and x_is_axis and pd.api.types.is_numeric_dtype(y):
+                self._plot_lod = ScatterRaster(ax, x, y)
+                pc.figure.colorbar(self._plot_lod.image, ax=ax, label="points")
             elif ptype == "Scatter":
                 ax.scatter(x, y, alpha=0.8)
             elif ptype == "Bar":
-                if not np.issubdtype(x.dtype, np.number):
-                    agg = self.df.groupby(xcol)[ycol].mean().sort_values(ascending=False)
-                    ax.bar(agg.index.astype(str), agg.values)
-                    ax.set_xticklabels(agg.index.astype(str), rotation=45, ha="right")
+                if grouped is not None:
+                    ax.bar(grouped.index, grouped.to_numpy())
+                    ax.tick_params(axis="x", labelrotation=45)
+                    ycol = grouped.name
                 else:
                     ax.bar(x, y)
-            ax.set_xlabel(xcol)
-            ax.set_ylabel(ycol)
-            ax.set_title(f"{ptype}: {ycol} vs {xcol}")
-            fig.tight_layout()
-
-            canvas = FigureCanvasTkAgg(fig, master=self.plot_container)
-            canvas.draw()
-            canvas.get_tk_widget().pack(expand=True, fill="both")
-            toolbar = NavigationToolbar2Tk(canvas, self.plot_container)
-            toolbar.update()
-            toolbar.pack()
-            self.plot_info.configure(text=f"{ptype} plotted")
+            if not reused:
+                ax.set_xlabel(xcol)
+                ax.set_ylabel(ycol)
+                ax.set_title(f"{ptype}: {ycol} vs {xcol}")
+                pc.figure.tight_layout()
+            pc.show()
+            pc.draw()
+            self.plot_info.configure(text=f"{ptype} plotted" + (" (level of detail)" if self._plot_lod else ""))
             self.tabview.set("Plot")
         except Exception as e:
+            pc.clear()
+            pc.draw()
             messagebox.showerror("Plot error", str(e))
 
     def plot_histogram(self):
-        if self.df is None or self.df.empty:
+        if self._no_data():
             messagebox.showwarning("No data", "Load a file first.")
             return
+        profile = self._get_profile()
         dialog = ctk.CTkToplevel(self)
         dialog.title("Histogram")
         dialog.geometry("360x220")
 
-        cols = list(self.df.columns)
+        cols = [str(c) for c in (profile.df.columns if profile.df is not None else profile.numeric_columns + profile.categorical_columns)]
         ctk.CTkLabel(dialog, text="Select column:").pack(pady=(12,6))
         colmenu = ctk.CTkOptionMenu(dialog, values=cols)
         colmenu.pack()
 
         bins_entry = ctk.CTkEntry(dialog)
         bins_entry.insert(0, "20")
-        ctk.CTkLabel(dialog, text="Bins:").pack(pady=(8,2))
+        ctk.CTkLabel(dialog, text="Bins (top values for text columns):").pack(pady=(8,2))
         bins_entry.pack()
 
         def do_hist():
@@ -447,76 +850,285 @@ class DataInsightPro(ctk.CTk):
             except Exception:
                 bins = 20
             dialog.destroy()
-            for w in self.plot_container.winfo_children():
-                w.destroy()
-            fig = Figure(figsize=(8,5), dpi=100)
-            ax = fig.add_subplot(111)
-            try:
-                ax.hist(self.df[col].dropna(), bins=bins)
-                ax.set_title(f"Histogram of {col}")
-                ax.set_xlabel(col)
-                fig.tight_layout()
-                canvas = FigureCanvasTkAgg(fig, master=self.plot_container)
-                canvas.draw()
-                canvas.get_tk_widget().pack(expand=True, fill="both")
-                toolbar = NavigationToolbar2Tk(canvas, self.plot_container)
-                toolbar.update()
-                toolbar.pack()
+            self._clear_plot_area()
+            bins = max(2, min(bins, HIST_MAX_BINS))
+            if profile.df is not None:
+                s = profile.df[col]
+                binned = (pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)) or pd.api.types.is_datetime64_any_dtype(s)
+            else:
+                binned = col in profile.numeric_columns
+
+            def show(_):
+                self.plot_canvas.axes("histogram")
+                self._hist = {"profile": profile, "col": col, "binned": binned}
+                self.bins_label.pack(side="left", padx=(12,4))
+                self.bins_slider.pack(side="left", padx=4)
+                self.bins_slider.set(bins)
+                try:
+                    self._draw_histogram(bins)
+                except Exception as e:
+                    messagebox.showerror("Histogram error", str(e))
+                    return
+                self.plot_canvas.show()
                 self.plot_info.configure(text=f"Histogram ({col})")
                 self.tabview.set("Plot")
-            except Exception as e:
-                messagebox.showerror("Histogram error", str(e))
+
+            # the first call builds the column summary (a full scan); later bin counts are read off it
+            self.plot_info.configure(text=f"Summarising {col}...")
+            self._in_background("histogram:summary", lambda: profile.histogram(col, bins) if binned
+                                else profile.top_values(col, bins), show)
 
         ctk.CTkButton(dialog, text="Plot", command=do_hist).pack(pady=12)
 
+    def _on_bins_slider(self, value):
+        if self._hist is not None and self._hist["profile"] is self._get_profile():
+            self._draw_histogram(int(round(value)))
+
+    @instrumented("histogram")
+    def _draw_histogram(self, n):
+        """(Re)draw the histogram on screen with ``n`` bins, or the top ``n`` values of a text column.
+
+        Counts come from the profile's precomputed summaries, so a redraw never touches the rows.
+        """
+        h = self._hist
+        profile, col = h["profile"], h["col"]
+        pc = self.plot_canvas
+        ax = pc.ax
+        if h["binned"]:
+            counts, edges = profile.histogram(col, bins=n)
+            self.bins_label.configure(text=f"Bins: {n}")
+            top = counts.max() if len(counts) else 0
+            stairs = pc.artists.get("stairs")
+            if stairs is not None:
+                stairs.set_data(counts, edges)
+                if top * 2 > h["ylim"] >= top:
+                    pc.blit()               # same axes: only the bars are repainted
+                    return
+            else:
+                stairs = pc.artists["stairs"] = ax.stairs(counts, edges, fill=True)
+                pc.animate(stairs)
+                if profile.df is not None and pd.api.types.is_datetime64_any_dtype(profile.df[col]):
+                    ax.xaxis_date()
+                ax.set_title(f"Histogram of {col}")
+                ax.set_xlabel(col)
+            # the y range only changes when the tallest bar leaves it, keeping most slider moves blittable
+            h["ylim"] = max(top, 1) * 1.1
+            ax.set_ylim(0, h["ylim"])
+            if len(edges) and edges[-1] > edges[0]:
+                ax.set_xlim(edges[0], edges[-1])
+        else:
+            ax.clear()
+            top = profile.top_values(col, n)
+            ax.bar(top.index.astype(str), top.to_numpy())
+            ax.tick_params(axis="x", labelrotation=45)
+            self.bins_label.configure(text=f"Top {n}")
+            ax.set_title(f"Most frequent values of {col}")
+            ax.set_xlabel(col)
+        pc.figure.tight_layout()
+        pc.draw()
+
     # ---------- Correlation ----------
     def show_correlation(self):
-        if self.df is None or self.df.empty:
+        self._sync_follow()
+        if self._no_data():
             messagebox.showwarning("No data", "Load file first.")
             return
-        num_df = self.df.select_dtypes(include=[np.number])
-        if num_df.shape[1] < 2:
+        profile = self._get_profile()
+        if len(profile.numeric_columns) < 2:
             messagebox.showwarning("No numeric columns", "Need at least two numeric columns for correlation.")
             return
 
-        for w in self.plot_container.winfo_children():
-            w.destroy()
-        fig = Figure(figsize=(8,6), dpi=100)
-        ax = fig.add_subplot(111)
-        c = num_df.corr()
-        im = ax.matshow(c, fignum=False)
-        ax.set_xticks(range(len(c.columns)))
-        ax.set_xticklabels(c.columns, rotation=45, fontsize=8)
-        ax.set_yticks(range(len(c.columns)))
-        ax.set_yticklabels(c.columns, fontsize=8)
-        ax.set_title("Correlation matrix")
-        fig.colorbar(im, ax=ax)
-        canvas = FigureCanvasTkAgg(fig, master=self.plot_container)
-        canvas.draw()
-        canvas.get_tk_widget().pack(expand=True, fill="both")
-        toolbar = NavigationToolbar2Tk(canvas, self.plot_container)
-        toolbar.update()
-        toolbar.pack()
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Correlation")
+        dialog.geometry("360x280")
+        ctk.CTkLabel(dialog, text="Method:").pack(pady=(12,4))
+        method_menu = ctk.CTkOptionMenu(dialog, values=list(CORR_METHODS))
+        method_menu.pack()
+        ctk.CTkLabel(dialog, text="View:").pack(pady=(8,4))
+        view_menu = ctk.CTkOptionMenu(dialog, values=["auto", "all", "top", "clustered"])
+        view_menu.pack()
+        preview = ctk.BooleanVar(value=profile.rows > CORR_PREVIEW_ROWS)
+        ctk.CTkCheckBox(dialog, text=f"Quick preview (sample of {CORR_PREVIEW_ROWS:,} rows)", variable=preview).pack(pady=10)
+
+        def do_corr():
+            method, view = method_menu.get(), view_menu.get()
+            sample_rows = CORR_PREVIEW_ROWS if preview.get() else None
+            dialog.destroy()
+            self.plot_info.configure(text=f"Computing {method} correlation...")
+
+            def worker():
+                # the profile caches the result, so the dashboard and PDF report reuse it
+                try:
+                    result = profile.correlation(method, sample_rows)
+                    self._post_ui(self._draw_correlation, profile, result, view)
+                except Exception as e:
+                    self._post_ui(messagebox.showerror, "Correlation error", str(e))
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        ctk.CTkButton(dialog, text="Show", command=do_corr).pack(pady=12)
+
+    @instrumented("heatmap")
+    def _draw_correlation(self, profile, result, view):
+        if profile is not self._get_profile():
+            return                    # the data changed while the matrix was being computed
+        c, note = heatmap_view(result.matrix, view)
+        self._clear_plot_area()
+        self._show_heatmap(self.plot_canvas, c, "Correlation matrix", note)
+        self.plot_canvas.show()
+        self.plot_info.configure(text=result.describe())
         self.tabview.set("Plot")
 
-    # ---------- Export ----------
-    def export_csv(self):
-        if self.df is None or self.df.empty:
-            messagebox.showwarning("No data", "Load file first.")
+    # ---------- Performance ----------
+    def _build_performance(self):
+        top = ctk.CTkFrame(self.perf_frame)
+        top.pack(fill="x", padx=10, pady=(8,6))
+        ctk.CTkLabel(top, text="Operation log:").pack(side="left", padx=(6,8))
+        self.perf_profile_var = ctk.BooleanVar(value=False)
+        ctk.CTkSwitch(top, text="cProfile", variable=self.perf_profile_var,
+                      command=lambda: setattr(self.perf, "profile", self.perf_profile_var.get())).pack(side="left", padx=6)
+        self.perf_trace_var = ctk.BooleanVar(value=False)
+        ctk.CTkSwitch(top, text="tracemalloc", variable=self.perf_trace_var,
+                      command=lambda: setattr(self.perf, "trace_memory", self.perf_trace_var.get())).pack(side="left", padx=6)
+
+        btn_frame = ctk.CTkFrame(top, fg_color="transparent")
+        btn_frame.pack(side="right")
+        ctk.CTkButton(btn_frame, text="Export JSONL", width=110, command=self.export_perf_log).pack(side="left", padx=6)
+        ctk.CTkButton(btn_frame, text="Clear", width=70, command=self.clear_perf_log).pack(side="left", padx=6)
+
+        self.perf_text = ctk.CTkTextbox(self.perf_frame, wrap="none", font=ctk.CTkFont(family="Courier", size=12))
+        self.perf_text.pack(expand=True, fill="both", padx=10, pady=(6,10))
+        self.perf_text.insert("0.0", "No operations recorded yet.")
+        self.perf_text.configure(state="disabled")
+
+    def _refresh_perf_view(self, *_):
+        """Rewrite the Performance tab; skipped while the tab is hidden (switching to it refreshes)."""
+        if self.tabview.get() != "Performance":
+            return
+        records = self.perf.snapshot()
+        if records:
+            rows = []
+            for rec in reversed(records[-PERF_VIEW_ROWS:]):
+                rows.append({
+                    "time": rec["time"][11:],
+                    "op": rec["op"],
+                    "wall ms": f"{rec['wall_s'] * 1000:,.1f}",
+                    "cpu ms": f"{rec['cpu_s'] * 1000:,.1f}",
+                    "rss Δ": self._format_delta(rec.get("rss_delta")),
+                    "peak Δ": self._format_delta(rec.get("peak_rss_delta")),
+                    "py peak": self._format_delta(rec["py_peak_bytes"]) if "py_peak_bytes" in rec else "",
+                    "rows": f"{rec['rows']:,}" if "rows" in rec else "",
+                    "cols": rec.get("cols", ""),
+                    "error": rec.get("error", ""),
+                })
+            parts = [pd.DataFrame(rows).to_string(index=False),
+                     "\nPer operation:\n" + self.perf.summary().round(4).to_string()]
+            profiled = [rec for rec in records if "profile" in rec]
+            if profiled:
+                last = profiled[-1]
+                parts.append(f"\nLast cProfile capture ({last['op']} at {last['time']}):\n{last['profile']}")
+            text = "\n".join(parts)
+        else:
+            text = "No operations recorded yet."
+        self.perf_text.configure(state="normal")
+        self.perf_text.delete("0.0", "end")
+        self.perf_text.insert("0.0", text)
+        self.perf_text.configure(state="disabled")
+
+    @staticmethod
+    def _format_delta(n):
+        if n is None:
+            return "n/a"
+        return ("-" if n < 0 else "") + format_bytes(abs(n))
+
+    def export_perf_log(self):
+        if not self.perf.records:
+            messagebox.showinfo("Performance", "No operations recorded yet.")
             return
-        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv")])
+        path = filedialog.asksaveasfilename(defaultextension=".jsonl", filetypes=[("JSON Lines", "*.jsonl")])
         if not path:
             return
         try:
-            self.df.to_csv(path, index=False)
-            messagebox.showinfo("Export", f"Saved cleaned CSV to {path}")
+            n = self.perf.export_jsonl(path)
+            messagebox.showinfo("Performance", f"Saved {n} records to {path}")
         except Exception as e:
             messagebox.showerror("Export error", str(e))
 
-    def export_pdf_report(self):
+    def clear_perf_log(self):
+        self.perf.clear()
+        self._refresh_perf_view()
+
+    # ---------- Export ----------
+    def export_data(self):
+        self._sync_follow()
         if self.df is None or self.df.empty:
             messagebox.showwarning("No data", "Load file first.")
             return
+        filetypes = [
+            ("CSV", "*.csv"),
+            ("CSV, gzip", "*.csv.gz"),
+            ("CSV, zstd", "*.csv.zst"),
+            ("Parquet", "*.parquet"),
+            ("Feather", "*.feather"),
+            ("Arrow IPC", "*.arrow"),
+        ]
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=filetypes)
+        if not path:
+            return
+        df = self.df
+        total = len(df)
+        done = [0]
+        cancel = threading.Event()
+        started = time.perf_counter()
+
+        # chunks are written by a worker thread; this small window only shows progress
+        progress = ctk.CTkToplevel(self)
+        progress.geometry("380x160")
+        progress.title("Exporting")
+        info = ctk.CTkLabel(progress, text=f"Writing {os.path.basename(path)}...", anchor="center")
+        info.pack(expand=True, pady=(12,4))
+        bar = ctk.CTkProgressBar(progress)
+        bar.set(0)
+        bar.pack(fill="x", padx=20, pady=4)
+        ctk.CTkButton(progress, text="✖  Cancel", command=cancel.set, fg_color="#8b1e1e",
+                      hover_color="#a52a2a").pack(pady=(4,12))
+        progress.grab_set()
+
+        def poll():
+            if not progress.winfo_exists():
+                return
+            elapsed = time.perf_counter() - started
+            rate = done[0] / elapsed if elapsed > 0 else 0
+            bar.set(done[0] / total if total else 1)
+            info.configure(text=f"Writing {os.path.basename(path)}\n{done[0]:,} / {total:,} rows | {rate:,.0f} rows/s")
+            self.after(100, poll)
+
+        def finish(error=None, size=None):
+            progress.destroy()
+            self._refresh_perf_view()
+            if error is None:
+                messagebox.showinfo("Export", f"Saved {total:,} rows ({format_bytes(size)}) to {path}")
+            elif error != "cancelled":
+                messagebox.showerror("Export error", error)
+
+        def worker():
+            try:
+                with self.perf.measure("export", file=os.path.basename(path), rows=total, cols=len(df.columns)) as rec:
+                    rec["bytes"] = export_frame(df, path, progress=lambda rows, _: done.__setitem__(0, rows), cancel=cancel)
+                self._post_ui(finish, None, rec["bytes"])
+            except ExportCancelled:
+                self._post_ui(finish, "cancelled")
+            except Exception as e:
+                self._post_ui(finish, str(e))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.after(100, poll)
+
+    def export_pdf_report(self):
+        self._sync_follow()
+        if self._no_data():
+            messagebox.showwarning("No data", "Load file first.")
+            return
         path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF", "*.pdf")])
         if not path:
             return
@@ -528,119 +1140,538 @@ class DataInsightPro(ctk.CTk):
         ctk.CTkLabel(progress, text="Generating PDF report...\nPlease wait", anchor="center").pack(expand=True, pady=12)
         progress.grab_set()
 
+        def finish(error=None):
+            progress.destroy()
+            self._refresh_perf_view()
+            if error is None:
+                messagebox.showinfo("PDF Report", f"Report saved to {path}")
+            else:
+                messagebox.showerror("PDF Error", error)
+
         def worker():
+            # Tk calls must happen on the main thread, so results are handed back via _post_ui
             try:
                 self._create_pdf_report(path)
-                progress.destroy()
-                messagebox.showinfo("PDF Report", f"Report saved to {path}")
+                self._post_ui(finish)
             except Exception as e:
-                progress.destroy()
-                messagebox.showerror("PDF Error", str(e))
+                self._post_ui(finish, str(e))
 
         threading.Thread(target=worker, daemon=True).start()
 
+    @instrumented("pdf_report")
     def _create_pdf_report(self, path):
-        tempdir = tempfile.mkdtemp()
-        images = []
-
-        # summary text
-        summary_txt = os.path.join(tempdir, "summary.txt")
-        with open(summary_txt, "w", encoding="utf-8") as f:
-            f.write("📊 Milo – Data Insight Pro - Report\n")
-            f.write(f"File: {os.path.basename(self.current_file) if self.current_file else '(in-memory)'}\n")
-            f.write(f"Rows: {len(self.df)} | Columns: {len(self.df.columns)}\n\n")
-            f.write(self.df.describe(include="all").transpose().to_string())
-
-        # correlation
-        num_df = self.df.select_dtypes(include=[np.number])
-        if num_df.shape[1] >= 2:
-            fig = Figure(figsize=(6,4), dpi=120)
-            ax = fig.add_subplot(111)
-            c = num_df.corr()
-            im = ax.matshow(c, fignum=False)
-            ax.set_xticks(range(len(c.columns)))
-            ax.set_xticklabels(c.columns, rotation=45, fontsize=8)
-            ax.set_yticks(range(len(c.columns)))
-            ax.set_yticklabels(c.columns, fontsize=8)
-            ax.set_title("Correlation matrix")
-            fig.colorbar(im, ax=ax)
-            corr_path = os.path.join(tempdir, "corr.png")
-            fig.savefig(corr_path, bbox_inches="tight")
-            images.append(corr_path)
-
-        # histograms for first up-to-3 numeric columns
-        for col in num_df.columns[:3]:
-            fig = Figure(figsize=(6,3), dpi=120)
-            ax = fig.add_subplot(111)
-            ax.hist(self.df[col].dropna(), bins=20)
-            ax.set_title(f"Histogram of {col}")
-            hist_path = os.path.join(tempdir, f"hist_{col}.png")
-            fig.savefig(hist_path, bbox_inches="tight")
-            images.append(hist_path)
-
-        pdf = FPDF()
-        pdf.set_auto_page_break(auto=True, margin=12)
-        pdf.add_page()
-        pdf.set_font("Arial", "B", 16)
-        pdf.cell(0, 10, "📊 Milo – Data Insight Pro - Report", ln=True)
-        pdf.set_font("Arial", size=11)
-        pdf.cell(0, 8, f"File: {os.path.basename(self.current_file) if self.current_file else '(in-memory)'}", ln=True)
-        pdf.cell(0, 8, f"Rows: {len(self.df)} | Columns: {len(self.df.columns)}", ln=True)
-        pdf.ln(6)
-
-        with open(summary_txt, "r", encoding="utf-8") as st:
-            lines = st.read().splitlines()
-        pdf.set_font("Arial", size=9)
-        for line in lines:
-            # wrap long lines
-            for chunk in [line[i:i+90] for i in range(0, len(line), 90)]:
-                pdf.cell(0, 5, chunk, ln=True)
-        pdf.ln(6)
-
-        for img in images:
-            pdf.add_page()
-            try:
-                pdf.image(img, x=10, y=20, w=pdf.w - 20)
-            except Exception:
-                continue
-
-        pdf.output(path)
+        build_pdf_report(self._get_profile(), path, self.current_file)
 
     # ---------- File handling ----------
     def load_file(self):
         filetypes = [
             ("CSV files", "*.csv"),
-            ("Excel files", "*.xlsx *.xls"),
+            ("Excel files", "*.xlsx *.xlsm *.xls"),
             ("JSON files", "*.json"),
+            ("Arrow / Feather (memory-mapped)", "*.feather *.arrow *.ipc"),
+            ("NumPy arrays (memory-mapped)", "*.npy"),
             ("All files", "*.*"),
         ]
         path = filedialog.askopenfilename(title="Open data file", filetypes=filetypes)
         if not path:
             return
+        self.follow_var.set(False)
+        if path.lower().endswith(EXCEL_EXTS):
+            self._choose_excel_sheet(path)
+            return
+        self._start_load(path, "Loaded")
+
+    def _choose_excel_sheet(self, path):
+        """Ask which sheet (or all) and which cell range of a workbook to load, then load it."""
         try:
-            df = try_read_data(path)
-            self.df = df
-            self.current_file = path
-            self.status_label.configure(text=f"Loaded: {os.path.basename(path)} | Rows: {len(df)} | Cols: {len(df.columns)}")
-            self.preview_data()
-            messagebox.showinfo("Loaded", "File loaded successfully.")
+            sheets = excel_sheets(path)
         except Exception as e:
-            messagebox.showerror("Error loading file", str(e))
+            messagebox.showerror("Load error", f"Could not read workbook:\n{e}")
+            return
+        previous = self._excel_choice.get(path, {})
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Excel Sheet")
+        dialog.geometry("360x240")
+
+        ctk.CTkLabel(dialog, text="Sheet:").pack(pady=(12,4))
+        all_sheets = "All sheets (stacked)"
+        sheet_menu = ctk.CTkOptionMenu(dialog, values=sheets + ([all_sheets] if len(sheets) > 1 else []))
+        sheet = previous.get("sheet")
+        sheet_menu.set(all_sheets if isinstance(sheet, list) else sheet if sheet in sheets else sheets[0])
+        sheet_menu.pack()
+        ctk.CTkLabel(dialog, text="Cell range (optional, e.g. A1:F500, B:F, 2:500):").pack(pady=(8,4))
+        range_entry = ctk.CTkEntry(dialog, placeholder_text="whole sheet")
+        if previous.get("cell_range"):
+            range_entry.insert(0, previous["cell_range"])
+        range_entry.pack(fill="x", padx=20)
+
+        def do_load():
+            cell_range = range_entry.get().strip() or None
+            if cell_range:
+                try:
+                    parse_cell_range(cell_range)
+                except ValueError as e:
+                    messagebox.showwarning("Excel Sheet", str(e))
+                    return
+            dialog.destroy()
+            choice = sheet_menu.get()
+            self._excel_choice[path] = {"sheet": sheets if choice == all_sheets else choice, "cell_range": cell_range}
+            self._start_load(path, "Loaded")
+
+        ctk.CTkButton(dialog, text="Load", command=do_load).pack(pady=12)
+
+    def profile_large_file(self):
+        """Profile a file too large for memory by streaming it through ``StreamingStats``."""
+        path = filedialog.askopenfilename(title="Profile large file (streaming)",
+                                          filetypes=[("CSV / text", "*.csv *.tsv *.txt"), ("All files", "*.*")])
+        if not path:
+            return
+        self.follow_var.set(False)
+        self._start_load(path, "Profiled", job=profile_file)
 
     def reload_last(self):
         if not self.current_file:
             messagebox.showinfo("No file", "No previously loaded file.")
             return
+        if self.df is None and self._profile is not None:
+            # out-of-core mode: re-stream instead of pulling the whole file into memory
+            self._start_load(self.current_file, "Profiled", job=profile_file)
+            return
+        self._follow_after_load = self.follow_var.get()
+        self._start_load(self.current_file, "Reloaded")
+
+    def cancel_load(self):
+        if self._load_cancel is not None:
+            self._load_cancel.set()
+            self.status_label.configure(text="Cancelling load...")
+
+    def _start_load(self, path, action, job=None):
+        """Run ``job(path, progress=, cancel=)`` in a worker thread (default: ``try_read_data``).
+
+        Results come back through ``self._load_queue`` and are handled by ``_poll_load_queue``.
+        """
+        if self._load_thread is not None and self._load_thread.is_alive():
+            messagebox.showinfo("Busy", "A file is already loading. Cancel it first.")
+            return
+        if job is None:
+            job = partial(read_data_cached, cache=self.frame_cache, optimize=self.optimize_var.get(),
+                          **self._excel_choice.get(path, {}))
+        self._stop_follow()
         try:
-            df = try_read_data(self.current_file)
-            self.df = df
-            self.status_label.configure(text=f"Reloaded: {os.path.basename(self.current_file)} | Rows: {len(df)} | Cols: {len(df.columns)}")
+            self._load_started_size = os.path.getsize(path)
+        except OSError:
+            self._load_started_size = None
+        cancel = threading.Event()
+        self._load_cancel = cancel
+        q = self._load_queue
+        started = time.perf_counter()
+
+        def progress(done, total, rows):
+            q.put(("progress", done, total, rows, time.perf_counter() - started))
+
+        def worker():
+            try:
+                with self.perf.measure(f"load:{action.lower()}", file=os.path.basename(path)) as rec:
+                    result = job(path, progress=progress, cancel=cancel)
+                    shape = (result.rows, result.cols) if action == "Profiled" else result.shape
+                    rec.update(rows=shape[0], cols=shape[1])
+                q.put(("done", result, path, action))
+            except LoadCancelled:
+                q.put(("cancelled",))
+            except Exception as e:
+                q.put(("error", str(e), action))
+
+        self.load_progress.set(0)
+        self.load_progress.pack(padx=20, pady=(0,4), fill="x")
+        self.cancel_load_btn.pack(padx=20, pady=(0,10), fill="x")
+        self.status_label.configure(text=f"Loading: {os.path.basename(path)} ...")
+        self._load_thread = threading.Thread(target=worker, daemon=True)
+        self._load_thread.start()
+        self.after(100, self._poll_load_queue)
+
+    def _poll_load_queue(self):
+        """Drain worker messages on the Tk thread; reschedules itself until the load ends."""
+        finished = None
+        progress = None
+        while True:
+            try:
+                msg = self._load_queue.get_nowait()
+            except queue.Empty:
+                break
+            if msg[0] == "progress":
+                progress = msg  # only the latest progress update matters
+            else:
+                finished = msg
+        if progress is not None:
+            _, done, total, rows, elapsed = progress
+            rate = rows / elapsed if elapsed > 0 else 0
+            self.load_progress.set(done / total if total else 1)
+            self.status_label.configure(
+                text=f"Loading: {format_bytes(done)} / {format_bytes(total)}\n{rows:,} rows | {rate:,.0f} rows/s")
+        if finished is None:
+            self.after(100, self._poll_load_queue)
+            return
+
+        self._load_cancel = None
+        self._load_thread = None
+        self._refresh_perf_view()
+        self.load_progress.pack_forget()
+        self.cancel_load_btn.pack_forget()
+        kind = finished[0]
+        if kind == "done" and finished[3] == "Profiled":
+            _, profile, path, action = finished
+            self._active = None
+            self._set_stream_profile(profile)
+            self._update_workspace_view()
+            self.current_file = path
+            note = "out-of-core, no rows in memory"
+            if profile.stats.demoted:
+                note += f"\ntext in numeric column(s) {', '.join(map(str, profile.stats.demoted))}: profiled as categorical"
+            self.status_label.configure(
+                text=f"Profiled: {os.path.basename(path)} | Rows: {profile.rows} | Cols: {profile.cols}\n{note}")
+            self.preview_data()
+            self.show_dashboard()
+        elif kind == "done":
+            _, df, path, action = finished
+            self._open_dataset(self._dataset_name(path), df, path)
+            self.history.reset(df)
+            self._update_history_buttons()
+            self.current_file = path
+            # the bytes the parser actually covered; rows appended during the load are FileTail's
+            self._loaded_size = df.attrs.get("milo_bytes", self._load_started_size)
+            self.status_label.configure(text=self._status_text(action, path, df))
             self.preview_data()
-            messagebox.showinfo("Reloaded", "File reloaded successfully.")
+            if self._follow_after_load:
+                self._follow_after_load = False
+                self._start_follow()
+            else:
+                messagebox.showinfo(action, f"File {action.lower()} successfully.")
+        elif kind == "cancelled":
+            self._follow_after_load = False
+            self.follow_var.set(False)
+            gc.collect()
+            self.status_label.configure(text="Load cancelled" if self.df is None
+                                        else self._status_text("Loaded", self.current_file, self.df))
+        else:
+            _, err, action = finished
+            self._follow_after_load = False
+            self.follow_var.set(False)
+            self.status_label.configure(text="Load failed" if self.df is None
+                                        else self._status_text("Loaded", self.current_file, self.df))
+            messagebox.showerror("Error loading file" if action == "Loaded" else "Reload error", err)
+
+    # ---------- Follow mode ----------
+    def toggle_follow(self):
+        if not self.follow_var.get():
+            self._stop_follow()
+            if self.df is not None and self.current_file:
+                self.status_label.configure(text=self._status_text("Stopped following", self.current_file, self.df))
+            return
+        if self.df is None or not self.current_file:
+            messagebox.showinfo("Follow", "Load a CSV or text file first.")
+            self.follow_var.set(False)
+            return
+        try:
+            changed = os.path.getsize(self.current_file) != self._loaded_size
+        except OSError as e:
+            messagebox.showerror("Follow error", str(e))
+            self.follow_var.set(False)
+            return
+        if changed or self.history.can_undo():
+            # the frame no longer matches the file's first _loaded_size bytes: reload, then tail
+            self._follow_after_load = True
+            self._start_load(self.current_file, "Reloaded")
+            return
+        self._start_follow()
+
+    def _start_follow(self):
+        """Build running statistics for the loaded rows in the background, then start tailing."""
+        try:
+            tail = FileTail(self.current_file, self.df.columns, self.df.dtypes, self._loaded_size)
+        except ValueError as e:
+            messagebox.showerror("Follow", str(e))
+            self.follow_var.set(False)
+            return
+        df = self.df
+        self.status_label.configure(text=f"Following: {os.path.basename(self.current_file)}\nindexing {len(df):,} loaded rows...")
+
+        def worker():
+            try:
+                stats = frame_stats(df)
+                self._post_ui(self._follow_ready, tail, stats, AppendBuffer(df))
+            except Exception as e:
+                self._post_ui(self._follow_failed, str(e))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _follow_ready(self, tail, stats, buffer):
+        if buffer.df is not self.df or not self.follow_var.get():
+            return                    # the data changed or follow was switched off meanwhile
+        self._follow = (tail, stats, buffer)
+        self._profile = LiveProfile(self.df, stats, self.df_version)
+        self.status_label.configure(text=f"Following: {os.path.basename(self.current_file)} | Rows: {len(self.df):,}")
+        self._follow_job = self.after(FOLLOW_INTERVAL_MS, self._follow_tick)
+
+    def _follow_failed(self, error):
+        self._stop_follow()
+        self.follow_var.set(False)
+        messagebox.showerror("Follow error", error)
+
+    def _stop_follow(self):
+        if self._follow_job is not None:
+            self.after_cancel(self._follow_job)
+            self._follow_job = None
+        self._sync_follow()
+        self._follow = None
+
+    def _sync_follow(self):
+        """Fold the rows follow mode has buffered into the frame, before an action reads all of it."""
+        if self._follow is None or not self._follow[2].pending_rows:
+            return
+        tail, stats, buffer = self._follow
+        with self.perf.measure("follow:compact", rows_added=buffer.pending_rows) as rec:
+            self._set_df(buffer.compact(), nbytes=buffer.nbytes)
+            # appended rows are raw; earlier cleaning states would silently lack them
+            self.history.reset(self.df)
+            self._update_history_buttons()
+            self._profile = LiveProfile(self.df, stats, self.df_version)
+            rec.update(rows=len(self.df), cols=len(self.df.columns))
+
+    def _follow_tick(self):
+        """Parse bytes appended since the last tick and fold them into the statistics.
+
+        New rows wait in the ``AppendBuffer``; the frame itself is rebuilt only when the
+        buffer is due, when the file goes quiet, or when an action needs every row
+        (``_sync_follow``), so a tick costs the new rows rather than the whole frame.
+        """
+        self._follow_job = None
+        if self._follow is None:
+            return
+        tail, stats, buffer = self._follow
+        started = time.perf_counter()
+        try:
+            batch = tail.poll()
+        except FileTruncated:
+            # rotated or rewritten: start over from a full read
+            self._stop_follow()
+            self._follow_after_load = True
+            self._start_load(self.current_file, "Reloaded")
+            return
         except Exception as e:
-            messagebox.showerror("Reload error", str(e))
+            self._follow_failed(str(e))
+            return
+        if batch is not None and len(batch):
+            parsed = time.perf_counter() - started
+            with self.perf.measure("follow", rows_added=len(batch), parse_s=round(parsed, 6)) as rec:
+                stats.update(batch)
+                buffer.append(batch)
+                self._loaded_size = tail.offset
+                if buffer.due():
+                    self._sync_follow()
+                else:
+                    self._profile = LiveProfile(self.df, stats, self.df_version)
+                    self._dashboard_version = None    # same frame, newer statistics
+                self._refresh_live_views()
+                rec.update(rows=len(buffer), cols=len(self.df.columns))
+            elapsed = (time.perf_counter() - started) * 1000
+            self.status_label.configure(text=f"Following: {os.path.basename(self.current_file)} | Rows: {len(buffer):,}"
+                                             f"\n+{len(batch):,} rows in {elapsed:.0f} ms")
+        elif buffer.pending_rows:
+            # the file went quiet: bring the frame up to date once
+            self._sync_follow()
+            self._refresh_live_views()
+        self._follow_job = self.after(FOLLOW_INTERVAL_MS, self._follow_tick)
+
+    def _refresh_live_views(self):
+        """Redraw whatever is on screen from the updated statistics, without rescanning rows."""
+        tab = self.tabview.get()
+        if tab == "Dashboard":
+            self.show_dashboard()
+        elif tab == "Preview" and not self.search_var.get().strip():
+            self.preview_data(head_only=self._preview_head_only)
+        if self._hist is not None:
+            self._hist["profile"] = self._get_profile()
+            self._draw_histogram(int(round(self.bins_slider.get())))
+        elif self.plot_canvas.kind is not None:
+            self.plot_info.configure(text="New rows arrived - plot again to include them")
+
+    # ---------- Workspace ----------
+    def _dataset_name(self, path):
+        """The open dataset read from ``path`` (it gets replaced), else a new unique name."""
+        for name in self.workspace.names():
+            if self.workspace.source(name) == path:
+                return name
+        return self.workspace.unique_name(os.path.basename(path))
+
+    def _open_dataset(self, name, df, source):
+        """Add ``df`` to the workspace under ``name`` and make it the active dataset."""
+        self._active = None
+        self.workspace.add(name, df, source)
+        self._active = name
+        self._set_df(df)
+        self._update_workspace_view()
+
+    def switch_dataset(self, name):
+        if name == self._active or name not in self.workspace:
+            return
+        self.follow_var.set(False)
+        self._stop_follow()
+        with self.perf.measure("switch_dataset", dataset=name) as rec:
+            df = self.workspace.get(name)
+            rec.update(rows=len(df), cols=len(df.columns))
+        self._active = name
+        self._set_df(df)
+        # undo states are per session of one dataset; they would otherwise pin every frame in memory
+        self.history.reset(df)
+        self._update_history_buttons()
+        self.current_file = self.workspace.source(name)
+        self._loaded_size = None      # following a switched-to file re-reads it first
+        self.status_label.configure(text=self._status_text("Switched to", self.current_file or name, df))
+        self._update_workspace_view()
+        self._refresh_perf_view()
+        self.preview_data()
+
+    def close_dataset(self):
+        if self._active is None:
+            messagebox.showinfo("Datasets", "No dataset is open.")
+            return
+        self.follow_var.set(False)
+        self._stop_follow()
+        self.workspace.remove(self._active)
+        self._active = None
+        names = self.workspace.names()
+        if names:
+            self.switch_dataset(names[-1])  # the most recently used one
+            return
+        self._set_df(None)
+        self.history.reset(None)
+        self._update_history_buttons()
+        self.current_file = None
+        self.status_label.configure(text="No file loaded")
+        self._update_workspace_view()
+        self.preview_data()
+
+    def _update_workspace_view(self):
+        names = self.workspace.names()
+        self.dataset_menu.configure(values=names or ["(none)"])
+        self.dataset_menu.set(self._active or ("(streamed profile)" if self._profile is not None else "(none)"))
+        status = self.workspace.status()
+        spilled = sum(1 for _, rows, _, spill in status if rows is None and spill)
+        text = (f"{len(names)} open | {format_bytes(self.workspace.resident_bytes())} of "
+                f"{format_bytes(self.workspace.memory_budget)} in memory")
+        if spilled:
+            text += f"\n{spilled} spilled to disk"
+        self.workspace_label.configure(text=text if names else "")
+
+    def combine_datasets(self):
+        names = self.workspace.names()
+        if len(names) < 2:
+            messagebox.showinfo("Combine", "Open at least two datasets first.")
+            return
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Combine Datasets")
+        dialog.geometry("380x380")
+
+        ctk.CTkLabel(dialog, text="How:").pack(pady=(12,4))
+        how_menu = ctk.CTkOptionMenu(dialog, values=list(COMBINE_MODES))
+        how_menu.pack()
+        ctk.CTkLabel(dialog, text="First dataset:").pack(pady=(8,4))
+        first_menu = ctk.CTkOptionMenu(dialog, values=names)
+        first_menu.set(self._active or names[-1])
+        first_menu.pack()
+        ctk.CTkLabel(dialog, text="Second dataset:").pack(pady=(8,4))
+        second_menu = ctk.CTkOptionMenu(dialog, values=names)
+        second_menu.set(next(n for n in reversed(names) if n != first_menu.get()))
+        second_menu.pack()
+        ctk.CTkLabel(dialog, text="Join keys (comma-separated; ignored for concat):").pack(pady=(8,4))
+        keys_entry = ctk.CTkEntry(dialog, placeholder_text="e.g. id")
+        keys_entry.pack(fill="x", padx=20)
+
+        def do_combine():
+            how, first, second = how_menu.get(), first_menu.get(), second_menu.get()
+            keys = [k.strip() for k in keys_entry.get().split(",") if k.strip()]
+            if first == second:
+                messagebox.showwarning("Combine", "Pick two different datasets.")
+                return
+            dialog.destroy()
+            self._sync_follow()
+            name = self.workspace.unique_name(f"{first} + {second}" if how == "concat" else f"{first} ⋈ {second} ({how})")
+            self.status_label.configure(text=f"Combining {first} and {second} ({how})...")
+
+            def worker():
+                try:
+                    with self.perf.measure(f"combine:{how}", datasets=[first, second]) as rec:
+                        frames = {first: self.workspace.get(first), second: self.workspace.get(second)}
+                        df = combine_frames(frames, how, keys)
+                        rec.update(rows=len(df), cols=len(df.columns))
+                    self._post_ui(self._combined, name, df)
+                except Exception as e:
+                    msg = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+                    self._post_ui(messagebox.showerror, "Combine error", msg)
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        ctk.CTkButton(dialog, text="Combine", command=do_combine).pack(pady=12)
+
+    def _combined(self, name, df):
+        self.follow_var.set(False)
+        self._stop_follow()
+        self._open_dataset(name, df, None)
+        self.history.reset(df)
+        self._update_history_buttons()
+        self.current_file = None
+        self.status_label.configure(text=f"Combined: {name} | Rows: {len(df)} | Cols: {len(df.columns)}")
+        self._refresh_perf_view()
+        self.preview_data()
 
     # ---------- utilities ----------
+    def _set_df(self, df, nbytes=None):
+        """Replace the working DataFrame and drop everything derived from the old one.
+
+        ``nbytes`` is the frame's memory size when already known (saves the workspace a deep scan).
+        """
+        self.df = df
+        if df is not None and self._active is not None:
+            # the workspace keeps the latest state of each dataset (cleaned, appended rows, ...)
+            self.workspace.put(self._active, df, nbytes)
+        self.df_version += 1
+        self._search_index = None
+        self._profile = None
+
+    def _set_stream_profile(self, profile):
+        """Switch to out-of-core mode: no DataFrame, only streamed statistics."""
+        self._set_df(None)
+        self.history.reset(None)
+        self._update_history_buttons()
+        profile.version = self.df_version
+        self._profile = profile
+
+    def _no_data(self):
+        if self.df is not None:
+            return self.df.empty
+        # out-of-core mode: only a streamed profile, no rows in memory
+        return self._profile is None or self._profile.rows == 0
+
+    def _get_profile(self):
+        """Profile of the current data, rebuilt only after ``_set_df``.
+
+        In out-of-core mode (``self.df`` is None) this is the streamed profile, if any.
+        """
+        profile = self._profile
+        if self.df is None:
+            return profile
+        if profile is None or profile.version != self.df_version:
+            profile = DatasetProfile(self.df, self.df_version)
+            self._profile = profile
+        return profile
+
+    def _status_text(self, action, path, df):
+        text = f"{action}: {os.path.basename(path)} | Rows: {len(df)} | Cols: {len(df.columns)}"
+        for key in ("milo_cache", "milo_format", "milo_memory"):
+            if df.attrs.get(key):
+                text += f"\n{df.attrs[key]}"
+        return text
+
     def _format_value(self, v):
         if pd.isna(v):
             return ""
@@ -0,0 +1,398 @@
+"""
+Milo benchmarks: time the core data paths on synthetic datasets, without Tk.
+
+Each case is a generated delimited text file (rows x columns, dtype mix, null rate,
+cardinality, delimiter). Every operation runs in a fresh worker process against the same
+engine calls the app makes: ``try_read_data`` for Load, ``SearchIndex`` for the preview
+search, ``DatasetProfile`` plus the correlation heatmap for the dashboard, ``CleaningPlan``
+for Clean Data, the Agg-rendered line / bar / histogram figures, ``build_pdf_report`` and
+``export_frame``. Wall time is the median of ``--repeat`` runs; ``peak_mb`` is the highest
+resident memory during a run above what the worker held when it started (on Linux the
+high-water mark is reset before each run; elsewhere it is ``PerfLog``'s ``peak_rss_delta``,
+which reads 0 when setup had already gone higher). Results can be saved as a baseline and
+later runs compared against it.
+
+Usage:
+python milo_bench.py --save baseline.json
+python milo_bench.py --baseline baseline.json --tolerance 0.25
+python milo_bench.py --preset full --rows 1000000 --ops load,clean,export
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from milo_engine import (
+    CLEAN_STEPS, CORR_PREVIEW_ROWS, LOD_MIN_POINTS, CleaningPlan, ColumnBins, DatasetProfile, LineLOD, PerfLog,
+    SearchIndex, build_pdf_report, draw_heatmap, export_frame, format_bytes, group_aggregate, heatmap_view,
+    rss_bytes, try_read_data,
+)
+
+# ---------- Synthetic datasets ----------
+BENCH_MIXES = {                   # column kinds, repeated across the requested width
+    "numeric": ("int", "float"),
+    "mixed": ("int", "float", "text", "category", "datetime", "bool"),
+    "text": ("text", "category", "text", "int"),
+}
+BENCH_CARDINALITIES = {"low": 20, "medium": 5_000, "high": None}   # distinct values per column; None = one per row
+BENCH_DELIMITERS = {"comma": ",", "semicolon": ";", "tab": "\t", "pipe": "|"}
+BENCH_PRESETS = {
+    "quick": dict(rows=(10_000, 100_000), cols=(8,), mix=("mixed",), nulls=(0.05,), cardinality=("low",),
+                  delimiter=("comma",)),
+    "full": dict(rows=(10_000, 100_000, 1_000_000), cols=(8, 32), mix=tuple(BENCH_MIXES), nulls=(0.0, 0.2),
+                 cardinality=("low", "high"), delimiter=("comma", "tab")),
+}
+BENCH_SEED = 1234
+
+
+def case_name(rows, cols, mix, nulls, cardinality, delimiter):
+    """Stable key of one dataset, e.g. ``r100000-c8-mixed-n5-low-comma``."""
+    return f"r{rows}-c{cols}-{mix}-n{round(nulls * 100)}-{cardinality}-{delimiter}"
+
+
+def make_frame(rows, cols, mix="mixed", nulls=0.05, cardinality="low", seed=BENCH_SEED):
+    """Deterministic DataFrame of ``rows`` x ``cols``; the same arguments give the same data."""
+    rng = np.random.default_rng(seed)
+    distinct = BENCH_CARDINALITIES[cardinality] or rows
+    kinds = BENCH_MIXES[mix]
+    data = {}
+    for i in range(cols):
+        kind = kinds[i % len(kinds)]
+        codes = rng.integers(0, max(distinct, 1), rows)
+        if kind == "int":
+            s = pd.Series(codes * 7 - distinct)
+        elif kind == "float":
+            s = pd.Series(np.round(rng.normal(size=max(distinct, 1)) * 100, 4)[codes])
+        elif kind in ("text", "category"):
+            prefix = "item" if kind == "text" else "group"
+            vocab = np.array([f"{prefix}_{j}" for j in range(max(distinct, 1))], dtype=object)
+            s = pd.Series(vocab[codes])
+        elif kind == "datetime":
+            s = pd.Series(np.datetime64("2020-01-01T00:00:00", "s") + (codes * 3600).astype("timedelta64[s]"))
+        else:
+            s = pd.Series(codes % 2 == 1)
+        if nulls:
+            s = s.where(rng.random(rows) >= nulls)
+        data[f"{kind}_{i}"] = s
+    return pd.DataFrame(data)
+
+
+def write_dataset(path, rows, cols, mix="mixed", nulls=0.05, cardinality="low", delimiter="comma"):
+    """Write the case to ``path`` unless it is already there; returns the file size."""
+    if not os.path.exists(path):
+        df = make_frame(rows, cols, mix, nulls, cardinality)
+        tmp = path + ".part"
+        df.to_csv(tmp, sep=BENCH_DELIMITERS[delimiter], index=False)
+        os.replace(tmp, path)
+    return os.path.getsize(path)
+
+
+# ---------- Operations ----------
+def _axes(figsize=(8, 5)):
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot(111)
+
+
+def _numeric(df):
+    return [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+
+
+def _text(df):
+    return [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])
+            and not pd.api.types.is_datetime64_any_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+
+
+def bench_load(ctx):
+    ctx["df"] = try_read_data(ctx["path"])
+    return {"bytes": ctx["size"]}
+
+
+def bench_search(ctx):
+    # the preview search box: index once, then a query refined as it is typed, then a miss
+    index = SearchIndex(ctx["df"])
+    hits = [len(index.search(q)) for q in ("1", "12", "123", "zz-no-match")]
+    return {"hits": hits[2]}
+
+
+def bench_dashboard(ctx):
+    profile = DatasetProfile(ctx["df"], 0)
+    profile.missing_pct, profile.numeric_columns, profile.summary_text
+    result = profile.correlation(sample_rows=CORR_PREVIEW_ROWS)
+    if result is not None:
+        fig, ax = _axes((6, 5))
+        c, note = heatmap_view(result.matrix)
+        fig.colorbar(draw_heatmap(ax, c, list(c.columns), "Correlation (preview)", note), ax=ax)
+        fig.canvas.draw()
+
+
+def bench_clean(ctx):
+    df = CleaningPlan(CLEAN_STEPS).execute(ctx["df"])
+    return {"rows_out": len(df)}
+
+
+def bench_plot(ctx):
+    # a Line of two numeric columns (decimated when large, as in the app) and a grouped Bar
+    df = ctx["df"]
+    numeric, text = _numeric(df), _text(df)
+    if not numeric:
+        return {"skipped": "no numeric columns"}
+    x, y = df[numeric[0]], df[numeric[-1]]
+    fig, ax = _axes()
+    if len(df) > LOD_MIN_POINTS:
+        LineLOD(ax, x, y, linewidth=1.5)
+    else:
+        ax.plot(x, y, linewidth=1.5)
+    fig.canvas.draw()
+    if text:
+        grouped = group_aggregate(df, text[0], numeric[-1], "mean")
+        fig, ax = _axes()
+        ax.bar(grouped.index.astype(str), grouped.to_numpy())
+        fig.canvas.draw()
+
+
+def bench_histogram(ctx):
+    numeric = _numeric(ctx["df"])
+    if not numeric:
+        return {"skipped": "no numeric columns"}
+    counts, edges = ColumnBins(ctx["df"][numeric[-1]]).histogram(20)
+    fig, ax = _axes()
+    ax.stairs(counts, edges, fill=True)
+    fig.canvas.draw()
+
+
+def bench_pdf_report(ctx):
+    # rendered in-process, like batch mode, so the figure pool does not skew timings
+    path = os.path.join(ctx["tmpdir"], "report.pdf")
+    build_pdf_report(DatasetProfile(ctx["df"], 0), path, ctx["path"], parallel=False)
+    return {"bytes": os.path.getsize(path)}
+
+
+def bench_export(ctx):
+    return {"bytes": export_frame(ctx["df"], os.path.join(ctx["tmpdir"], "export.csv"))}
+
+
+BENCH_OPS = {
+    "load": bench_load,
+    "search": bench_search,
+    "dashboard": bench_dashboard,
+    "clean": bench_clean,
+    "plot": bench_plot,
+    "histogram": bench_histogram,
+    "pdf_report": bench_pdf_report,
+    "export": bench_export,
+}
+
+
+def _reset_peak_rss():
+    """Reset the kernel's RSS high-water mark (Linux); False where that is not possible."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    return None
+
+
+def run_op(op, path, case, repeat=3, trace_memory=False):
+    """Run one operation ``repeat`` times on the dataset at ``path``; meant for a fresh process.
+
+    Returns the summary row plus every ``PerfLog`` record under ``"perf"``.
+    """
+    perf = PerfLog()
+    perf.trace_memory = trace_memory
+    with tempfile.TemporaryDirectory(prefix="milo_bench_") as tmpdir:
+        ctx = {"path": path, "size": os.path.getsize(path), "tmpdir": tmpdir}
+        if op != "load":
+            ctx["df"] = try_read_data(path)
+        extra = {}
+        for _ in range(repeat):
+            reset = _reset_peak_rss()
+            rss0 = rss_bytes()
+            with perf.measure(op, case=case) as rec:
+                extra = BENCH_OPS[op](ctx) or {}
+                rec.update(extra)
+            if reset and rss0 is not None:
+                rec["peak_rss_delta"] = _peak_rss() - rss0
+    records = perf.snapshot()
+    walls = [rec["wall_s"] for rec in records]
+    rows, cols = ctx["df"].shape
+    wall = statistics.median(walls)
+    peaks = [rec["peak_rss_delta"] for rec in records if rec.get("peak_rss_delta") is not None]
+    result = {
+        "case": case, "op": op, "rows": rows, "cols": cols, "repeat": repeat,
+        "wall_s": round(wall, 6), "min_s": min(walls), "max_s": max(walls),
+        "cpu_s": round(statistics.median(rec["cpu_s"] for rec in records), 6),
+        "rows_per_s": round(rows / wall) if wall > 0 else None,
+        "mb_per_s": round(ctx["size"] / 2**20 / wall, 2) if op == "load" and wall > 0 else None,
+        "peak_mb": round(max(peaks) / 2**20, 1) if peaks else None,
+        "perf": records,
+    }
+    if trace_memory:
+        result["py_peak_mb"] = round(max(rec["py_peak_bytes"] for rec in records) / 2**20, 1)
+    if "skipped" in extra:
+        result["skipped"] = extra["skipped"]
+    return result
+
+
+# ---------- Baselines ----------
+BENCH_TOLERANCE = 0.25            # slowdown (fraction) reported as a regression
+BENCH_MIN_DELTA_S = 0.02          # differences below this are timer noise
+BENCH_MIN_DELTA_MB = 16           # peak memory growth below this is allocator noise
+
+
+def machine_info():
+    """What the numbers were measured on, stored with every result file."""
+    try:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        memory = None
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count(), "memory_bytes": memory,
+        "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+    }
+
+
+def save_results(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"machine": machine_info(), "results": [{k: v for k, v in r.items() if k != "perf"} for r in results]},
+                  f, indent=1, default=str)
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results, baseline, tolerance=BENCH_TOLERANCE):
+    """Table of current vs baseline wall time and peak memory per (case, op).
+
+    ``status`` is ``slower`` / ``more memory`` when the change exceeds ``tolerance`` and
+    the noise floors, ``faster`` for the mirror case, ``new`` without a baseline entry.
+    """
+    before = {(r["case"], r["op"]): r for r in baseline["results"]}
+    rows = []
+    for r in results:
+        b = before.get((r["case"], r["op"]))
+        row = {"case": r["case"], "op": r["op"], "wall_s": r["wall_s"], "peak_mb": r["peak_mb"]}
+        if b is None:
+            rows.append({**row, "status": "new"})
+            continue
+        ratio = r["wall_s"] / b["wall_s"] if b["wall_s"] else np.nan
+        delta = r["wall_s"] - b["wall_s"]
+        grew = (r["peak_mb"] or 0) - (b["peak_mb"] or 0)
+        if ratio > 1 + tolerance and delta > BENCH_MIN_DELTA_S:
+            status = "slower"
+        elif grew > BENCH_MIN_DELTA_MB and grew > (b["peak_mb"] or 0) * tolerance:
+            status = "more memory"
+        elif ratio < 1 / (1 + tolerance) and -delta > BENCH_MIN_DELTA_S:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append({**row, "base_wall_s": b["wall_s"], "ratio": round(ratio, 2),
+                     "base_peak_mb": b["peak_mb"], "status": status})
+    return pd.DataFrame(rows)
+
+
+# ---------- Command line ----------
+def _split(text, cast=str):
+    return tuple(cast(v) for v in text.split(",") if v)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="milo_bench", description="Benchmark Milo's core data paths on synthetic datasets.")
+    parser.add_argument("--preset", default="quick", choices=list(BENCH_PRESETS), help="dataset grid (default: quick)")
+    parser.add_argument("--rows", help="comma separated row counts (overrides the preset)")
+    parser.add_argument("--cols", help="comma separated column counts")
+    parser.add_argument("--mix", help=f"comma separated dtype mixes: {', '.join(BENCH_MIXES)}")
+    parser.add_argument("--nulls", help="comma separated null rates, e.g. 0,0.2")
+    parser.add_argument("--cardinality", help=f"comma separated: {', '.join(BENCH_CARDINALITIES)}")
+    parser.add_argument("--delimiter", help=f"comma separated: {', '.join(BENCH_DELIMITERS)}")
+    parser.add_argument("--ops", default=",".join(BENCH_OPS), help="comma separated operations (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per operation; the median is reported")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "milo_bench_data"),
+                        help="where generated datasets are kept and reused")
+    parser.add_argument("--trace-memory", action="store_true", help="also record the Python allocation peak (slower)")
+    parser.add_argument("--save", metavar="PATH", help="write the results (JSON) to PATH, e.g. as a new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=BENCH_TOLERANCE, help="allowed slowdown before failing (default: 0.25)")
+    parser.add_argument("--perf", metavar="PATH", help="append every timing record (JSON lines) to PATH")
+    args = parser.parse_args(argv)
+
+    grid = dict(BENCH_PRESETS[args.preset])
+    casts = {"rows": int, "cols": int, "nulls": float}
+    choices = {"mix": BENCH_MIXES, "cardinality": BENCH_CARDINALITIES, "delimiter": BENCH_DELIMITERS}
+    for axis in grid:
+        if getattr(args, axis):
+            grid[axis] = _split(getattr(args, axis), casts.get(axis, str))
+        unknown = [v for v in grid[axis] if axis in choices and v not in choices[axis]]
+        if unknown:
+            parser.error(f"unknown --{axis} value(s): {', '.join(unknown)}")
+    ops = _split(args.ops)
+    unknown = [op for op in ops if op not in BENCH_OPS]
+    if unknown:
+        parser.error(f"unknown operation(s): {', '.join(unknown)}")
+    baseline = load_results(args.baseline) if args.baseline else None
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = []
+    # one process per operation: every run starts from the same clean heap and RSS high-water mark
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+        for values in itertools.product(*grid.values()):
+            case = case_name(*values)
+            path = os.path.join(args.data_dir, f"{case}.csv")
+            size = write_dataset(path, *values)
+            print(f"{case}  ({format_bytes(size)})")
+            for op in ops:
+                try:
+                    r = pool.submit(run_op, op, path, case, args.repeat, args.trace_memory).result()
+                except Exception as e:
+                    print(f"  FAIL  {op:<11} {e}", file=sys.stderr)
+                    continue
+                results.append(r)
+                rate = f"{r['rows_per_s']:>12,} rows/s" if r["rows_per_s"] else ""
+                mb = f"  {r['mb_per_s']} MB/s" if r["mb_per_s"] else ""
+                peak = f"  peak +{r['peak_mb']} MB" if r["peak_mb"] is not None else ""
+                print(f"  {op:<11} {r['wall_s']:>9.3f}s {rate}{mb}{peak}{'  (' + r['skipped'] + ')' if 'skipped' in r else ''}")
+                if args.perf:
+                    with open(args.perf, "a", encoding="utf-8") as f:
+                        for rec in r["perf"]:
+                            f.write(json.dumps(rec, default=str) + "\n")
+
+    if args.save:
+        save_results(results, args.save)
+        print(f"Saved {len(results)} results to {args.save}")
+    if baseline is None:
+        return 0
+    table = compare(results, baseline, args.tolerance)
+    print(f"\nCompared with {args.baseline} ({baseline['machine'].get('time')}, {baseline['machine'].get('platform')}):")
+    print(table.to_string(index=False))
+    regressions = table[table["status"].isin(("slower", "more memory"))]
+    if len(regressions):
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
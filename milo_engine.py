@@ -0,0 +1,3419 @@
+"""
+Milo engine: the data side of Data Insight Pro, usable without Tk.
+
+Loading (format sniffing, chunked and streaming reads), cleaning, dataset profiling,
+correlation / histogram figures and PDF reports live here so they can be imported by
+scripts and batch jobs. Nothing in this module imports tkinter, customtkinter or pyplot;
+figures are drawn on the non-interactive Agg canvas.
+
+Batch usage:
+python milo_engine.py data/*.csv --out reports/ --clean dropna,dedup --csv --pdf -j 8
+"""
+
+import argparse
+import collections
+import cProfile
+import csv
+import gc
+import glob
+import gzip
+import hashlib
+import io
+import json
+import os
+import pstats
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import weakref
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait as futures_wait
+from contextlib import contextmanager
+from xml.etree import ElementTree
+from xml.parsers import expat
+from functools import cached_property, partial
+import pandas as pd
+import numpy as np
+from matplotlib import colors as mcolors, dates as mdates
+from matplotlib.figure import Figure
+import fpdf
+from fpdf import FPDF
+from PIL import Image
+
+# ---------- Loading ----------
+SNIFF_BYTES = 256 * 1024          # bounded sample used to detect the text format
+SNIFF_DELIMITERS = ",;\t|"
+LOAD_CHUNK_ROWS = 200_000         # rows per chunk for background loads
+LOAD_BLOCK_BYTES = 4 * 1024 * 1024  # text per record batch when pyarrow streams a background load
+# what pandas' pyarrow engine passes by default, so streamed and one-shot parses agree
+CSV_NULL_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+                   "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+CSV_TRUE_VALUES = ["1", "True", "TRUE", "true"]
+CSV_FALSE_VALUES = ["0", "False", "FALSE", "false"]
+
+try:
+    import pyarrow  # noqa: F401  (optional, enables the fastest CSV engine)
+    HAS_PYARROW = True
+except Exception:
+    HAS_PYARROW = False
+
+
+def _detect_encoding(raw):
+    """Pick an encoding for a byte sample (BOM first, then strict utf-8, then cp1252)."""
+    if raw.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    if raw.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "utf-16"
+    try:
+        raw.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        # a multi-byte char cut at the end of the sample is still valid utf-8
+        if e.start >= len(raw) - 3:
+            return "utf-8"
+    try:
+        raw.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def _detect_decimal(lines, sep):
+    """Return ',' when numbers in the sample use a decimal comma (only possible if sep != ',')."""
+    if sep == ",":
+        return "."
+    comma = dot = 0
+    for line in lines[1:50]:
+        for field in line.split(sep):
+            field = field.strip().strip('"')
+            if re.fullmatch(r"-?\d+,\d+", field):
+                comma += 1
+            elif re.fullmatch(r"-?\d+\.\d+", field):
+                dot += 1
+    return "," if comma > dot else "."
+
+
+def sniff_format(path, sample_bytes=SNIFF_BYTES):
+    """Detect delimiter, quoting, header row, encoding and decimal style from a byte sample.
+
+    Only the first ``sample_bytes`` of the file are read, so this is cheap regardless of file size.
+    ``fmt["size"]`` is the file size at this moment: the readers parse exactly that many bytes,
+    so rows appended to a growing file meanwhile are left for ``FileTail``.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        raw = f.read(sample_bytes)
+    encoding = _detect_encoding(raw)
+    text = raw.decode(encoding, errors="replace")
+    # drop the (possibly truncated) last line so the sniffer only sees complete rows
+    if len(raw) == sample_bytes and "\n" in text:
+        text = text[: text.rfind("\n")]
+    lines = text.splitlines()
+
+    fmt = {"sep": ",", "quotechar": '"', "header": 0, "encoding": encoding, "decimal": ".", "size": size}
+    if not lines:
+        return fmt
+    sniffer = csv.Sniffer()
+    try:
+        dialect = sniffer.sniff("\n".join(lines[:200]), delimiters=SNIFF_DELIMITERS)
+        fmt["sep"] = dialect.delimiter
+        fmt["quotechar"] = dialect.quotechar or '"'
+    except csv.Error:
+        # sniffer gave up: fall back to the delimiter that splits the first line the most
+        counts = {d: lines[0].count(d) for d in SNIFF_DELIMITERS}
+        best = max(counts, key=counts.get)
+        if counts[best] > 0:
+            fmt["sep"] = best
+    fmt["decimal"] = _detect_decimal(lines, fmt["sep"])
+    # the sniffer's header vote is unreliable on all-text tables, so only treat the first
+    # row as data when it also contains numbers (column names almost never do)
+    first = [f.strip().strip(fmt["quotechar"]) for f in lines[0].split(fmt["sep"])]
+    number = r"-?\d+([.,]\d+)?([eE][-+]?\d+)?"
+    try:
+        if not sniffer.has_header("\n".join(lines[:50])) and any(re.fullmatch(number, f) for f in first):
+            fmt["header"] = None
+    except csv.Error:
+        pass
+    return fmt
+
+
+def describe_format(fmt):
+    """Short human readable description of a sniffed format, shown in the status label."""
+    sep = {"\t": "tab", ",": "comma", ";": "semicolon", "|": "pipe"}.get(fmt["sep"], repr(fmt["sep"]))
+    parts = [sep, fmt["encoding"]]
+    if fmt["decimal"] != ".":
+        parts.append("decimal ','")
+    if fmt["header"] is None:
+        parts.append("no header")
+    parts.append(f"{fmt['engine']} engine")
+    return ", ".join(parts)
+
+
+class _FileHead(io.RawIOBase):
+    """Read-only binary view of the first ``size`` bytes of a file."""
+
+    def __init__(self, f, size):
+        self._f = f
+        self._left = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._left <= 0:
+            return 0
+        n = self._f.readinto(memoryview(b)[:min(len(b), self._left)])
+        self._left -= n
+        return n
+
+    def tell(self):
+        return self._f.tell()
+
+
+@contextmanager
+def _open_text(path, fmt):
+    """``path`` opened for parsing, cut off at the size recorded by ``sniff_format``."""
+    with open(path, "rb") as f:
+        yield _FileHead(f, fmt["size"]) if fmt.get("size") is not None else f
+
+
+def _read_text(path, fmt):
+    """Parse a delimited text file exactly once with the fastest engine that supports ``fmt``."""
+    kwargs = _csv_kwargs(fmt)
+    if _arrow_csv_supported(fmt):
+        try:
+            with _open_text(path, fmt) as f:
+                df = pd.read_csv(f, engine="pyarrow", **kwargs)
+            fmt["engine"] = "pyarrow"
+            return df
+        except Exception:
+            # pyarrow is stricter about ragged rows; the C engine gets the one real parse
+            pass
+    fmt["engine"] = "c"
+    with _open_text(path, fmt) as f:
+        return pd.read_csv(f, engine="c", **kwargs)
+
+
+def _arrow_csv_supported(fmt):
+    # pyarrow cannot decode non utf-8 input itself or handle decimal commas
+    return HAS_PYARROW and fmt["encoding"] in ("utf-8", "utf-8-sig") and fmt["decimal"] == "."
+
+
+def _read_text_arrow(path, fmt, progress, cancel):
+    """Stream ``path`` through pyarrow's CSV reader in record batches, honouring ``cancel``.
+
+    Options mirror ``pd.read_csv(engine="pyarrow")`` so the frame equals the one-shot parse.
+    Column types come from the first block; a later block that does not fit raises
+    ``pyarrow.ArrowInvalid``.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+
+    read_options = pacsv.ReadOptions(block_size=LOAD_BLOCK_BYTES, autogenerate_column_names=fmt["header"] is None)
+    parse_options = pacsv.ParseOptions(delimiter=fmt["sep"], quote_char=fmt["quotechar"] or False,
+                                       ignore_empty_lines=True)
+    convert_options = pacsv.ConvertOptions(null_values=CSV_NULL_VALUES, true_values=CSV_TRUE_VALUES,
+                                           false_values=CSV_FALSE_VALUES, strings_can_be_null=True)
+    total = fmt["size"]
+    rows = 0
+    batches = []
+    try:
+        with _open_text(path, fmt) as f:
+            reader = pacsv.open_csv(f, read_options=read_options, parse_options=parse_options,
+                                    convert_options=convert_options)
+            for batch in reader:
+                if cancel is not None and cancel.is_set():
+                    raise LoadCancelled()
+                batches.append(batch)
+                rows += batch.num_rows
+                if progress is not None:
+                    progress(min(f.tell(), total), total, rows)
+            table = pa.Table.from_batches(batches, schema=reader.schema)
+    except LoadCancelled:
+        batches.clear()
+        gc.collect()
+        raise
+    batches.clear()
+    # like pandas: columns with no values at all become float NaN
+    table = table.cast(pa.schema([field.with_type(pa.float64()) if pa.types.is_null(field.type) else field
+                                  for field in table.schema]))
+    df = table.to_pandas()
+    fmt["engine"] = "streaming pyarrow"
+    if progress is not None:
+        progress(total, total, len(df))
+    return df
+
+
+def _read_text_background(path, fmt, progress, cancel, chunksize):
+    """Cancellable parse with progress: pyarrow batches when possible, else C-engine chunks."""
+    if _arrow_csv_supported(fmt):
+        try:
+            return _read_text_arrow(path, fmt, progress, cancel)
+        except LoadCancelled:
+            raise
+        except Exception:
+            # types changed after the first block, ragged rows, ...: the C engine handles these
+            pass
+    return _read_text_chunked(path, fmt, progress, cancel, chunksize)
+
+
+def _csv_kwargs(fmt):
+    return dict(sep=fmt["sep"], quotechar=fmt["quotechar"], header=fmt["header"],
+                encoding=fmt["encoding"], decimal=fmt["decimal"])
+
+
+class LoadCancelled(Exception):
+    """Raised inside a loader when its cancel event is set."""
+
+
+def _iter_text_chunks(path, fmt, progress, cancel, chunksize):
+    """Yield DataFrame chunks from one C-engine pass over ``path``, honouring ``cancel``.
+
+    ``progress(bytes_read, total_bytes, rows)`` is called after every chunk.
+    """
+    total = fmt["size"]
+    rows = 0
+    with _open_text(path, fmt) as f:
+        reader = pd.read_csv(f, engine="c", chunksize=chunksize, **_csv_kwargs(fmt))
+        for chunk in reader:
+            if cancel is not None and cancel.is_set():
+                raise LoadCancelled()
+            if fmt["header"] is None:
+                chunk.columns = [f"col_{i + 1}" for i in range(chunk.shape[1])]
+            rows += len(chunk)
+            if progress is not None:
+                progress(f.tell(), total, rows)
+            yield chunk
+
+
+def _reconcile_chunk_dtypes(path, fmt, df, chunk_dtypes):
+    """Give ``df`` the dtypes a one-shot parse would have inferred.
+
+    Every chunk infers its own dtypes, so a column that is numeric in early chunks and text
+    later concatenates to ``object`` holding ints and strings. Those columns (and only
+    those) are parsed again on their own, which is what the single-pass reader returns.
+    """
+    mixed = [i for i, col in enumerate(df.columns)
+             if pd.api.types.is_object_dtype(df[col])
+             and len({str(dtypes.iloc[i]) for dtypes in chunk_dtypes}) > 1]
+    if not mixed:
+        return df
+    with _open_text(path, fmt) as f:
+        fixed = pd.read_csv(f, engine="c", usecols=mixed, **_csv_kwargs(fmt))
+    df = df.copy(deep=False)
+    for j, i in enumerate(mixed):
+        df.isetitem(i, fixed.iloc[:, j])
+    return df
+
+
+def _read_text_chunked(path, fmt, progress, cancel, chunksize):
+    """Read ``path`` chunk by chunk (see ``_iter_text_chunks``) and concatenate the result."""
+    fmt["engine"] = "chunked c"
+    chunks = []
+    try:
+        for chunk in _iter_text_chunks(path, fmt, progress, cancel, chunksize):
+            chunks.append(chunk)
+        if not chunks:
+            with _open_text(path, fmt) as f:
+                return pd.read_csv(f, engine="c", **_csv_kwargs(fmt))
+        df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+        df = _reconcile_chunk_dtypes(path, fmt, df, [chunk.dtypes for chunk in chunks])
+    except LoadCancelled:
+        # drop every parsed chunk now so a cancelled load gives its memory back
+        chunks.clear()
+        gc.collect()
+        raise
+    if progress is not None:
+        progress(fmt["size"], fmt["size"], len(df))
+    return df
+
+
+def iter_data_chunks(path, progress=None, cancel=None, chunksize=LOAD_CHUNK_ROWS):
+    """Yield ``path`` as a sequence of DataFrames without ever holding the whole file.
+
+    Excel sheets stream in row batches; JSON has no incremental reader and comes back as a single chunk.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in EXCEL_EXTS:
+        yield from iter_excel_chunks(path, progress=progress, cancel=cancel)
+        return
+    if ext in (".json",) + MAPPED_EXTS:
+        yield try_read_data(path, progress=progress, cancel=cancel)
+        return
+    fmt = sniff_format(path)
+    yield from _iter_text_chunks(path, fmt, progress, cancel, chunksize)
+
+
+def try_read_data(path, progress=None, cancel=None, chunksize=LOAD_CHUNK_ROWS, optimize=False, sheet=None,
+                  cell_range=None):
+    """Read a file robustly: sniff the text format once, then parse it in a single pass.
+
+    When ``progress`` or ``cancel`` (a ``threading.Event``) is given, text files are streamed
+    (pyarrow record batches, else C-engine chunks) so a background loader can report progress
+    and stop early (raises ``LoadCancelled``); the result equals the one-shot parse.
+    ``optimize=True`` runs ``optimize_dtypes`` on the result. For workbooks, ``sheet`` and
+    ``cell_range`` pick what to read (see ``read_excel_fast``).
+    The detected format is stored in ``df.attrs["milo_format"]`` for display.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in MAPPED_EXTS:
+        df = read_mapped(path)
+        if progress is not None:
+            size = os.path.getsize(path)
+            progress(size, size, len(df))
+    elif ext in EXCEL_EXTS:
+        df = read_excel_fast(path, sheet, cell_range, progress=progress, cancel=cancel)
+    elif ext == ".json":
+        df = pd.read_json(path)
+        if cancel is not None and cancel.is_set():
+            del df
+            gc.collect()
+            raise LoadCancelled()
+        if progress is not None:
+            size = os.path.getsize(path)
+            progress(size, size, len(df))
+    else:
+        fmt = sniff_format(path)
+        if progress is None and cancel is None:
+            df = _read_text(path, fmt)
+        else:
+            df = _read_text_background(path, fmt, progress, cancel, chunksize)
+        if fmt["header"] is None and fmt["engine"] != "chunked c":
+            # option menus and tree headings expect string column names (chunks are renamed as read)
+            df.columns = [f"col_{i + 1}" for i in range(df.shape[1])]
+        df.attrs["milo_format"] = describe_format(fmt)
+        df.attrs["milo_bytes"] = fmt["size"]       # where FileTail resumes
+    if optimize:
+        df = optimize_dtypes(df)
+    return df
+
+
+# ---------- Excel input ----------
+EXCEL_EXTS = (".xlsx", ".xlsm", ".xls")
+EXCEL_BATCH_ROWS = 50_000         # worksheet rows turned into typed columns at a time
+XLSX_READ_BYTES = 1024 * 1024     # decompressed sheet XML fed to the parser per step
+_CELL_REF = re.compile(r"^\$?([A-Za-z]{0,3})\$?(\d*)$")
+_BUILTIN_DATE_FORMATS = set(range(14, 23)) | set(range(27, 37)) | {45, 46, 47} | set(range(50, 59))
+_FORMAT_LITERALS = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.|_.|\*.')
+_EXCEL_EPOCHS = {False: np.datetime64("1899-12-30", "ms"), True: np.datetime64("1904-01-01", "ms")}
+
+try:
+    import python_calamine  # noqa: F401  (optional, native reader for xlsx / xls)
+    HAS_CALAMINE = True
+except Exception:
+    HAS_CALAMINE = False
+
+
+def _column_number(letters):
+    col = 0
+    for ch in letters.upper():
+        col = col * 26 + ord(ch) - 64
+    return col
+
+
+def parse_cell_range(ref):
+    """``"B2:F100"`` -> ``(min_row, min_col, max_row, max_col)``, 1-based.
+
+    Either side may leave out the row or the column (``"B:F"``, ``"2:500"``); a single
+    corner (``"B2"``) means from there to the end of the sheet. Open ends are None.
+    """
+    start, _, end = ref.replace(" ", "").partition(":")
+    bounds = []
+    for part in (start, end):
+        m = _CELL_REF.match(part)
+        if m is None:
+            raise ValueError(f"Bad cell range {ref!r}; use e.g. A1:F500, B:F or 2:500")
+        letters, digits = m.groups()
+        bounds.append((int(digits) if digits else None, _column_number(letters) or None))
+    (min_row, min_col), (max_row, max_col) = bounds
+    return min_row or 1, min_col or 1, max_row, max_col
+
+
+def _local(tag):
+    return tag.rpartition("}")[2]
+
+
+def _xlsx_book(z):
+    """Sheet name -> zip member, plus the shared-strings / styles members and the 1904 flag."""
+    rels = ElementTree.fromstring(z.read("xl/_rels/workbook.xml.rels"))
+    targets, parts = {}, {"strings": None, "styles": None}
+    for el in rels:
+        target = el.get("Target", "")
+        target = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+        targets[el.get("Id")] = target
+        kind = el.get("Type", "").rpartition("/")[2]
+        if kind == "sharedStrings":
+            parts["strings"] = target
+        elif kind == "styles":
+            parts["styles"] = target
+    sheets, date1904 = {}, False
+    for el in ElementTree.fromstring(z.read("xl/workbook.xml")).iter():
+        tag = _local(el.tag)
+        if tag == "workbookPr":
+            date1904 = el.get("date1904", "0").lower() in ("1", "true")
+        elif tag == "sheet":
+            rid = next(v for k, v in el.attrib.items() if _local(k) == "id")
+            sheets[el.get("name")] = targets[rid]
+    return sheets, parts, date1904
+
+
+def _xlsx_shared_strings(z, member):
+    """The shared string table as an object array (rich-text runs joined, phonetic hints skipped)."""
+    strings = []
+    if member is None or member not in z.NameToInfo:
+        return np.array(strings, dtype=object)
+    parts, in_text, phonetic = [], False, 0
+
+    def start(name, attrs):
+        nonlocal parts, in_text, phonetic
+        name = name.rpartition(":")[2]
+        if name == "si":
+            parts = []
+        elif name == "t":
+            in_text = not phonetic
+        elif name == "rPh":
+            phonetic += 1
+
+    def end(name):
+        nonlocal in_text, phonetic
+        name = name.rpartition(":")[2]
+        if name == "si":
+            strings.append("".join(parts))
+        elif name == "t":
+            in_text = False
+        elif name == "rPh":
+            phonetic -= 1
+
+    def text(data):
+        if in_text:
+            parts.append(data)
+
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler, parser.EndElementHandler, parser.CharacterDataHandler = start, end, text
+    with z.open(member) as f:
+        parser.ParseFile(f)
+    return np.array(strings, dtype=object)
+
+
+def _is_date_format(code):
+    return re.search(r"[dmyhs]", _FORMAT_LITERALS.sub("", code), re.IGNORECASE) is not None
+
+
+def _xlsx_date_styles(z, member):
+    """Cell style indices (as the strings found in ``s=""``) whose number format is a date/time."""
+    if member is None or member not in z.NameToInfo:
+        return set()
+    root = ElementTree.fromstring(z.read(member))
+    formats = {el.get("numFmtId"): el.get("formatCode", "") for el in root.iter() if _local(el.tag) == "numFmt"}
+    xfs = next((el for el in root.iter() if _local(el.tag) == "cellXfs"), ())
+    dates = set()
+    for i, xf in enumerate(xfs):
+        fid = xf.get("numFmtId", "0")
+        if _is_date_format(formats[fid]) if fid in formats else int(fid) in _BUILTIN_DATE_FORMATS:
+            dates.add(str(i))
+    return dates
+
+
+def _xlsx_values(kind, texts, strings, epoch):
+    """Typed array for cells of one kind from their raw XML text, or None for error cells."""
+    if kind == "n":
+        return np.array(texts, dtype=np.float64)
+    if kind == "date":
+        ms = np.round(np.array(texts, dtype=np.float64) * 86_400_000).astype(np.int64)
+        return (epoch + ms.astype("timedelta64[ms]")).astype("datetime64[us]")
+    if kind == "s":
+        return strings[np.array(texts, dtype=np.int64)]
+    if kind == "b":
+        return np.array(texts, dtype=object) == "1"
+    if kind == "d":
+        return pd.to_datetime(pd.Series(texts), errors="coerce").to_numpy()
+    if kind == "e":
+        return None
+    return np.array(texts, dtype=object)            # str (formula result) / inlineStr
+
+
+def _xlsx_column(parts, n, strings, epoch):
+    """One column of ``n`` rows from ``{kind: (positions, texts)}``; a single kind stays typed."""
+    if len(parts) == 1:
+        (kind, (pos, texts)), = parts.items()
+        values = _xlsx_values(kind, texts, strings, epoch)
+        if values is None:
+            return np.full(n, np.nan)
+        if len(pos) == n:                           # positions are unique and increasing: every row is set
+            if kind == "n" and np.all(np.mod(values, 1) == 0) and np.all(np.abs(values) < 2 ** 53):
+                return values.astype(np.int64)
+            return values
+        if values.dtype.kind in "fM":
+            out = np.full(n, np.nan if values.dtype.kind == "f" else np.datetime64("NaT"), dtype=values.dtype)
+            out[pos] = values
+            return out
+    out = np.full(n, None, dtype=object)
+    for kind, (pos, texts) in parts.items():
+        values = _xlsx_values(kind, texts, strings, epoch)
+        if values is not None:
+            if kind == "n":
+                values = [int(v) if v.is_integer() else v for v in values.tolist()]
+            out[pos] = values if kind != "date" else list(pd.DatetimeIndex(values))
+    return out
+
+
+def _iter_xlsx_batches(path, sheet, bounds, batch_rows, cancel):
+    """Yield ``(frame, fraction_read)`` for one .xlsx worksheet, typed ``batch_rows`` at a time.
+
+    The sheet XML is decompressed and fed to expat ``XLSX_READ_BYTES`` at a time; each
+    cell's raw text goes into a per-(column, kind) list and is converted column-wise with
+    numpy when its batch is complete, so no per-cell Python objects outlive a batch.
+    Parsing stops at ``max_row``; empty rows after the last value are dropped, even when
+    they run past a batch boundary.
+    """
+    min_row, min_col, max_row, max_col = bounds
+    max_row = max_row or sys.maxsize
+    max_col = max_col or sys.maxsize
+    with zipfile.ZipFile(path) as z:
+        sheets, book_parts, date1904 = _xlsx_book(z)
+        if sheet not in sheets:
+            raise ValueError(f"No sheet named {sheet!r}")
+        strings = _xlsx_shared_strings(z, book_parts["strings"])
+        date_styles = _xlsx_date_styles(z, book_parts["styles"])
+        epoch = _EXCEL_EPOCHS[date1904]
+        member = z.getinfo(sheets[sheet])
+
+        header, names, dtypes = {}, [], {}
+        buckets, ready = {}, []
+        col_cache = {}
+        state = {"row": 0, "col": 0, "kind": None, "keep": False, "header_row": None, "start": None, "last": None}
+        buf, in_text, phonetic, done = None, False, 0, False
+
+        def column_names(upto):
+            values = [header.get(c) for c in range(min_col, upto + 1)]
+            return _excel_header(values)
+
+        def flush(n):
+            nonlocal buckets
+            by_col = {}
+            for (c, kind), part in buckets.items():
+                by_col.setdefault(c, {})[kind] = part
+            buckets = {}
+            upto = max([c for c in by_col] + [c for c in header] + [min_col + len(names) - 1])
+            names[:] = column_names(upto)
+            data = {}
+            for i, name in enumerate(names):
+                c = min_col + i
+                if c in by_col:
+                    data[name] = pd.Series(_xlsx_column(by_col[c], n, strings, epoch))
+                elif name in dtypes:
+                    # keep a column's dtype in batches where it happens to be empty
+                    dtype = dtypes[name] if dtypes[name].kind not in "iub" else np.float64
+                    data[name] = pd.Series(index=pd.RangeIndex(n), dtype=dtype)
+            frame = pd.DataFrame(data)
+            dtypes.update(frame.dtypes.items())
+            ready.append(frame)
+
+        def start(name, attrs):
+            nonlocal buf, in_text, phonetic, done
+            name = name.rpartition(":")[2]
+            if name == "c":
+                ref = attrs.get("r")
+                if ref is None:
+                    col = state["col"] + 1
+                else:
+                    letters = ref.rstrip("0123456789")
+                    col = col_cache.get(letters)
+                    if col is None:
+                        col = col_cache[letters] = _column_number(letters)
+                state["col"] = col
+                kind = attrs.get("t", "n")
+                if kind == "n" and attrs.get("s") in date_styles:
+                    kind = "date"
+                state["kind"] = kind
+                state["keep"] = min_col <= col <= max_col and min_row <= state["row"] <= max_row
+                buf = None
+            elif name == "v" or name == "t":
+                if state["keep"] and not phonetic:
+                    in_text = True
+                    if buf is None:
+                        buf = []
+            elif name == "row":
+                r = attrs.get("r")
+                row = state["row"] = int(r) if r else state["row"] + 1
+                state["col"] = 0
+                if row > max_row:
+                    done = True
+            elif name == "rPh":
+                phonetic += 1
+
+        def end(name):
+            nonlocal buf, in_text, phonetic
+            name = name.rpartition(":")[2]
+            if name == "c":
+                if buf is not None:
+                    text = buf[0] if len(buf) == 1 else "".join(buf)
+                    buf = None
+                    row, col, kind = state["row"], state["col"], state["kind"]
+                    if state["header_row"] is None:
+                        state["header_row"] = row
+                        state["start"] = row + 1
+                    if row == state["header_row"]:
+                        values = _xlsx_values(kind, [text], strings, epoch)
+                        value = None if values is None else values[0]
+                        if isinstance(value, float) and value.is_integer():
+                            value = int(value)
+                        header[col] = None if value is None else str(value)
+                        return
+                    # a batch is only complete once a later row holds a value, so
+                    # blank (styled) rows at the end of the sheet are never emitted
+                    first = state["start"]
+                    while row >= first + batch_rows:
+                        flush(batch_rows)
+                        first = state["start"] = first + batch_rows
+                    part = buckets.get((col, kind))
+                    if part is None:
+                        part = buckets[(col, kind)] = ([], [])
+                    part[0].append(row - state["start"])
+                    part[1].append(text)
+                    state["last"] = row
+            elif name == "v" or name == "t":
+                in_text = False
+            elif name == "rPh":
+                phonetic -= 1
+
+        def text(data):
+            if in_text:
+                buf.append(data)
+
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler, parser.EndElementHandler, parser.CharacterDataHandler = start, end, text
+        with z.open(member) as f:
+            while not done:
+                data = f.read(XLSX_READ_BYTES)
+                parser.Parse(data, not data)
+                if cancel is not None and cancel.is_set():
+                    raise LoadCancelled()
+                for frame in ready:
+                    yield frame, f.tell() / max(member.file_size, 1)
+                ready.clear()
+                if not data:
+                    break
+        if state["last"] is not None and state["last"] >= state["start"]:
+            flush(state["last"] - state["start"] + 1)
+        elif not dtypes:
+            names[:] = column_names(max(header, default=min_col - 1))
+            ready.append(pd.DataFrame({name: pd.Series(dtype=object) for name in names}))
+        for frame in ready:
+            yield frame, 1.0
+
+
+def excel_sheets(path):
+    """Sheet names in workbook order; for .xlsx only the workbook index is read, no cells."""
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+        with zipfile.ZipFile(path) as z:
+            return list(_xlsx_book(z)[0])
+    if HAS_CALAMINE:
+        from python_calamine import CalamineWorkbook
+        return list(CalamineWorkbook.from_path(path).sheet_names)
+    with pd.ExcelFile(path) as book:
+        return list(book.sheet_names)
+
+
+def _excel_reader(path):
+    if HAS_CALAMINE:
+        return "calamine"
+    return "streaming xml" if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm") else "pandas"
+
+
+def _excel_rows(path, sheet, bounds):
+    """``(rows, total)``: the cells inside ``bounds`` row by row, and the row count (calamine / .xls)."""
+    min_row, min_col, max_row, max_col = bounds
+    if HAS_CALAMINE:
+        from python_calamine import CalamineWorkbook
+        values = CalamineWorkbook.from_path(path).get_sheet_by_name(sheet).to_python(skip_empty_area=False)
+        values = values[min_row - 1:max_row]
+        # calamine reports empty cells as ""
+        return ([None if v == "" else v for v in row[min_col - 1:max_col]] for row in values), len(values)
+    df = pd.read_excel(path, sheet_name=sheet, header=None).iloc[min_row - 1:max_row, min_col - 1:max_col]
+    df = df.astype(object).where(df.notna(), None)
+    return df.itertuples(index=False, name=None), len(df)
+
+
+def _excel_header(row):
+    """Column names like ``pd.read_excel``: blanks become ``Unnamed: i``, repeats get ``.1``, ``.2``..."""
+    names, seen = [], {}
+    for i, v in enumerate(row):
+        name = f"Unnamed: {i}" if v is None or v == "" else str(v)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        seen.setdefault(name, 0)
+        names.append(name)
+    return names
+
+
+def _excel_batch(rows, columns):
+    """Typed frame from a list of row tuples; each column's dtype is inferred in one pass."""
+    width = max(map(len, rows), default=0)
+    for i in range(len(columns), width):
+        columns.append(f"Unnamed: {i}")
+    width = len(columns)
+    if any(len(r) != width for r in rows):
+        rows = [tuple(r) + (None,) * (width - len(r)) for r in rows]
+    cols = list(zip(*rows)) if rows else [()] * width
+    return pd.DataFrame({name: pd.Series(values) for name, values in zip(columns, cols)})
+
+
+def _iter_excel_rows(rows, total, batch_rows, cancel):
+    """``_iter_xlsx_batches`` for row-wise readers: ``(frame, fraction_read)`` per batch."""
+    header = None
+    for header in rows:
+        if any(v is not None for v in header):
+            break
+    columns = _excel_header(header or ())
+    batch, blank, done = [], 0, 0
+    for row in rows:
+        if all(v is None for v in row):
+            blank += 1              # only kept if a non-empty row follows
+            continue
+        if blank:
+            batch.extend([()] * blank)
+            blank = 0
+        batch.append(row)
+        if len(batch) >= batch_rows:
+            if cancel is not None and cancel.is_set():
+                raise LoadCancelled()
+            done += len(batch)
+            yield _excel_batch(batch, columns), done / max(total, 1)
+            batch = []
+    if batch or not done:
+        yield _excel_batch(batch, columns), 1.0
+
+
+def iter_excel_chunks(path, sheet=None, cell_range=None, progress=None, cancel=None, batch_rows=EXCEL_BATCH_ROWS):
+    """Yield one worksheet as typed DataFrames of about ``batch_rows`` rows.
+
+    ``sheet`` is a name or 0-based position (default: the first sheet); ``cell_range`` limits
+    the cells read (see ``parse_cell_range``) and its first non-empty row is the header.
+    .xlsx sheets are parsed as their XML decompresses (``_iter_xlsx_batches``) unless
+    python-calamine is installed, whose native reader is faster still; .xls needs calamine
+    or xlrd. Empty rows after the last value are dropped. ``progress`` / ``cancel`` work as
+    in ``try_read_data``; progress bytes are estimated from the share of the sheet read.
+    """
+    sheets = excel_sheets(path)
+    if sheet is None or isinstance(sheet, int):
+        sheet = sheets[sheet or 0]
+    elif sheet not in sheets:
+        raise ValueError(f"No sheet named {sheet!r}; the workbook has {', '.join(sheets)}")
+    bounds = parse_cell_range(cell_range) if cell_range else (1, 1, None, None)
+    if _excel_reader(path) == "streaming xml":
+        batches = _iter_xlsx_batches(path, sheet, bounds, batch_rows, cancel)
+    else:
+        batches = _iter_excel_rows(*_excel_rows(path, sheet, bounds), batch_rows, cancel)
+    size = os.path.getsize(path)
+    rows = 0
+    for frame, fraction in batches:
+        rows += len(frame)
+        if progress is not None:
+            progress(int(size * min(fraction, 1.0)), size, rows)
+        yield frame
+
+
+def read_excel_fast(path, sheet=None, cell_range=None, progress=None, cancel=None, batch_rows=EXCEL_BATCH_ROWS):
+    """Read a worksheet (see ``iter_excel_chunks``); a list of sheets is stacked with a ``sheet`` column."""
+    if isinstance(sheet, (list, tuple)):
+        sheet = list(dict.fromkeys(sheet))
+        parts = [read_excel_fast(path, s, cell_range, progress, cancel, batch_rows) for s in sheet]
+        df = pd.concat(parts, ignore_index=True, sort=False)
+        codes = np.repeat(np.arange(len(parts), dtype=np.int32), [len(p) for p in parts])
+        df.insert(0, "sheet" if "sheet" not in df.columns else "_sheet",
+                  pd.Categorical.from_codes(codes, categories=[str(s) for s in sheet]))
+        where = f"sheets {', '.join(map(repr, sheet))}"
+    else:
+        chunks = []
+        try:
+            chunks.extend(iter_excel_chunks(path, sheet, cell_range, progress, cancel, batch_rows))
+        except LoadCancelled:
+            chunks.clear()
+            gc.collect()
+            raise
+        df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+        where = f"sheet {excel_sheets(path)[0] if sheet is None else sheet!r}"
+    df.attrs["milo_format"] = f"Excel {where}{f' {cell_range}' if cell_range else ''} via {_excel_reader(path)}"
+    return df
+
+
+# ---------- Memory-mapped columnar input ----------
+MAPPED_EXTS = (".feather", ".arrow", ".ipc", ".npy")
+
+
+def _arrow_column(col, numpy_type=None):
+    """pandas array for one Arrow column, sharing the Arrow buffers whenever possible.
+
+    Null-free numeric columns in a single chunk become read-only numpy views and strings
+    stay Arrow-backed; anything else (nulls, dictionaries, timestamps) is converted, which
+    copies only that column. ``numpy_type`` is the dtype pandas recorded when it wrote the
+    file (``"str"``, ``"object"``, ``"string"``); text comes back as that dtype.
+    """
+    import pyarrow as pa
+
+    typ = col.type
+    if (pa.types.is_integer(typ) or pa.types.is_floating(typ)) and col.null_count == 0 and col.num_chunks == 1:
+        return col.chunk(0).to_numpy(zero_copy_only=True)
+    if pa.types.is_string(typ) or pa.types.is_large_string(typ):
+        if numpy_type == "object":
+            return col.to_pandas().astype(object)       # a Series: the frame must not re-infer str
+        if numpy_type == "str":
+            # pandas' default text dtype: Arrow storage, NaN for missing values
+            return pd.array(col, dtype=pd.StringDtype("pyarrow", na_value=np.nan))
+        if pa.types.is_large_string(typ):
+            return pd.arrays.ArrowStringArray(col)
+        return pd.array(col, dtype=pd.StringDtype("pyarrow"))
+    return col.to_pandas()
+
+
+def _table_to_frame(table):
+    meta = table.schema.metadata or {}
+    pandas_meta = {}
+    if b"pandas" in meta:
+        try:
+            pandas_meta = json.loads(meta[b"pandas"])
+        except ValueError:
+            pass
+    numpy_types = {c.get("field_name"): c.get("numpy_type") for c in pandas_meta.get("columns", [])}
+    cols = {name: _arrow_column(col, numpy_types.get(name)) for name, col in zip(table.column_names, table.columns)}
+    df = pd.DataFrame(cols, copy=False)
+    df.attrs.update(pandas_meta.get("attributes") or {})
+    if b"PANDAS_ATTRS" in meta:
+        try:
+            df.attrs.update(json.loads(meta[b"PANDAS_ATTRS"]))
+        except ValueError:
+            pass
+    return df
+
+
+def read_arrow_mapped(path):
+    """Open an Arrow IPC / Feather v2 file through a memory map without copying column data.
+
+    Pages are read from disk only when a view touches them, so opening is near instant and
+    resident memory follows what is actually looked at. Compressed files cannot be mapped
+    and are decompressed into memory instead.
+    """
+    import pyarrow as pa
+
+    source = pa.memory_map(path, "r")
+    try:
+        table = pa.ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        # Feather v1 / stream format: fall back to the regular reader
+        from pyarrow import feather
+        table = feather.read_table(path, memory_map=True)
+    return _table_to_frame(table)
+
+
+def read_npy_mapped(path):
+    """Wrap a ``.npy`` array (2D or structured) in a DataFrame backed by ``np.load(mmap_mode='r')``."""
+    # a plain ndarray view of the map: columns should not carry the np.memmap subclass around
+    arr = np.load(path, mmap_mode="r", allow_pickle=False).view(np.ndarray)
+    if arr.dtype.names:
+        return pd.DataFrame({name: arr[name] for name in arr.dtype.names}, copy=False)
+    if arr.ndim == 1:
+        arr = arr.reshape(-1, 1)
+    return pd.DataFrame(arr, columns=[f"col_{i + 1}" for i in range(arr.shape[1])], copy=False)
+
+
+def read_mapped(path):
+    df = read_npy_mapped(path) if path.lower().endswith(".npy") else read_arrow_mapped(path)
+    df.attrs["milo_format"] = "memory-mapped, zero-copy"
+    return df
+
+
+# ---------- Memory optimization ----------
+CATEGORY_MAX_RATIO = 0.05         # distinct/rows below this -> category ...
+CATEGORY_MAX_DISTINCT = 32_767    # ... and at most this many distinct values (int16 codes)
+DATE_PATTERN = re.compile(r"^\s*\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}([ T]\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?)?\s*$")
+
+
+def _looks_like_dates(s, sample=1000):
+    head = s.dropna().head(sample)
+    if not len(head):
+        return False
+    return head.astype(str).str.match(DATE_PATTERN).mean() > 0.95
+
+
+def _optimize_column(s):
+    """Smallest lossless representation of one column, or ``s`` itself if nothing fits."""
+    if pd.api.types.is_bool_dtype(s) or isinstance(s.dtype, pd.CategoricalDtype):
+        return s
+    if pd.api.types.is_integer_dtype(s):
+        return pd.to_numeric(s, downcast="integer")
+    if pd.api.types.is_float_dtype(s):
+        down = s.astype(np.float32)
+        # only keep float32 when every value survives the round trip unchanged
+        if np.array_equal(down.to_numpy(dtype=np.float64), s.to_numpy(dtype=np.float64), equal_nan=True):
+            return down
+        return s
+    if pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
+        non_null = int(s.notna().sum())
+        if non_null and _looks_like_dates(s):
+            parsed = pd.to_datetime(s, errors="coerce")
+            if int(parsed.notna().sum()) == non_null:
+                return parsed
+        distinct = s.nunique(dropna=True) if non_null else 0
+        if non_null and distinct <= CATEGORY_MAX_DISTINCT and distinct / max(len(s), 1) < CATEGORY_MAX_RATIO:
+            return s.astype("category")
+        # infer_dtype scans in C and stops at the first non-string value
+        if HAS_PYARROW and pd.api.types.is_object_dtype(s) and pd.api.types.infer_dtype(s, skipna=True) == "string":
+            return s.astype("string[pyarrow]")
+    return s
+
+
+def optimize_dtypes(df):
+    """Downcast numerics, categorize low-cardinality text, Arrow-back other text, parse dates.
+
+    Returns a new frame; ``df.attrs["milo_memory"]`` records the before/after footprint.
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    out = pd.DataFrame({c: _optimize_column(df[c]) for c in df.columns}, index=df.index)
+    out.columns = df.columns
+    out.attrs.update(df.attrs)
+    after = int(out.memory_usage(deep=True).sum())
+    out.attrs["milo_memory"] = f"memory {format_bytes(before)} -> {format_bytes(after)}"
+    return out
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+# ---------- Parsed-frame cache ----------
+CACHE_DIR = os.environ.get("MILO_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "milo"))
+CACHE_MAX_BYTES = int(os.environ.get("MILO_CACHE_MAX_MB", "4096")) * 1024 * 1024
+CACHE_HASH_BYTES = 1024 * 1024    # bytes hashed from each end of the source file
+
+
+class FrameCache:
+    """On-disk Feather cache of parsed files, keyed by path, size, mtime and a content hash.
+
+    The content hash covers the first and last ``CACHE_HASH_BYTES`` of the file so that
+    validating a multi-GB source stays cheap. Hits are memory-mapped back
+    without copying (see ``read_arrow_mapped``).
+    The directory is capped at ``max_bytes``; least recently used entries are evicted.
+    Without pyarrow the cache is disabled and every call is a miss.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = HAS_PYARROW
+
+    def key(self, path, **options):
+        st = os.stat(path)
+        h = hashlib.sha1()
+        h.update(os.path.abspath(path).encode("utf-8", "replace"))
+        h.update(f"{st.st_size}:{st.st_mtime_ns}:{sorted(options.items())}".encode())
+        with open(path, "rb") as f:
+            h.update(f.read(CACHE_HASH_BYTES))
+            if st.st_size > 2 * CACHE_HASH_BYTES:
+                f.seek(-CACHE_HASH_BYTES, os.SEEK_END)
+                h.update(f.read(CACHE_HASH_BYTES))
+        return h.hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.directory, f"{key}.feather")
+
+    def get(self, path, **options):
+        """Cached frame for ``path`` or None."""
+        if not self.enabled:
+            return None
+        entry = self._file(self.key(path, **options))
+        if not os.path.exists(entry):
+            return None
+        try:
+            df = read_arrow_mapped(entry)
+        except Exception:
+            # unreadable/partial entry: drop it and fall back to parsing
+            self._remove(entry)
+            return None
+        os.utime(entry)  # mtime doubles as the LRU timestamp
+        return df
+
+    def put(self, path, df, **options):
+        """Store ``df``; returns False when it could not be written (e.g. a column Arrow can't type)."""
+        if not self.enabled:
+            return False
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self._file(self.key(path, **options))
+        tmp = f"{entry}.{os.getpid()}.tmp"
+        try:
+            out = df.reset_index(drop=True)
+            out.columns = [str(c) for c in out.columns]
+            # uncompressed, single record batch: hits can then be mapped without copying;
+            # attrs (detected format, memory note) travel in the schema metadata
+            import pyarrow as pa
+            from pyarrow import feather
+            table = pa.Table.from_pandas(out, preserve_index=False)
+            attrs = {k: v for k, v in df.attrs.items() if k != "milo_cache"}
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                                   b"PANDAS_ATTRS": json.dumps(attrs, default=str)})
+            feather.write_feather(table, tmp, compression="uncompressed", chunksize=max(len(out), 1))
+            os.replace(tmp, entry)
+        except Exception:
+            self._remove(tmp)
+            return False
+        self.evict()
+        return True
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in ``max_bytes``."""
+        try:
+            entries = [os.path.join(self.directory, n) for n in os.listdir(self.directory) if n.endswith(".feather")]
+        except OSError:
+            return
+        stats = []
+        for e in entries:
+            try:
+                st = os.stat(e)
+                stats.append((st.st_mtime, st.st_size, e))
+            except OSError:
+                continue
+        total = sum(size for _, size, _ in stats)
+        for _, size, e in sorted(stats):
+            if total <= self.max_bytes:
+                break
+            self._remove(e)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def read_data_cached(path, cache, progress=None, cancel=None, optimize=False, sheet=None, cell_range=None):
+    """``try_read_data`` through ``cache``; ``df.attrs["milo_cache"]`` says hit or miss.
+
+    Columnar inputs are already mapped directly and bypass the cache. A workbook's sheet
+    and range selection is part of the cache key.
+    """
+    if os.path.splitext(path)[1].lower() in MAPPED_EXTS:
+        return try_read_data(path, progress=progress, cancel=cancel, optimize=optimize)
+    options = {"optimize": optimize}
+    if sheet is not None or cell_range:
+        options.update(sheet=sheet, cell_range=cell_range)
+    df = cache.get(path, **options)
+    if df is not None:
+        if progress is not None:
+            size = os.path.getsize(path)
+            progress(size, size, len(df))
+        df.attrs["milo_cache"] = "cache hit"
+        return df
+    df = try_read_data(path, progress=progress, cancel=cancel, optimize=optimize, sheet=sheet, cell_range=cell_range)
+    # a file that grew while it was parsed would be cached under its new size with only the old rows
+    grown = df.attrs.get("milo_bytes", os.path.getsize(path)) != os.path.getsize(path)
+    stored = not grown and cache.put(path, df, **options)
+    df.attrs["milo_cache"] = ("cache miss (stored)" if stored else
+                              "cache miss (not stored)" if cache.enabled else "not cached (needs pyarrow)")
+    return df
+
+
+# ---------- Workspace ----------
+WORKSPACE_MEMORY_BYTES = int(os.environ.get("MILO_WORKSPACE_MEMORY_MB", "2048")) * 1024 * 1024
+COMBINE_MODES = ("concat", "inner", "left", "outer")
+
+
+def frame_bytes(df):
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+class Workspace:
+    """Several named frames kept open at once under one shared memory budget.
+
+    ``add`` / ``put`` / ``get`` mark a dataset most recently used. Whenever the frames held
+    in memory exceed ``memory_budget``, the least recently used ones (never the one just
+    touched) are queued for eviction: a background thread writes each to an uncompressed
+    Feather spill file and only then drops it, so the caller (the Tk thread) never waits
+    on the disk. Touching a frame whose spill is still being written cancels its eviction.
+    ``get`` maps a spilled frame back without copying (see ``read_arrow_mapped``) and keeps
+    the spill, so evicting it again is free until the frame is replaced. Spilled frames
+    come back with a fresh 0..n-1 index and string column names. Without pyarrow nothing
+    can be spilled and every frame stays in memory.
+    """
+
+    def __init__(self, memory_budget=WORKSPACE_MEMORY_BYTES, directory=None):
+        self.memory_budget = memory_budget
+        self.spill_enabled = HAS_PYARROW
+        self._entries = collections.OrderedDict()   # name -> entry dict, least recently used first
+        self._lock = threading.RLock()
+        self._directory = directory
+        self._finalizer = None
+        self._pool = None                           # one spill writer thread, started on first eviction
+        self._pending = set()                       # futures of queued spill writes
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def names(self):
+        return list(self._entries)
+
+    def unique_name(self, name):
+        """``name``, or ``name (2)``, ``name (3)``... if it is taken."""
+        candidate, i = name, 2
+        while candidate in self._entries:
+            candidate, i = f"{name} ({i})", i + 1
+        return candidate
+
+    def add(self, name, df, source=None, nbytes=None):
+        """Store ``df`` under ``name`` (replacing any dataset of that name) and make it most recent.
+
+        ``nbytes`` is the frame's size when the caller already knows it (skips a deep scan).
+        """
+        with self._lock:
+            old = self._entries.pop(name, None)
+            if old is not None:
+                self._drop_spill(old)
+            self._entries[name] = {"frame": df, "bytes": frame_bytes(df) if nbytes is None else nbytes,
+                                   "spill": None, "source": source, "evict": False}
+            self._enforce(name)
+
+    def put(self, name, df, nbytes=None):
+        """Replace the frame of an existing dataset (e.g. after cleaning), keeping its source."""
+        with self._lock:
+            entry = self._entries[name]
+            if entry["frame"] is df:
+                entry["evict"] = False
+                self._entries.move_to_end(name)
+                return
+            self.add(name, df, entry["source"], nbytes)
+
+    def get(self, name):
+        with self._lock:
+            entry = self._entries[name]
+            self._entries.move_to_end(name)
+            entry["evict"] = False
+            if entry["frame"] is None:
+                entry["frame"] = read_arrow_mapped(entry["spill"])
+                entry["bytes"] = frame_bytes(entry["frame"])
+                self._enforce(name)
+            return entry["frame"]
+
+    def source(self, name):
+        return self._entries[name]["source"]
+
+    def remove(self, name):
+        with self._lock:
+            self._drop_spill(self._entries.pop(name))
+
+    def status(self):
+        """``[(name, rows_or_None, bytes_in_memory, spilled)]`` from least to most recently used."""
+        with self._lock:
+            return [(name, None if e["frame"] is None else len(e["frame"]),
+                     0 if e["frame"] is None else e["bytes"], e["spill"] is not None)
+                    for name, e in self._entries.items()]
+
+    def resident_bytes(self):
+        return sum(e["bytes"] for e in self._entries.values() if e["frame"] is not None)
+
+    def wait(self):
+        """Block until every queued spill has been written (or abandoned)."""
+        with self._lock:
+            pending = list(self._pending)
+        futures_wait(pending)
+
+    def _enforce(self, keep):
+        """Queue least recently used frames (except ``keep``) for eviction until the budget holds.
+
+        Only marks them; a frame that still has its spill file is dropped at once, the
+        others are written out by ``_spill`` on the spill thread.
+        """
+        if not self.spill_enabled:
+            return
+        total = sum(e["bytes"] for e in self._entries.values() if e["frame"] is not None and not e["evict"])
+        dropped = False
+        for name, entry in list(self._entries.items()):
+            if total <= self.memory_budget:
+                break
+            if name == keep or entry["frame"] is None or entry["evict"]:
+                continue
+            total -= entry["bytes"]
+            if entry["spill"] is not None:
+                entry["frame"] = None       # unchanged since it was mapped back from this file
+                dropped = True
+                continue
+            entry["evict"] = True
+            if self._directory is None:
+                self._directory = tempfile.mkdtemp(prefix="milo_workspace_")
+            if self._finalizer is None:
+                self._finalizer = weakref.finalize(self, shutil.rmtree, self._directory, True)
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="milo-spill")
+            future = self._pool.submit(self._spill, name, entry, entry["frame"], self._directory)
+            self._pending.add(future)
+            future.add_done_callback(self._pending.discard)
+        if dropped:
+            gc.collect()
+
+    def _spill(self, name, entry, frame, directory):
+        """Spill thread: write ``frame`` to Feather, then drop it if it is still marked for eviction."""
+        path = os.path.join(directory, f"{hashlib.sha1(name.encode()).hexdigest()}_{time.time_ns()}.feather")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            out = frame.reset_index(drop=True)
+            out.columns = [str(c) for c in out.columns]
+            out.to_feather(path, compression="uncompressed", chunksize=max(len(out), 1))
+        except Exception:
+            FrameCache._remove(path)
+            with self._lock:
+                entry["evict"] = False  # keep it in memory
+            return
+        with self._lock:
+            if self._entries.get(name) is not entry or entry["frame"] is not frame:
+                FrameCache._remove(path)    # removed or replaced while being written
+                return
+            entry["spill"] = path       # valid even if the frame was touched meanwhile
+            if not entry["evict"]:
+                return
+            entry["frame"] = None
+            entry["evict"] = False
+        del frame, out
+        gc.collect()
+
+    def _drop_spill(self, entry):
+        if entry["spill"] is not None:
+            FrameCache._remove(entry["spill"])
+
+    def close(self):
+        """Forget every dataset and delete the spill files."""
+        with self._lock:
+            self._entries.clear()
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            if self._finalizer is not None:
+                self._finalizer()
+                self._finalizer = None
+                self._directory = None
+
+
+def combine_frames(frames, how="concat", on=None):
+    """Stack (``how="concat"``) or join (``inner`` / ``left`` / ``outer``) named frames.
+
+    ``frames`` maps dataset names to frames. Concat aligns columns by name and adds a
+    categorical ``dataset`` column; joins take exactly two frames, match rows on the ``on``
+    key columns (hash join) and suffix clashing columns with the dataset names.
+    """
+    if how not in COMBINE_MODES:
+        raise ValueError(f"Unknown combine mode {how!r}; expected one of {', '.join(COMBINE_MODES)}")
+    names = list(frames)
+    if how == "concat":
+        parts = [frames[n] for n in names]
+        out = pd.concat(parts, ignore_index=True, sort=False)
+        codes = np.repeat(np.arange(len(parts), dtype=np.int32), [len(p) for p in parts])
+        label = "dataset" if "dataset" not in out.columns else "_dataset"
+        out.insert(0, label, pd.Categorical.from_codes(codes, categories=names))
+        return out
+    if len(names) != 2:
+        raise ValueError("A join needs exactly two datasets")
+    if not on:
+        raise ValueError("A join needs at least one key column")
+    left, right = frames[names[0]], frames[names[1]]
+    missing = [c for c in on if c not in left.columns or c not in right.columns]
+    if missing:
+        raise KeyError(f"Key column(s) not in both datasets: {', '.join(map(str, missing))}")
+    return left.merge(right, how=how, on=list(on), suffixes=(f"_{names[0]}", f"_{names[1]}"), sort=False)
+
+
+# ---------- Search ----------
+class SearchIndex:
+    """Lowercased, dictionary-encoded copy of every column used by the preview search box.
+
+    Built once per DataFrame: each column is factorized into integer codes plus its distinct
+    values as lowercase strings. A query only scans the distinct values (vectorized, Arrow
+    backed when pyarrow is installed) and maps the hits back to rows through the codes.
+    When a query extends the previous one, only the previous hits are re-examined.
+    """
+
+    def __init__(self, df):
+        self.n = len(df)
+        self.columns = []
+        for col in df.columns:
+            codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+            codes = codes.astype(np.int32) if len(uniques) < 2**31 - 1 else codes
+            text = pd.Index(uniques).astype(str).str.lower()
+            text = pd.Series(text, dtype="string[pyarrow]" if HAS_PYARROW else object)
+            self.columns.append((codes, text))
+        self._scratch = np.empty(self.n, dtype=bool)
+        self._last_query = None
+        self._last_hits = None      # per column: indices of matching distinct values
+        self._last_rows = None
+
+    def search(self, q):
+        """Return the sorted row positions containing ``q`` in any column."""
+        q = q.lower()
+        refine = bool(self._last_query) and q.startswith(self._last_query)
+        mask = np.zeros(self.n if not refine else len(self._last_rows), dtype=bool)
+        hits_per_col = []
+        for i, (codes, text) in enumerate(self.columns):
+            prev = self._last_hits[i] if refine else None
+            if prev is not None and len(prev) < len(text) // 4:
+                hits = prev[text.iloc[prev].str.contains(q, regex=False).to_numpy(dtype=bool)]
+            else:
+                hits = np.flatnonzero(text.str.contains(q, regex=False).to_numpy(dtype=bool))
+            hits_per_col.append(hits)
+            if not len(hits):
+                continue
+            # lookup table indexed by code; the trailing False catches the NA code (-1)
+            lookup = np.zeros(len(text) + 1, dtype=bool)
+            lookup[hits] = True
+            if refine:
+                mask |= lookup[codes[self._last_rows]]
+            else:
+                np.take(lookup, codes, out=self._scratch)
+                mask |= self._scratch
+        rows = self._last_rows[mask] if refine else np.flatnonzero(mask)
+        self._last_query, self._last_hits, self._last_rows = q, hits_per_col, rows
+        return rows
+
+
+# ---------- Duplicate detection ----------
+DEDUP_MEMORY_BYTES = int(os.environ.get("MILO_DEDUP_MEMORY_MB", "512")) * 1024 * 1024
+DEDUP_PARTITIONS = 256            # spill files, picked by the fingerprint's top byte
+DEDUP_HASH_KEYS = ("0123456789123456", "milo.dedup.seed2")   # two 64-bit halves of a fingerprint
+_FP_MIX = np.uint64(0x9E3779B97F4A7C15)
+_FP_RECORD = np.dtype([("hi", "<u8"), ("lo", "<u8"), ("row", "<i8")])
+
+
+def row_fingerprints(df, subset=None, hash_key=DEDUP_HASH_KEYS[0], workers=None, chunk_rows=LOAD_CHUNK_ROWS):
+    """64-bit fingerprint of every row of ``df`` (over ``subset`` columns if given).
+
+    Rows are hashed in slices of ``chunk_rows`` on a thread pool; pandas hashes each column
+    slice (low-cardinality text is hashed once per distinct value) and the column hashes
+    are mixed in order, so equal rows always get equal fingerprints.
+    """
+    columns = [df[c] for c in (subset or df.columns)]
+    n = len(df)
+    out = np.zeros(n, dtype=np.uint64)
+
+    def work(start):
+        stop = min(start + chunk_rows, n)
+        h = np.zeros(stop - start, dtype=np.uint64)
+        for s in columns:
+            h *= _FP_MIX
+            h ^= pd.util.hash_pandas_object(s.iloc[start:stop], index=False, hash_key=hash_key).to_numpy()
+        out[start:stop] = h
+
+    starts = range(0, n, chunk_rows)
+    if len(starts) > 1:
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            list(pool.map(work, starts))
+    elif n:
+        work(0)
+    return out
+
+
+def _repeated(hi, lo):
+    """Boolean mask of records whose (hi, lo) fingerprint already appeared earlier."""
+    return pd.DataFrame({"hi": hi, "lo": lo}, copy=False).duplicated().to_numpy()
+
+
+def dedup_file(path, out_path, subset=None, memory_budget=DEDUP_MEMORY_BYTES,
+               progress=None, cancel=None, chunksize=LOAD_CHUNK_ROWS):
+    """Write ``path`` to ``out_path`` (CSV) without duplicate rows, in bounded memory.
+
+    Two passes over the input. The first reduces each row to a 128-bit fingerprint (two
+    independent 64-bit hashes, so collisions are negligible even at billions of rows) and
+    keeps them in memory until ``memory_budget`` is exceeded; from then on fingerprints
+    are spilled to ``DEDUP_PARTITIONS`` files by their top bits and each partition is
+    deduplicated on its own. The duplicate flags live in a disk-backed array, so memory
+    stays at one chunk plus one partition. The second pass copies the first occurrence of
+    every row. ``progress(done, total, rows)`` covers both passes.
+
+    Returns ``{"rows": n, "duplicates": d, "spilled": bool}``.
+    """
+    total = os.path.getsize(path)
+
+    def pass_progress(offset):
+        if progress is None:
+            return None
+        return lambda done, size, rows: progress(offset + done, 2 * total, rows)
+
+    with tempfile.TemporaryDirectory(prefix="milo-dedup-") as tmp:
+        held, held_bytes, parts, rows = [], 0, None, 0
+        for chunk in iter_data_chunks(path, pass_progress(0), cancel, chunksize):
+            keys = subset or list(chunk.columns)
+            rec = np.empty(len(chunk), dtype=_FP_RECORD)
+            rec["hi"] = row_fingerprints(chunk, keys, DEDUP_HASH_KEYS[0])
+            rec["lo"] = row_fingerprints(chunk, keys, DEDUP_HASH_KEYS[1])
+            rec["row"] = np.arange(rows, rows + len(chunk))
+            rows += len(chunk)
+            if parts is None:
+                held.append(rec)
+                held_bytes += rec.nbytes
+                if held_bytes <= memory_budget:
+                    continue
+                # over budget: switch to partitioned spill files for everything seen so far
+                parts = [open(os.path.join(tmp, f"part{i}.bin"), "wb") for i in range(DEDUP_PARTITIONS)]
+                rec = np.concatenate(held)
+                held = []
+            pid = (rec["hi"] >> np.uint64(56)).astype(np.intp)
+            order = np.argsort(pid, kind="stable")   # stable: rows stay in file order per partition
+            bounds = np.searchsorted(pid[order], np.arange(DEDUP_PARTITIONS + 1))
+            for i in range(DEDUP_PARTITIONS):
+                if bounds[i] < bounds[i + 1]:
+                    rec[order[bounds[i]:bounds[i + 1]]].tofile(parts[i])
+
+        if parts is None:
+            rec = np.concatenate(held) if held else np.empty(0, dtype=_FP_RECORD)
+            dup = _repeated(rec["hi"], rec["lo"])
+            del held, rec
+        else:
+            for f in parts:
+                f.close()
+            dup = np.lib.format.open_memmap(os.path.join(tmp, "dup.npy"), mode="w+", dtype=bool, shape=(rows,))
+            for i in range(DEDUP_PARTITIONS):
+                if cancel is not None and cancel.is_set():
+                    raise LoadCancelled()
+                rec = np.fromfile(os.path.join(tmp, f"part{i}.bin"), dtype=_FP_RECORD)
+                dup[rec["row"][_repeated(rec["hi"], rec["lo"])]] = True
+
+        start, header = 0, True
+        with open(out_path, "w", newline="", encoding="utf-8") as out:
+            for chunk in iter_data_chunks(path, pass_progress(total), cancel, chunksize):
+                keep = ~dup[start:start + len(chunk)]
+                start += len(chunk)
+                chunk[keep].to_csv(out, index=False, header=header)
+                header = False
+        duplicates = int(dup.sum())
+        del dup                                 # release the memmap before the directory goes
+    return {"rows": rows, "duplicates": duplicates, "spilled": parts is not None}
+
+
+# ---------- Cleaning ----------
+HISTORY_LIMIT = 20                # cleaning steps kept for undo (the loaded frame is always kept)
+
+# Copy-on-write lets each cleaning step share every column it does not modify with the
+# previous step, so keeping a history of frames costs only what actually changed.
+# It is always on from pandas 3.0, where the option is deprecated.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+CLIP_IQR = 1.5                    # outlier fences for "clip", in inter-quartile ranges
+
+
+def _is_text(s):
+    return s.dtype == object or isinstance(s.dtype, pd.StringDtype)
+
+
+class CleaningPlan:
+    """Lazy cleaning pipeline that runs all of its steps in one fused pass.
+
+    Steps are recorded by :meth:`add` and nothing touches the data until :meth:`execute`.
+    The optimizer (:meth:`explain`) drops steps that cannot change anything (fill after
+    drop NA, clip on a frame with no numeric columns, ...); execution then works one column
+    at a time: NA masks are computed once and reused for drop and fill, columns a step
+    does not change are shared untouched, duplicates are found from one packed integer key
+    per row, and each column is gathered once for the dropped NA rows and once more only
+    if duplicates were found, instead of once per step.
+
+    ``dedup_subset`` restricts the duplicate test to those key columns. After ``execute``,
+    ``removed`` holds how many rows each row-dropping step took out.
+    """
+
+    STEPS = ("trim", "coerce", "dropna", "fillna", "clip", "dedup")   # execution order
+    LABELS = {"trim": "trim text", "coerce": "text->numbers", "dropna": "drop NA",
+              "fillna": "fill NA", "clip": "clip outliers", "dedup": "dedup"}
+
+    def __init__(self, steps=(), dedup_subset=None):
+        self.steps = set()
+        self.dedup_subset = list(dedup_subset) if dedup_subset else None
+        self.removed = {}
+        for step in steps:
+            self.add(step)
+
+    def add(self, step):
+        if step not in self.STEPS:
+            raise ValueError(f"unknown cleaning step {step!r}; expected one of {', '.join(self.STEPS)}")
+        self.steps.add(step)
+        return self
+
+    def explain(self, df=None):
+        """Return the steps that will actually run, in order, after optimization."""
+        steps = [s for s in self.STEPS if s in self.steps]
+        if "dropna" in self.steps and "fillna" in steps:
+            steps.remove("fillna")        # nothing is left to fill once NA rows are gone
+        if df is not None:
+            text = any(_is_text(df[c]) for c in df.columns)
+            if not text:
+                steps = [s for s in steps if s not in ("trim", "coerce")]
+            if "clip" in steps and not text and df.select_dtypes(include=[np.number]).empty:
+                steps.remove("clip")
+        return steps
+
+    def label(self):
+        labels = [self.LABELS[s] for s in self.explain()]
+        if "dedup" in self.steps and self.dedup_subset:
+            labels[-1] += f" on {', '.join(map(str, self.dedup_subset))}"
+        return ", ".join(labels)
+
+    def execute(self, df):
+        """Return a cleaned copy of ``df`` with a fresh index; ``df`` is never modified."""
+        steps = set(self.explain(df))
+        missing = [c for c in self.dedup_subset or () if c not in df.columns]
+        if "dedup" in steps and missing:
+            raise KeyError(f"duplicate key column(s) not found: {', '.join(map(str, missing))}")
+        n = len(df)
+        columns = {}
+        na_masks = {}
+        keep = np.ones(n, dtype=bool)
+        for c in df.columns:
+            s = df[c]
+            if _is_text(s) and "trim" in steps:
+                s = self._trim(s)
+            if _is_text(s) and "coerce" in steps:
+                s = self._coerce(s)
+            na = s.isna().to_numpy(dtype=bool)
+            if na.any():
+                na_masks[c] = na
+                if "dropna" in steps:
+                    keep &= ~na
+            columns[c] = s
+
+        rows = None if keep.all() else np.flatnonzero(keep)
+        self.removed = {"dropna": 0 if rows is None else n - len(rows), "dedup": 0}
+        for c, s in columns.items():
+            if rows is not None:
+                s = s.take(rows)              # the one gather per column for dropped rows
+            if "fillna" in steps and c in na_masks:
+                s = self._fill(s)
+            if "clip" in steps and pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+                s = self._clip(s)
+            columns[c] = s.reset_index(drop=True)
+
+        if "dedup" in steps and n and columns:
+            keys = self.dedup_subset or list(columns)
+            unique = self._unique_rows([columns[c] for c in keys])
+            if unique is not None:            # gather again only when duplicates were found
+                self.removed["dedup"] = len(columns[keys[0]]) - len(unique)
+                columns = {c: s.take(unique).reset_index(drop=True) for c, s in columns.items()}
+                rows = unique if rows is None else rows[unique]
+        if not columns:
+            return (df if rows is None else df.iloc[rows]).reset_index(drop=True)
+        return pd.DataFrame(columns, columns=df.columns, copy=False)
+
+    # -- per-column kernels: each returns ``s`` itself when there is nothing to change --
+    @staticmethod
+    def _trim(s):
+        text = s.astype("string") if s.dtype == object else s
+        stripped = text.str.strip()
+        padded = (stripped != text).fillna(False).to_numpy(dtype=bool)
+        if not padded.any():
+            return s
+        # object columns may mix in non-strings; only the padded entries are replaced
+        return s.where(~padded, stripped) if s.dtype == object else stripped
+
+    @staticmethod
+    def _coerce(s):
+        present = s.notna()
+        if not present.any():
+            return s
+        values = pd.to_numeric(s.where(present).astype("string").str.strip(), errors="coerce")
+        if values.notna().sum() != present.sum():
+            return s                       # some entries are not numbers: leave as text
+        if values.hasnans:
+            return values.astype("float64")
+        return values.astype(getattr(values.dtype, "numpy_dtype", values.dtype))
+
+    @staticmethod
+    def _fill(s):
+        if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            return s.fillna(0)
+        if pd.api.types.is_datetime64_any_dtype(s):
+            return s                       # '' is not a date; leave NaT in parsed date columns
+        if isinstance(s.dtype, pd.CategoricalDtype) and "" not in s.cat.categories:
+            s = s.cat.add_categories("")
+        return s.fillna("")
+
+    @staticmethod
+    def _clip(s):
+        values = s.to_numpy(dtype="float64", na_value=np.nan)
+        if not np.isfinite(values).any():
+            return s
+        q1, q3 = np.nanpercentile(values, [25, 75])
+        lo, hi = q1 - CLIP_IQR * (q3 - q1), q3 + CLIP_IQR * (q3 - q1)
+        if not ((values < lo) | (values > hi)).any():
+            return s
+        if pd.api.types.is_integer_dtype(s):
+            lo, hi = np.ceil(lo), np.floor(hi)
+        return s.clip(lo, hi)
+
+    @staticmethod
+    def _unique_rows(columns):
+        """Positions of the first occurrence of each distinct row, or None if all are distinct.
+
+        Each column is factorized once through pandas' hash table (small-range integers are
+        used as their own codes) and the codes are packed into one int64 key per row,
+        re-factorizing the key whenever it would overflow, so the duplicate test is a
+        single exact hash pass over integers with no row-by-row compares.
+        """
+        n = len(columns[0])
+        key, size = np.zeros(n, dtype=np.int64), 1
+        for s in columns:
+            # plain numpy ints/bools only: nullable and Arrow dtypes share the kind but can hold NA
+            values = s.to_numpy() if isinstance(s.dtype, np.dtype) and s.dtype.kind in "iub" else None
+            if values is not None and n and int(values.max()) - int(values.min()) < 2 * n:
+                codes = values.astype(np.int64) - int(values.min())
+                card = int(codes.max()) + 1
+            else:
+                codes, uniques = pd.factorize(s)
+                codes = codes.astype(np.int64) + 1      # NA gets its own code, 0
+                card = len(uniques) + 1
+            if size * card >= 2 ** 62:
+                key, uniques = pd.factorize(key)
+                key, size = key.astype(np.int64), len(uniques)
+            key = key * card + codes
+            size *= card
+        dup = pd.Series(key).duplicated().to_numpy()
+        return np.flatnonzero(~dup) if dup.any() else None
+
+
+def clean_frame(df, dropna=False, fillna=False, dedup=False, trim=False, coerce=False, clip=False, dedup_subset=None):
+    """Apply the Clean Data options to ``df`` and return a new frame with a fresh index.
+
+    ``df`` itself is never modified; unchanged columns are shared with it (copy-on-write).
+    """
+    flags = {"dropna": dropna, "fillna": fillna, "dedup": dedup, "trim": trim, "coerce": coerce, "clip": clip}
+    return CleaningPlan((step for step, on in flags.items() if on), dedup_subset).execute(df)
+
+
+class CleaningHistory:
+    """Undo/redo stack of cleaning results.
+
+    Each entry is ``(label, frame)``. Thanks to copy-on-write the frames share untouched
+    column buffers, so a step costs what it changed rather than a full copy, and moving
+    between states (undo, redo, revert) only moves a pointer.
+    """
+
+    def __init__(self, limit=HISTORY_LIMIT):
+        self.limit = limit
+        self.states = []
+        self.pos = -1
+
+    def reset(self, df, label="Loaded"):
+        self.states = [(label, df)] if df is not None else []
+        self.pos = len(self.states) - 1
+
+    def push(self, df, label):
+        del self.states[self.pos + 1:]
+        self.states.append((label, df))
+        if len(self.states) > self.limit + 1:
+            # drop the oldest cleaning step but keep the loaded frame for "revert"
+            del self.states[1]
+        self.pos = len(self.states) - 1
+
+    @property
+    def current(self):
+        return self.states[self.pos] if self.pos >= 0 else (None, None)
+
+    def can_undo(self):
+        return self.pos > 0
+
+    def can_redo(self):
+        return self.pos < len(self.states) - 1
+
+    def undo(self):
+        if self.can_undo():
+            self.pos -= 1
+        return self.current[1]
+
+    def redo(self):
+        if self.can_redo():
+            self.pos += 1
+        return self.current[1]
+
+    def revert(self):
+        """Back to the frame as loaded; later steps stay available through redo."""
+        if self.states:
+            self.pos = 0
+        return self.current[1]
+
+
+# ---------- Histograms ----------
+HIST_EXACT_ROWS = 2_000_000       # up to this many values a column keeps a sorted copy (exact bins)
+HIST_FINE_BINS = 8192             # larger columns keep a fine equal-width count summary instead
+HIST_MAX_BINS = 200
+TOP_K_BARS = 20                   # bars shown for a non-numeric column
+
+
+class ColumnBins:
+    """Binning summary of one numeric column, built once so any bin count costs O(bins).
+
+    Columns up to ``HIST_EXACT_ROWS`` values keep them sorted and read counts off with
+    ``searchsorted`` (identical to ``np.histogram``). Bigger columns keep ``HIST_FINE_BINS``
+    equal-width counts and interpolate inside a fine bin, which moves a count by at most the
+    contents of one fine bin.
+    """
+
+    def __init__(self, s):
+        if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            x = s.to_numpy(dtype=float, na_value=np.nan)
+        else:
+            x = _as_plot_numbers(s)
+        x = x[np.isfinite(x)]
+        self.count = len(x)
+        self.lo, self.hi = (float(x.min()), float(x.max())) if self.count else (0.0, 1.0)
+        self.exact = self.count <= HIST_EXACT_ROWS
+        if self.exact:
+            self.sorted = np.sort(x)
+        else:
+            counts, self.fine_edges = np.histogram(x, bins=HIST_FINE_BINS, range=(self.lo, self.hi))
+            self.fine_cum = np.concatenate([[0], np.cumsum(counts)])
+
+    def cdf(self, edges):
+        """Number of values below each edge."""
+        if self.exact:
+            return np.searchsorted(self.sorted, edges, side="left")
+        return np.interp(edges, self.fine_edges, self.fine_cum)
+
+    def histogram(self, bins=20):
+        """``(counts, edges)`` like ``np.histogram(values, bins)``."""
+        lo, hi = (self.lo - 0.5, self.hi + 0.5) if self.lo == self.hi else (self.lo, self.hi)
+        edges = np.linspace(lo, hi, bins + 1)
+        below = self.cdf(edges).astype(float)
+        below[-1] = self.count                  # the last bin is closed on the right
+        return np.diff(below), edges
+
+
+# ---------- Group aggregation ----------
+GROUP_AGGS = ("mean", "sum", "count", "median", "p10", "p25", "p75", "p90", "p99")
+BAR_TOP_N = 30                    # bars before the rest is folded into "Other"
+GROUP_CHUNK_ROWS = 1_000_000
+
+
+def _group_codes(s):
+    """``(codes, labels)`` for grouping; categoricals reuse their codes, others are hashed once.
+
+    Only observed groups get a code, as with ``groupby(observed=True)``: unused categories
+    (left behind by filtering or cleaning) are dropped.
+    """
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes, labels = s.cat.codes.to_numpy().astype(np.intp), s.cat.categories
+        used = np.bincount(codes[codes >= 0], minlength=len(labels)) > 0
+        if not used.all():
+            codes = np.where(codes >= 0, (np.cumsum(used) - 1)[codes], -1)
+            labels = labels[used]
+        return codes, labels
+    codes, labels = pd.factorize(s)             # hash table, no sort
+    return codes, labels
+
+
+def _bincount_partials(codes, y, k, workers=None, chunk_rows=GROUP_CHUNK_ROWS):
+    """Per-group ``(sum, count)`` of ``y``, from per-chunk bincounts merged across threads."""
+    def block(start):
+        c, v = codes[start:start + chunk_rows], y[start:start + chunk_rows]
+        ok = (c >= 0) & ~np.isnan(v)
+        return (np.bincount(c[ok], weights=v[ok], minlength=k),
+                np.bincount(c[ok], minlength=k))
+
+    sums, counts = np.zeros(k), np.zeros(k, dtype=np.int64)
+    starts = range(0, len(codes), chunk_rows)
+    with ThreadPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, max(1, len(starts)))) as pool:
+        for s, n in pool.map(block, starts):
+            sums += s
+            counts += n
+    return sums, counts
+
+
+def _group_quantiles(codes, y, k, q):
+    """Per-group ``q`` quantile (linear interpolation, like pandas) from one sort by (group, value)."""
+    ok = (codes >= 0) & ~np.isnan(y)
+    c, v = codes[ok], y[ok]
+    # one int64 sort on (group, rank of value) beats a lexsort on the two columns
+    rank = np.empty(len(v), dtype=np.int64)
+    rank[np.argsort(v)] = np.arange(len(v))
+    v = v[np.argsort(c.astype(np.int64) * max(len(v), 1) + rank)]
+    counts = np.bincount(c, minlength=k)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    out = np.full(k, np.nan)
+    has = counts > 0
+    pos = starts[has] + q * (counts[has] - 1)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, starts[has] + counts[has] - 1)
+    out[has] = v[lo] + (v[hi] - v[lo]) * (pos - lo)
+    return out
+
+
+def group_aggregate(df, x, y, agg="mean", top_n=BAR_TOP_N, workers=None):
+    """Aggregate ``y`` by the groups of ``x``; returns a Series sorted descending.
+
+    Groups are integer codes (categoricals reuse theirs), so mean, sum and count are
+    ``bincount`` passes over row chunks on a thread pool, and the median and percentiles
+    come from a single sort. Only the ``top_n`` largest groups are returned; the rest are
+    folded into one "Other (k groups)" entry aggregated over all of their rows.
+    """
+    if agg not in GROUP_AGGS:
+        raise ValueError(f"unknown aggregation {agg!r}; expected one of {', '.join(GROUP_AGGS)}")
+    codes, labels = _group_codes(df[x])
+    k = len(labels)
+    values = df[y]
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        values = values.to_numpy(dtype=float, na_value=np.nan)
+    else:
+        values = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    if agg in ("mean", "sum", "count"):
+        sums, counts = _bincount_partials(codes, values, k, workers)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = {"mean": sums / counts, "sum": sums, "count": counts.astype(float)}[agg]
+    else:
+        q = 0.5 if agg == "median" else int(agg[1:]) / 100
+        result = _group_quantiles(codes, values, k, q)
+    order = np.argsort(-np.nan_to_num(result, nan=-np.inf), kind="stable")
+    top, rest = order[:top_n], order[top_n:]
+    out = pd.Series(result[top], index=pd.Index(labels[top]).astype(str), name=f"{agg}({y})")
+    if len(rest):
+        if agg in ("sum", "count"):
+            other = result[rest].sum()
+        else:
+            in_rest = np.zeros(k + 1, dtype=bool)
+            in_rest[rest] = True
+            picked = values[in_rest[codes] & ~np.isnan(values)]   # code -1 (NA) maps to False
+            if agg == "mean":
+                other = picked.mean() if len(picked) else np.nan
+            else:
+                other = np.quantile(picked, q) if len(picked) else np.nan
+        out[f"Other ({len(rest)} group{'s' if len(rest) > 1 else ''})"] = other
+    return out
+
+
+# ---------- Profiling ----------
+class DatasetProfile:
+    """Statistics behind the dashboard and the PDF report for one version of a DataFrame.
+
+    Every statistic is computed on first use and then kept, so the dashboard and the report
+    share the work. The app builds a new profile only when ``df_version`` changes. Plot
+    workers fill the keyed caches while the Tk thread reads them, so those go through
+    ``_memo``.
+    """
+
+    def __init__(self, df, version):
+        self.df = df
+        self.version = version
+        self.rows, self.cols = df.shape
+        self.figure_cache = {}        # rendered report figures (PNG bytes) for this version
+        self._correlations = {}       # (method, sample_rows) -> CorrelationResult
+        self._bins = {}               # column -> ColumnBins
+        self._value_counts = {}       # column -> full value_counts()
+        self._groups = {}             # (x, y, agg, top_n) -> group_aggregate() result
+        self._lock = threading.Lock() # guards the four caches above
+
+    def _memo(self, cache, key, compute):
+        """``cache[key]``, computed outside the lock on a miss; the first result stored wins."""
+        with self._lock:
+            if key in cache:
+                return cache[key]
+        value = compute()
+        with self._lock:
+            return cache.setdefault(key, value)
+
+    @cached_property
+    def missing_pct(self):
+        cells = self.rows * self.cols
+        return round(self.df.isna().sum().sum() / cells * 100, 2) if cells > 0 else 0
+
+    @cached_property
+    def numeric_columns(self):
+        return list(self.df.select_dtypes(include=[np.number]).columns)
+
+    @cached_property
+    def categorical_columns(self):
+        return list(self.df.select_dtypes(include=["object", "category", "string"]).columns)
+
+    @cached_property
+    def head_text(self):
+        return self.df.head(10).to_string()
+
+    @cached_property
+    def describe_numeric(self):
+        return self.df.describe().transpose()
+
+    @cached_property
+    def describe_all(self):
+        return self.df.describe(include="all").transpose()
+
+    @cached_property
+    def top_counts(self):
+        """Top-3 value counts for the first six categorical columns."""
+        return {c: self.top_values(c, 3) for c in self.categorical_columns[:6]}
+
+    @property
+    def corr(self):
+        """Pearson correlation of the numeric columns, or None with fewer than two."""
+        result = self.correlation()
+        return result.matrix if result is not None else None
+
+    def correlation(self, method="pearson", sample_rows=None):
+        """``CorrelationResult`` for this version, computed once per (method, sample size).
+
+        A preview request is served from the exact result when that is already known.
+        """
+        if len(self.numeric_columns) < 2:
+            return None
+        if sample_rows is not None:
+            with self._lock:
+                exact = self._correlations.get((method, None))
+            if exact is not None:
+                return exact
+        return self._memo(self._correlations, (method, sample_rows),
+                          lambda: correlation(self.df[self.numeric_columns], method, sample_rows))
+
+    def bins(self, col):
+        """``ColumnBins`` summary of a numeric column, built on first use."""
+        return self._memo(self._bins, col, lambda: ColumnBins(self.df[col]))
+
+    def histogram(self, col, bins=20):
+        """``(counts, edges)`` for a numeric column, read off its cached ``ColumnBins``."""
+        return self.bins(col).histogram(bins)
+
+    def group_aggregate(self, x, y, agg="mean", top_n=BAR_TOP_N):
+        """Cached ``group_aggregate`` for this version, so a bar chart reopens instantly."""
+        return self._memo(self._groups, (x, y, agg, top_n), lambda: group_aggregate(self.df, x, y, agg, top_n))
+
+    def top_values(self, col, k=TOP_K_BARS):
+        """The ``k`` most frequent values of any column (counted once per column)."""
+        return self._memo(self._value_counts, col, lambda: self.df[col].value_counts()).head(k)
+
+    @cached_property
+    def summary_text(self):
+        buf = []
+        buf.append("=== Top 10 rows preview ===\n")
+        buf.append(self.head_text)
+        buf.append("\n\n=== Summary statistics (numeric) ===\n")
+        buf.append(self.describe_numeric.to_string())
+        buf.append("\n\n=== Top categorical counts ===\n")
+        for c, counts in self.top_counts.items():
+            buf.append(f"\n-- {c} --")
+            buf.append(counts.to_string())
+        return "\n".join(buf)
+
+
+# ---------- Correlation ----------
+CORR_METHODS = ("pearson", "spearman", "kendall")
+CORR_CHUNK_ROWS = 65_536          # rows per co-moment block
+CORR_PREVIEW_ROWS = 50_000        # sample size for quick previews
+KENDALL_MAX_ROWS = 20_000         # Kendall is O(n log n) per pair; larger inputs are sampled
+CORR_MAX_LABELS = 30              # heatmaps with more columns collapse to a top-k or clustered view
+CORR_Z = 1.96                     # 95% intervals
+# variance of atanh(r) is c / (n - d) (Fisher; Fieller, Hartley & Pearson for rank methods)
+_FISHER_VAR = {"pearson": (1.0, 3), "spearman": (1.06, 3), "kendall": (0.437, 4)}
+
+
+def _comoments(x, shift, present=None):
+    """Pairwise-complete ``(n, sum, sum of squares, cross products)`` of a float block.
+
+    Four BLAS matrix products in general; a block without missing values needs only one.
+    """
+    if present is None:
+        present = ~np.isnan(x)
+    xs = x - shift
+    if present.all():
+        k = float(len(x))
+        s = np.broadcast_to(xs.sum(axis=0)[:, None], (x.shape[1], x.shape[1]))
+        ss = np.broadcast_to((xs * xs).sum(axis=0)[:, None], s.shape)
+        return np.full(s.shape, k), s.copy(), ss.copy(), xs.T @ xs
+    xs = np.where(present, xs, 0.0)
+    m = present.astype(float)
+    return m.T @ m, xs.T @ m, (xs * xs).T @ m, xs.T @ xs
+
+
+def _corr_from_comoments(n, s, ss, xy):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = xy - s * s.T / n
+        var_i = ss - s * s / n
+        r = cov / np.sqrt(var_i * var_i.T)
+    r[n < 2] = np.nan
+    return np.clip(r, -1, 1)
+
+
+def _pearson_blocked(df, workers=None, chunk_rows=CORR_CHUNK_ROWS):
+    """Pairwise-complete Pearson matrix and pair counts, from co-moments of row blocks on threads."""
+    shift = df.mean().fillna(0).to_numpy(dtype=float)   # centring keeps the sums stable
+
+    def block(start):
+        x = df.iloc[start:start + chunk_rows].to_numpy(dtype=float, na_value=np.nan)
+        return _comoments(x, shift)
+
+    p = df.shape[1]
+    totals = [np.zeros((p, p)) for _ in range(4)]
+    starts = range(0, len(df), chunk_rows)
+    with ThreadPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, max(1, len(starts)))) as pool:
+        for parts in pool.map(block, starts):
+            for total, part in zip(totals, parts):
+                total += part
+    return _corr_from_comoments(*totals), totals[0]
+
+
+def _rank_columns(df, workers=None):
+    """Average ranks of every column (NaN stays NaN), one column per thread."""
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        ranks = list(pool.map(lambda c: df[c].rank(), df.columns))
+    return pd.concat(ranks, axis=1) if ranks else df
+
+
+def _count_inversions(y):
+    """Pairs ``i < j`` with ``y[i] > y[j]``, for non-negative integer codes ``y`` (bottom-up merge sort)."""
+    n = len(y)
+    a = y.astype(np.int64)
+    base = int(a.max()) + 1 if n else 1
+    pos = np.arange(n)
+    inversions = 0
+    width = 1
+    while width < n:
+        pair = pos // (2 * width)
+        right = (pos // width) % 2 == 1
+        # keys make each left half a sorted run inside one globally sorted array
+        left_keys = (pair * base + a)[~right]
+        r_pair, r_val = pair[right], a[right]
+        left_end = np.searchsorted(left_keys, r_pair * base + base, side="left")
+        after = np.searchsorted(left_keys, r_pair * base + r_val, side="right")
+        inversions += int((left_end - after).sum())
+        a = a[np.argsort(pair * base + a, kind="stable")]
+        width *= 2
+    return inversions
+
+
+def _tie_pairs(codes):
+    counts = np.bincount(codes)
+    return int((counts * (counts - 1) // 2).sum())
+
+
+def _kendall_tau(x, y):
+    """Kendall's tau-b of two float arrays (pairwise-complete), in O(n log n) (Knight's method)."""
+    ok = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[ok], y[ok]
+    n = len(x)
+    if n < 2:
+        return np.nan
+    xc = np.unique(x, return_inverse=True)[1]
+    yc = np.unique(y, return_inverse=True)[1]
+    order = np.lexsort((yc, xc))
+    xc, yc = xc[order], yc[order]
+    n0 = n * (n - 1) // 2
+    n1, n2 = _tie_pairs(xc), _tie_pairs(yc)
+    n3 = _tie_pairs(np.unique(xc * (int(yc.max()) + 1) + yc, return_inverse=True)[1])
+    discordant = _count_inversions(yc)
+    concordant = n0 - n1 - n2 + n3 - discordant
+    denom = np.sqrt(float(n0 - n1) * float(n0 - n2))
+    return (concordant - discordant) / denom if denom else np.nan
+
+
+def _kendall_matrix(df, workers=None):
+    x = df.to_numpy(dtype=float, na_value=np.nan)
+    p = x.shape[1]
+    r = np.eye(p)
+    pairs = [(i, j) for i in range(p) for j in range(i + 1, p)]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for (i, j), tau in zip(pairs, pool.map(lambda ij: _kendall_tau(x[:, ij[0]], x[:, ij[1]]), pairs)):
+            r[i, j] = r[j, i] = tau
+    present = (~np.isnan(x)).astype(float)
+    return r, present.T @ present
+
+
+def draw_heatmap(ax, values, labels, title, note=""):
+    """Draw a correlation heatmap on ``ax``; tick labels only while they stay readable."""
+    im = ax.matshow(values, vmin=-1, vmax=1)
+    if len(labels) <= CORR_MAX_LABELS:
+        ax.set_xticks(range(len(labels)))
+        ax.set_xticklabels(labels, rotation=45, fontsize=8)
+        ax.set_yticks(range(len(labels)))
+        ax.set_yticklabels(labels, fontsize=8)
+    else:
+        ax.set_xticks([])
+        ax.set_yticks([])
+    ax.set_title(f"{title} ({note})" if note else title)
+    return im
+
+
+class CorrelationResult:
+    """A correlation matrix plus how it was obtained.
+
+    ``rows`` is the number of rows used; when ``sampled`` is true, ``bound`` is the widest
+    95% confidence half-width of any coefficient (Fisher z, reached at r = 0) and
+    ``interval()`` gives per-pair bounds from each pair's complete-row count.
+    """
+
+    def __init__(self, matrix, method, rows, sampled, pair_n):
+        self.matrix = matrix
+        self.method = method
+        self.rows = rows
+        self.sampled = sampled
+        self.pair_n = pair_n
+        self.bound = self._half_width(rows) if sampled else 0.0
+
+    def _se(self, n):
+        c, d = _FISHER_VAR[self.method]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(c / np.maximum(np.asarray(n, dtype=float) - d, 0))
+
+    def _half_width(self, n):
+        return float(np.tanh(CORR_Z * self._se(n))) if n > _FISHER_VAR[self.method][1] else 1.0
+
+    def interval(self):
+        """``(low, high)`` DataFrames with a 95% interval for every coefficient."""
+        z = np.arctanh(np.clip(self.matrix.to_numpy(), -0.999999, 0.999999))
+        se = self._se(self.pair_n) if self.sampled else 0.0
+        low = pd.DataFrame(np.tanh(z - CORR_Z * se), index=self.matrix.index, columns=self.matrix.columns)
+        high = pd.DataFrame(np.tanh(z + CORR_Z * se), index=self.matrix.index, columns=self.matrix.columns)
+        return low, high
+
+    def describe(self):
+        name = self.method.capitalize()
+        if not self.sampled:
+            return f"{name}, all {self.rows:,} rows"
+        return f"{name}, sample of {self.rows:,} rows (\u00b1{self.bound:.3f}, 95%)"
+
+
+def correlation(df, method="pearson", sample_rows=None, workers=None, seed=0):
+    """Correlation matrix of the numeric columns of ``df`` as a ``CorrelationResult``.
+
+    Pearson comes from pairwise-complete co-moments summed over row blocks on a thread
+    pool (BLAS does the heavy lifting). Spearman ranks every column on threads and then
+    takes Pearson of the ranks; columns are ranked once over their own non-missing values,
+    so with missing data it can differ slightly from re-ranking each pair. Kendall's tau-b
+    runs per pair in O(n log n) on threads and samples down to ``KENDALL_MAX_ROWS``.
+    ``sample_rows`` draws a uniform row sample first for a quick preview.
+    Returns None with fewer than two numeric columns.
+    """
+    if method not in CORR_METHODS:
+        raise ValueError(f"unknown correlation method {method!r}; expected one of {', '.join(CORR_METHODS)}")
+    num = df.select_dtypes(include=[np.number])
+    if num.shape[1] < 2:
+        return None
+    if method == "kendall":
+        sample_rows = min(sample_rows or KENDALL_MAX_ROWS, KENDALL_MAX_ROWS)
+    sampled = sample_rows is not None and len(num) > sample_rows
+    if sampled:
+        rng = np.random.default_rng(seed)
+        num = num.take(np.sort(rng.choice(len(num), sample_rows, replace=False)))
+    if method == "kendall":
+        r, pair_n = _kendall_matrix(num, workers)
+    else:
+        r, pair_n = _pearson_blocked(_rank_columns(num, workers) if method == "spearman" else num, workers)
+    matrix = pd.DataFrame(r, index=num.columns, columns=num.columns)
+    return CorrelationResult(matrix, method, len(num), sampled, pair_n)
+
+
+def heatmap_view(matrix, view="auto", max_labels=CORR_MAX_LABELS):
+    """Reduce a correlation matrix to something a heatmap can show; returns ``(matrix, note)``.
+
+    ``"top"`` keeps the ``max_labels`` columns with the strongest correlations (largest
+    sum of |r|), ``"clustered"`` keeps every column but orders them so correlated ones sit
+    together (spectral ordering of |r|), ``"all"`` leaves the matrix alone. ``"auto"`` is
+    ``"all"`` up to ``max_labels`` columns and ``"top"`` beyond.
+    """
+    p = len(matrix.columns)
+    if view == "auto":
+        view = "all" if p <= max_labels else "top"
+    if view == "all" or p < 3:
+        return matrix, ""
+    strength = np.nan_to_num(np.abs(matrix.to_numpy()))
+    if view == "top":
+        if p <= max_labels:
+            return matrix, ""
+        np.fill_diagonal(strength, 0)
+        keep = np.sort(np.argsort(-strength.sum(axis=0), kind="stable")[:max_labels])
+        return matrix.iloc[keep, keep], f"top {max_labels} of {p} columns"
+    # Fiedler vector of the |r| graph Laplacian puts strongly linked columns next to each other
+    laplacian = np.diag(strength.sum(axis=0)) - strength
+    order = np.argsort(np.linalg.eigh(laplacian)[1][:, 1], kind="stable")
+    return matrix.iloc[order, order], f"clustered, {p} columns"
+
+
+# ---------- Out-of-core statistics ----------
+class QuantileSketch:
+    """Mergeable approximate-quantile sketch (KLL-style compactor hierarchy).
+
+    Level ``h`` holds items of weight ``2**h``; a level that grows past ``k`` items is sorted
+    and every other item (random offset) is promoted. Memory stays around ``k * log(n / k)``
+    floats and the rank error is roughly ``1 / k``.
+    """
+
+    def __init__(self, k=512, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+
+    def merge(self, other):
+        self.count += other.count
+        for h, items in enumerate(other.levels):
+            if h >= len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self._compact()
+
+    def _compact(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                items = np.sort(items)
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[: len(items) - len(keep)]
+                promoted = pairs[self._rng.integers(2)::2]
+                self.levels[h] = keep
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lv), 2.0 ** h) for h, lv in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        if not self.count:
+            return [np.nan for _ in qs]
+        items, cum = self._weighted()
+        return [items[min(np.searchsorted(cum, q * cum[-1]), len(items) - 1)] for q in qs]
+
+    def cdf(self, points):
+        """Approximate number of values <= each point."""
+        if not self.count:
+            return np.zeros(len(points))
+        items, cum = self._weighted()
+        idx = np.searchsorted(items, points, side="right")
+        ranks = np.where(idx > 0, cum[np.maximum(idx - 1, 0)], 0.0)
+        return ranks * (self.count / cum[-1])
+
+
+class HeavyHitters:
+    """Misra-Gries top-k counter fed with whole chunks (vectorized ``value_counts``).
+
+    Keeps at most ``capacity`` values; each reported count underestimates the true count by
+    at most ``n / (capacity + 1)``.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype="int64")
+        self.count = 0
+
+    def update(self, values):
+        vc = pd.Series(values).value_counts()
+        self.count += int(vc.sum())
+        self._add(vc)
+
+    def merge(self, other):
+        self.count += other.count
+        self._add(other.counts)
+
+    def _add(self, vc):
+        counts = self.counts.add(vc, fill_value=0) if len(self.counts) else vc.astype("int64")
+        if len(counts) > self.capacity:
+            counts = counts.sort_values(ascending=False)
+            counts = counts - counts.iloc[self.capacity]
+            counts = counts[counts > 0]
+        self.counts = counts.astype("int64")
+
+    def top(self, n):
+        return self.counts.sort_values(ascending=False).head(n)
+
+
+class StreamingStats:
+    """Mergeable one-pass statistics over DataFrame chunks.
+
+    Per numeric column: Welford/Chan mean and variance, min/max and a quantile sketch.
+    Per categorical column: null count and heavy hitters. Pairwise-complete co-moments of
+    the numeric columns give the Pearson correlation matrix. Memory is independent of rows.
+
+    A numeric column that turns out to hold text in a later chunk is demoted to categorical;
+    ``demoted`` maps it to the rows seen before, which its heavy hitters never counted.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.columns = None
+        self.numeric = []
+        self.categorical = []
+        self.nulls = None
+        self.head = None
+        self.n = self.mean = self.m2 = self.min = self.max = None
+        self.sketches = {}
+        self.hitters = {}
+        self.demoted = {}
+        self._shift = None
+        self._pair_n = self._pair_s = self._pair_ss = self._pair_xy = None
+
+    def _init(self, chunk):
+        self.columns = list(chunk.columns)
+        self.numeric = list(chunk.select_dtypes(include=[np.number]).columns)
+        self.categorical = [c for c in self.columns if c not in self.numeric]
+        p = len(self.numeric)
+        self.nulls = pd.Series(0, index=self.columns, dtype="int64")
+        self.head = chunk.head(10)
+        self.n = np.zeros(p)
+        self.mean = np.zeros(p)
+        self.m2 = np.zeros(p)
+        self.min = np.full(p, np.inf)
+        self.max = np.full(p, -np.inf)
+        self.sketches = {c: QuantileSketch() for c in self.numeric}
+        self.hitters = {c: HeavyHitters() for c in self.categorical}
+        # shifting by a rough centre keeps the co-moment sums numerically stable
+        self._shift = chunk[self.numeric].mean().fillna(0).to_numpy(dtype=float) if p else np.zeros(0)
+        self._pair_n, self._pair_s, self._pair_ss, self._pair_xy = (np.zeros((p, p)) for _ in range(4))
+
+    def _demote(self, cols):
+        """Move ``cols`` from the numeric to the categorical statistics, dropping their moments."""
+        keep = np.array([c not in cols for c in self.numeric])
+        for c in cols:
+            self.demoted[c] = self.rows
+            del self.sketches[c]
+            self.hitters[c] = HeavyHitters()
+        self.numeric = [c for c in self.numeric if c not in cols]
+        self.categorical = [c for c in self.columns if c not in self.numeric]
+        self.n, self.mean, self.m2, self.min, self.max, self._shift = (
+            a[keep] for a in (self.n, self.mean, self.m2, self.min, self.max, self._shift))
+        self._pair_n, self._pair_s, self._pair_ss, self._pair_xy = (
+            m[np.ix_(keep, keep)] for m in (self._pair_n, self._pair_s, self._pair_ss, self._pair_xy))
+
+    def update(self, chunk):
+        if self.columns is None:
+            self._init(chunk)
+        chunk = chunk.reindex(columns=self.columns)
+        # the first chunk decided which columns are numeric; text later on must not become NaN
+        text = [c for c in self.numeric if not pd.api.types.is_numeric_dtype(chunk[c])
+                and (pd.to_numeric(chunk[c], errors="coerce").isna() & chunk[c].notna()).any()]
+        if text:
+            self._demote(text)
+        self.rows += len(chunk)
+        self.nulls += chunk.isna().sum().reindex(self.columns).astype("int64")
+        if self.numeric:
+            x = chunk[self.numeric].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+            present = ~np.isnan(x)
+            # Chan et al. parallel update of mean / M2
+            cn = present.sum(axis=0).astype(float)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                cmean = np.where(cn > 0, np.nansum(x, axis=0) / np.maximum(cn, 1), 0.0)
+                cm2 = np.nansum((x - cmean) ** 2, axis=0)
+            tot = self.n + cn
+            delta = cmean - self.mean
+            safe = np.maximum(tot, 1)
+            self.mean = self.mean + delta * cn / safe
+            self.m2 = self.m2 + cm2 + delta ** 2 * self.n * cn / safe
+            self.n = tot
+            if x.size:
+                self.min = np.fmin(self.min, np.nanmin(np.where(present, x, np.inf), axis=0))
+                self.max = np.fmax(self.max, np.nanmax(np.where(present, x, -np.inf), axis=0))
+            n_, s_, ss_, xy_ = _comoments(x, self._shift, present)
+            self._pair_n += n_
+            self._pair_s += s_
+            self._pair_ss += ss_
+            self._pair_xy += xy_
+            for j, c in enumerate(self.numeric):
+                self.sketches[c].update(x[:, j])
+        for c in self.categorical:
+            self.hitters[c].update(chunk[c].dropna())
+
+    def corr(self):
+        if len(self.numeric) < 2:
+            return None
+        r = _corr_from_comoments(self._pair_n, self._pair_s, self._pair_ss, self._pair_xy)
+        return pd.DataFrame(r, index=self.numeric, columns=self.numeric)
+
+
+class StreamingProfile(DatasetProfile):
+    """``DatasetProfile`` rendered from ``StreamingStats`` instead of an in-memory DataFrame.
+
+    Quantiles and categorical counts are approximate; everything else is exact.
+    """
+
+    def __init__(self, stats, version):
+        self.df = None
+        self.stats = stats
+        self.version = version
+        self.figure_cache = {}
+        self._correlations = {}
+        self._bins, self._value_counts, self._groups = {}, {}, {}
+        self._lock = threading.Lock()
+        self.rows = stats.rows
+        self.cols = len(stats.columns or [])
+        self.numeric_columns = list(stats.numeric)
+        self.categorical_columns = list(stats.categorical)
+
+    @cached_property
+    def missing_pct(self):
+        cells = self.rows * self.cols
+        return round(self.stats.nulls.sum() / cells * 100, 2) if cells > 0 else 0
+
+    @cached_property
+    def head_text(self):
+        return self.stats.head.to_string() if self.stats.head is not None else ""
+
+    @cached_property
+    def describe_numeric(self):
+        st = self.stats
+        rows = []
+        for j, c in enumerate(st.numeric):
+            n = st.n[j]
+            q25, q50, q75 = st.sketches[c].quantiles([0.25, 0.5, 0.75])
+            rows.append({
+                "count": n,
+                "mean": st.mean[j] if n else np.nan,
+                "std": np.sqrt(st.m2[j] / (n - 1)) if n > 1 else np.nan,
+                "min": st.min[j] if n else np.nan,
+                "25%": q25, "50%": q50, "75%": q75,
+                "max": st.max[j] if n else np.nan,
+            })
+        return pd.DataFrame(rows, index=st.numeric, columns=["count", "mean", "std", "min", "25%", "50%", "75%", "max"])
+
+    @cached_property
+    def describe_all(self):
+        st = self.stats
+        cat_rows = []
+        for c in st.categorical:
+            top = st.hitters[c].top(1)
+            cat_rows.append({"count": self.rows - st.nulls[c],
+                             "top": top.index[0] if len(top) else np.nan,
+                             "freq": top.iloc[0] if len(top) else np.nan})
+        cats = pd.DataFrame(cat_rows, index=st.categorical, columns=["count", "top", "freq"])
+        out = pd.concat([self.describe_numeric, cats])
+        return out.reindex(st.columns)
+
+    @cached_property
+    def top_counts(self):
+        return {c: self.top_values(c, 3) for c in self.categorical_columns[:6]}
+
+    def top_values(self, col, k=TOP_K_BARS):
+        """Approximate top-``k`` values of a categorical column from its heavy hitters."""
+        return self.stats.hitters[col].top(k).rename(col)
+
+    def correlation(self, method="pearson", sample_rows=None):
+        """Exact Pearson from the streamed co-moments; rank methods need the rows in memory."""
+        if method != "pearson":
+            raise ValueError(f"{method.capitalize()} correlation needs the data loaded in memory")
+        if len(self.numeric_columns) < 2:
+            return None
+        st = self.stats
+        return self._memo(self._correlations, "pearson",
+                          lambda: CorrelationResult(st.corr(), "pearson", st.rows, False, st._pair_n))
+
+    def histogram(self, col, bins=20):
+        """Approximate ``(counts, edges)`` read off the column's quantile sketch."""
+        j = self.stats.numeric.index(col)
+        lo, hi = self.stats.min[j], self.stats.max[j]
+        if not np.isfinite(lo) or not np.isfinite(hi):
+            return np.zeros(bins), np.linspace(0, 1, bins + 1)
+        if lo == hi:
+            lo, hi = lo - 0.5, hi + 0.5
+        edges = np.linspace(lo, hi, bins + 1)
+        below = self.stats.sketches[col].cdf(edges)
+        below[-1] = self.stats.sketches[col].count
+        return np.diff(np.concatenate([[0.0], below[1:]])), edges
+
+
+def profile_file(path, progress=None, cancel=None, chunksize=LOAD_CHUNK_ROWS, version=0):
+    """Stream ``path`` chunk by chunk into a ``StreamingProfile`` with bounded memory."""
+    stats = StreamingStats()
+    for chunk in iter_data_chunks(path, progress=progress, cancel=cancel, chunksize=chunksize):
+        stats.update(chunk)
+    return StreamingProfile(stats, version)
+
+
+# ---------- Follow mode ----------
+FOLLOW_INTERVAL_MS = 1000         # how often a followed file is checked for new bytes
+FOLLOW_MAX_BYTES = 64 * 1024 * 1024   # parsed per check; a bigger backlog drains over several checks
+FOLLOW_COMPACT_RATIO = 0.25       # buffered rows, as a share of the frame, that trigger a concat
+FOLLOW_COMPACT_ROWS = 100_000     # ...but never fewer buffered rows than this
+
+
+class FileTruncated(Exception):
+    """Raised by ``FileTail.poll`` when the followed file shrank (rotated or rewritten)."""
+
+
+def frame_stats(df, chunksize=LOAD_CHUNK_ROWS, cancel=None):
+    """``StreamingStats`` of an in-memory frame, fed in chunks to bound the temporaries."""
+    stats = StreamingStats()
+    for start in range(0, len(df), chunksize):
+        if cancel is not None and cancel.is_set():
+            raise LoadCancelled()
+        stats.update(df.iloc[start:start + chunksize])
+    return stats
+
+
+def _conform_batch(batch, dtypes):
+    """Cast freshly parsed rows to the loaded frame's dtypes where that loses nothing.
+
+    Anything that does not fit (an integer out of a downcast range, text in a number
+    column) is left alone, and the later concat widens the dtype. Categoricals are
+    handled by ``append_rows``.
+    """
+    for c, dtype in dtypes.items():
+        s = batch[c]
+        if s.dtype == dtype:
+            continue
+        try:
+            if pd.api.types.is_integer_dtype(dtype) and pd.api.types.is_integer_dtype(s):
+                info = np.iinfo(dtype)
+                if not len(s) or (s.min() >= info.min and s.max() <= info.max):
+                    batch[c] = s.astype(dtype)
+            elif pd.api.types.is_datetime64_any_dtype(dtype):
+                parsed = pd.to_datetime(s, errors="coerce")
+                if parsed.notna().sum() == s.notna().sum():
+                    batch[c] = parsed.astype(dtype)
+            elif isinstance(dtype, pd.StringDtype) and not pd.api.types.is_numeric_dtype(s):
+                batch[c] = s.astype(dtype)
+        except (TypeError, ValueError):
+            pass
+    return batch
+
+
+def append_rows(df, batch):
+    """``df`` with ``batch`` appended and a fresh index; categoricals gain any new categories
+    instead of falling back to text."""
+    df = df.copy(deep=False)
+    for c, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype) and batch[c].dtype != dtype:
+            new = pd.Index(batch[c].dropna().unique()).difference(dtype.categories)
+            if len(new):
+                df[c] = df[c].cat.add_categories(new)
+            batch[c] = batch[c].astype(df[c].dtype)
+    return pd.concat([df, batch], ignore_index=True)
+
+
+class AppendBuffer:
+    """A frame growing by small batches, without copying the frame on every append.
+
+    ``append`` only keeps the batch and adds its size to ``nbytes``; ``compact`` runs
+    ``append_rows`` once for everything buffered. ``due()`` asks for that when the buffer
+    reaches ``FOLLOW_COMPACT_RATIO`` of the frame, so each row is copied a bounded number
+    of times however often small batches arrive.
+    """
+
+    def __init__(self, df, nbytes=None):
+        self.df = df
+        self.nbytes = frame_bytes(df) if nbytes is None else nbytes
+        self.batches = []
+        self.pending_rows = 0
+
+    def __len__(self):
+        return len(self.df) + self.pending_rows
+
+    def append(self, batch):
+        self.batches.append(batch)
+        self.pending_rows += len(batch)
+        self.nbytes += frame_bytes(batch)
+
+    def due(self):
+        return self.pending_rows >= max(FOLLOW_COMPACT_ROWS, len(self.df) * FOLLOW_COMPACT_RATIO)
+
+    def compact(self):
+        """The frame with every buffered batch appended (the same object when none are)."""
+        if self.batches:
+            batch = self.batches[0] if len(self.batches) == 1 else pd.concat(self.batches, ignore_index=True)
+            self.df = append_rows(self.df, batch)
+            self.batches = []
+            self.pending_rows = 0
+        return self.df
+
+
+class FileTail:
+    """Reads only the rows appended to a delimited text file since the last check.
+
+    ``offset`` is the byte position up to which the file is already in the frame (the
+    file size when it was loaded). ``poll()`` parses complete lines past it with the
+    loaded file's format and column names, and keeps a trailing partial line for the next
+    check. A quoted field containing a newline that straddles a check is not supported.
+    """
+
+    def __init__(self, path, columns, dtypes, offset):
+        if os.path.splitext(path)[1].lower() in EXCEL_EXTS + (".json",) + MAPPED_EXTS:
+            raise ValueError("Only delimited text files can be followed")
+        self.path = path
+        self.fmt = sniff_format(path)
+        if self.fmt["encoding"] == "utf-16":
+            raise ValueError("UTF-16 files cannot be followed")
+        self.columns = list(columns)
+        self.dtypes = dict(dtypes)
+        self.offset = offset
+
+    def poll(self, max_bytes=FOLLOW_MAX_BYTES):
+        """New rows as a DataFrame, or None when nothing complete was appended."""
+        size = os.path.getsize(self.path)
+        if size < self.offset:
+            raise FileTruncated(self.path)
+        if size == self.offset:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(min(size - self.offset, max_bytes))
+        end = data.rfind(b"\n")
+        if end < 0:
+            return None
+        data = data[:end + 1]
+        kwargs = _csv_kwargs(self.fmt)
+        kwargs.update(header=None, names=self.columns,
+                      encoding="utf-8" if self.fmt["encoding"] == "utf-8-sig" else self.fmt["encoding"])
+        batch = pd.read_csv(io.BytesIO(data), engine="c", **kwargs)
+        self.offset += len(data)
+        return _conform_batch(batch, self.dtypes)
+
+
+class LiveProfile(StreamingProfile):
+    """Profile of a followed file: in-memory rows plus statistics updated per appended batch.
+
+    Summary numbers, Pearson correlation, histograms and top values come from the
+    ``StreamingStats`` (so refreshing after an append costs only the new rows); the
+    rank correlations and bar-chart aggregations still use the rows in memory.
+    """
+
+    def __init__(self, df, stats, version):
+        super().__init__(stats, version)
+        self.df = df
+
+    def correlation(self, method="pearson", sample_rows=None):
+        if method == "pearson":
+            return super().correlation(method)
+        return DatasetProfile.correlation(self, method, sample_rows)
+
+
+# ---------- Plot level-of-detail ----------
+LOD_MIN_POINTS = 20_000           # below this, plot raw data
+LOD_BUCKET_PX = 1                 # min/max bucket width in screen pixels
+RASTER_BIN_PX = 3                 # scatter density cell size in screen pixels
+
+
+def _as_plot_numbers(s):
+    """Float view of a Series for range math (datetimes become matplotlib date numbers)."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return mdates.date2num(s.to_numpy())
+    return pd.to_numeric(s, errors="coerce").to_numpy(dtype=float)
+
+
+def minmax_decimate(y, buckets):
+    """Indices of the min and max of ``y`` within ``buckets`` equal runs, in row order.
+
+    Keeping both extremes per pixel column draws the same envelope as the full line.
+    """
+    n = len(y)
+    if buckets <= 0 or n <= 2 * buckets:
+        return np.arange(n)
+    size = n // buckets
+    m = size * buckets
+    body = y[:m].reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    idx = np.concatenate([offsets + body.argmin(axis=1), offsets + body.argmax(axis=1)])
+    if m < n:
+        tail = y[m:]
+        idx = np.concatenate([idx, [m + tail.argmin(), m + tail.argmax()]])
+    return np.unique(idx)
+
+
+class LineLOD:
+    """Keeps a Line2D decimated to the axes pixel width and re-decimates on zoom/pan."""
+
+    def __init__(self, ax, x, y, **line_kwargs):
+        xs = _as_plot_numbers(x)
+        ys = pd.to_numeric(y, errors="coerce").to_numpy(dtype=float)
+        keep = ~(np.isnan(xs) | np.isnan(ys))
+        self.ax = ax
+        self.x_orig = x.to_numpy()[keep]
+        self.x = xs[keep]
+        self.y = ys[keep]
+        self.sorted = bool(len(self.x) < 2 or np.all(self.x[1:] >= self.x[:-1]))
+        (self.line,) = ax.plot(self.x_orig[:0], self.y[:0], **line_kwargs)
+        self._set_rows(np.arange(len(self.x)))
+        if len(self.x):
+            pad = (self.y.max() - self.y.min()) * 0.05 or 1
+            ax.set_ylim(self.y.min() - pad, self.y.max() + pad)
+            ax.set_xlim(self.x_orig[0] if self.sorted else self.x_orig[self.x.argmin()],
+                        self.x_orig[-1] if self.sorted else self.x_orig[self.x.argmax()])
+        ax.callbacks.connect("xlim_changed", self._on_limits)
+
+    def _set_rows(self, rows):
+        buckets = max(1, int(self.ax.bbox.width) // LOD_BUCKET_PX)
+        if len(rows) > max(LOD_MIN_POINTS, 2 * buckets):
+            rows = rows[minmax_decimate(self.y[rows], buckets)]
+        self.line.set_data(self.x_orig[rows], self.y[rows])
+
+    def _on_limits(self, ax):
+        lo, hi = ax.get_xlim()
+        if self.sorted:
+            # a sorted x lets the visible window be found by binary search
+            a = max(0, np.searchsorted(self.x, lo) - 1)
+            b = min(len(self.x), np.searchsorted(self.x, hi, side="right") + 1)
+            rows = np.arange(a, b)
+        else:
+            rows = np.flatnonzero((self.x >= lo) & (self.x <= hi))
+        self._set_rows(rows)
+
+
+class ScatterRaster:
+    """Scatter plot drawn as a 2D density image binned at screen resolution.
+
+    Zooming or panning re-bins only the points inside the new view.
+    """
+
+    def __init__(self, ax, x, y, cmap="viridis"):
+        xs = _as_plot_numbers(x)
+        ys = _as_plot_numbers(y)
+        keep = ~(np.isnan(xs) | np.isnan(ys))
+        self.ax = ax
+        self.x, self.y = xs[keep], ys[keep]
+        self.image = ax.imshow(np.zeros((1, 1)), origin="lower", aspect="auto", cmap=cmap,
+                               interpolation="nearest", norm=mcolors.LogNorm(vmin=1, vmax=2))
+        self.image.cmap.set_bad(alpha=0)
+        if len(self.x):
+            self._render(self.x.min(), self.x.max(), self.y.min(), self.y.max())
+        self._busy = False
+        ax.callbacks.connect("xlim_changed", self._on_limits)
+        ax.callbacks.connect("ylim_changed", self._on_limits)
+
+    def _render(self, x0, x1, y0, y1):
+        if x0 == x1:
+            x0, x1 = x0 - 0.5, x1 + 0.5
+        if y0 == y1:
+            y0, y1 = y0 - 0.5, y1 + 0.5
+        nx = max(10, int(self.ax.bbox.width) // RASTER_BIN_PX)
+        ny = max(10, int(self.ax.bbox.height) // RASTER_BIN_PX)
+        counts, _, _ = np.histogram2d(self.y, self.x, bins=(ny, nx), range=((y0, y1), (x0, x1)))
+        counts = np.ma.masked_equal(counts, 0)
+        self.image.set_data(counts)
+        self.image.set_extent((x0, x1, y0, y1))
+        self.image.set_norm(mcolors.LogNorm(vmin=1, vmax=max(2, counts.max() if counts.count() else 2)))
+
+    def _on_limits(self, ax):
+        if self._busy:
+            return
+        # set_extent may touch the limits again; guard against re-entry
+        self._busy = True
+        try:
+            (x0, x1), (y0, y1) = ax.get_xlim(), ax.get_ylim()
+            self._render(x0, x1, y0, y1)
+            ax.set_xlim(x0, x1, emit=False)
+            ax.set_ylim(y0, y1, emit=False)
+        finally:
+            self._busy = False
+
+
+# ---------- Export ----------
+EXPORT_CHUNK_ROWS = 250_000       # rows formatted per task (and per Parquet row group / Arrow batch)
+EXPORT_GZIP_LEVEL = 6
+EXPORT_FORMATS = {                # file suffix -> (format, default compression)
+    ".csv": ("csv", None),
+    ".csv.gz": ("csv", "gzip"),
+    ".csv.zst": ("csv", "zstd"),
+    ".parquet": ("parquet", "zstd"),
+    ".feather": ("arrow", None),
+    ".arrow": ("arrow", None),
+    ".ipc": ("arrow", None),
+}
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def export_format(path):
+    """``(format, default compression)`` named by the suffix of ``path``."""
+    name = path.lower()
+    for suffix in sorted(EXPORT_FORMATS, key=len, reverse=True):
+        if name.endswith(suffix):
+            return EXPORT_FORMATS[suffix]
+    raise ValueError(f"Unknown export format for {os.path.basename(path)}; use one of {', '.join(EXPORT_FORMATS)}")
+
+
+def _ordered_map(fn, items, workers):
+    """``fn`` over ``items`` on a thread pool, yielded in order with at most ``2 * workers`` in flight."""
+    pool = ThreadPoolExecutor(max_workers=workers)
+    pending = collections.deque()
+    try:
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _compressor(compression):
+    """``bytes -> bytes`` producing one complete gzip member / zstd frame, or None for no compression.
+
+    Concatenated members (frames) are themselves a valid .gz (.zst) stream, so chunks can be
+    compressed independently on worker threads (zlib and zstd release the GIL).
+    """
+    if compression is None:
+        return None
+    if compression == "gzip":
+        return partial(gzip.compress, compresslevel=EXPORT_GZIP_LEVEL)
+    if compression != "zstd":
+        raise ValueError(f"Unsupported CSV compression {compression!r}; use gzip or zstd")
+    if HAS_PYARROW:
+        import pyarrow as pa
+        codec = pa.Codec("zstd")
+        return partial(codec.compress, asbytes=True)
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("zstd compression needs pyarrow or zstandard") from None
+    return zstandard.ZstdCompressor().compress
+
+
+def _arrow_frame(df):
+    """``(df, schema)`` ready for Arrow; columns Arrow cannot type (mixed objects) become text.
+
+    The chunked text loader used to leave ints and strings in one object column; writing
+    those values as their ``str()`` is what ``to_csv`` does too. Missing values stay missing.
+    """
+    import pyarrow as pa
+    try:
+        return df, pa.Schema.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        pass
+    fields, fixed = [], {}
+    for i, name in enumerate(df.columns):
+        part = df.iloc[:, [i]]
+        try:
+            fields.append(pa.Schema.from_pandas(part, preserve_index=False).field(0))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            fixed[i] = df.iloc[:, i].map(str, na_action="ignore").astype(object)
+            fields.append(pa.field(name, pa.string()))
+    df = df.copy(deep=False)
+    for i, s in fixed.items():
+        df.isetitem(i, s)
+    return df, pa.schema(fields)
+
+
+def _csv_column_formats(df, schema):
+    """Per column, how ``_csv_like_pandas`` renders it: ``"float"``, ``"bool"``, ``"date"`` or a time unit."""
+    import pyarrow as pa
+    formats = {}
+    for name, field in zip(df.columns, schema):
+        s = df[name]
+        if pa.types.is_boolean(field.type):         # also object columns of True / False / NaN
+            formats[name] = "bool"
+        elif pa.types.is_floating(field.type):
+            formats[name] = "float"
+        elif pa.types.is_timestamp(field.type) and field.type.tz is None and pd.api.types.is_datetime64_dtype(s):
+            # like to_csv: dates only when every value is midnight, else seconds plus as many
+            # fraction digits (ms / us / ns) as the column needs
+            values = s.dropna()
+            if not len(values) or (values == values.dt.normalize()).all():
+                formats[name] = "date"
+            else:
+                formats[name] = next((u for u in ("s", "ms", "us") if (values == values.dt.floor(u)).all()), "ns")
+    return formats
+
+
+def _csv_like_pandas(table, formats):
+    """Rewrite the columns where Arrow's CSV text differs from ``to_csv`` in meaning or looks.
+
+    Booleans become ``True`` / ``False``, timestamps lose the ``.000000`` Arrow always adds,
+    and whole floats keep their ``.0`` so the file reads back as float. Other numbers keep
+    Arrow's shortest round-trip form (``1.5e-7`` where pandas writes ``1.5e-07``).
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    for i, name in enumerate(table.column_names):
+        how = formats.get(name)
+        if how is None:
+            continue
+        col = table.column(i)
+        if how == "bool":
+            col = pc.if_else(col, "True", "False")
+        elif how == "float":
+            col = pc.replace_substring_regex(pc.cast(col, pa.string()), pattern=r"^(-?\d+)$", replacement=r"\1.0")
+        else:
+            # the text cast prints as many fraction digits as the unit has
+            col = pc.cast(pc.cast(col, pa.date32() if how == "date" else pa.timestamp(how)), pa.string())
+        table = table.set_column(i, name, col)
+    return table
+
+
+def _write_csv_chunk(table):
+    """CSV text of ``table`` without a header, quoting values only where a chunk needs it."""
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    for quoting in ("none", "needed"):
+        # "none" refuses values with delimiters, quotes or line breaks; such chunks quote text
+        sink = pa.BufferOutputStream()
+        try:
+            pa_csv.write_csv(table, sink, pa_csv.WriteOptions(include_header=False, quoting_style=quoting))
+        except pa.ArrowInvalid as e:
+            error = e
+            continue
+        return sink.getvalue().to_pybytes()
+    raise error
+
+
+def export_frame(df, path, compression="auto", progress=None, cancel=None, workers=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write ``df`` to ``path`` in the format its suffix names (see ``EXPORT_FORMATS``).
+
+    Row chunks are formatted on a thread pool and written in order, so memory stays at a few
+    chunks whatever the frame size. With pyarrow, CSV is formatted by Arrow's writer (it
+    releases the GIL) and reads back the same as ``to_csv`` output, but is not byte-identical:
+    in a chunk where some text needs quotes all text is quoted, and some floats use another
+    exponent form (see ``_csv_like_pandas``); without pyarrow pandas formats each chunk. For ``.gz`` / ``.zst``
+    each chunk is also compressed on its worker into its own gzip member / zstd frame.
+    Parquet, Feather and Arrow IPC need pyarrow; columns of mixed Python types are written
+    as text (see ``_arrow_frame``). ``progress(rows_done, rows_total)`` follows each
+    chunk and ``cancel`` (a ``threading.Event``) raises ``ExportCancelled``. The file only
+    appears under ``path`` once complete; returns its size in bytes.
+    """
+    fmt, default = export_format(path)
+    compression = default if compression == "auto" else compression
+    if fmt != "csv" and not HAS_PYARROW:
+        raise ValueError(f"{fmt.capitalize()} export needs pyarrow")
+    workers = workers or min(8, os.cpu_count() or 1)
+    total = len(df)
+    df = df.set_axis([str(c) for c in df.columns], axis=1)
+    starts = range(0, max(total, 1), chunk_rows)
+    schema = None
+    if HAS_PYARROW:
+        df, schema = _arrow_frame(df)
+    done = 0
+
+    def advance(rows):
+        nonlocal done
+        if cancel is not None and cancel.is_set():
+            raise ExportCancelled()
+        done += rows
+        if progress is not None:
+            progress(done, total)
+
+    tmp = f"{path}.{os.getpid()}.part"
+    try:
+        if fmt == "csv":
+            if schema is not None:
+                import pyarrow as pa
+                formats = _csv_column_formats(df, schema)
+                header = df.head(0).to_csv(index=False).encode("utf-8")
+
+                def format_chunk(start):
+                    table = pa.Table.from_pandas(df.iloc[start:start + chunk_rows], schema=schema, preserve_index=False, nthreads=1)
+                    data = _write_csv_chunk(_csv_like_pandas(table, formats))
+                    return table.num_rows, header + data if start == 0 else data
+            else:
+                def format_chunk(start):
+                    chunk = df.iloc[start:start + chunk_rows]
+                    return len(chunk), chunk.to_csv(index=False, header=start == 0).encode("utf-8")
+
+            compress = _compressor(compression)
+
+            def encode_chunk(start):
+                rows, data = format_chunk(start)
+                return rows, compress(data) if compress is not None else data
+
+            with open(tmp, "wb") as out:
+                for rows, data in _ordered_map(encode_chunk, starts, workers):
+                    out.write(data)
+                    advance(rows)
+        else:
+            import pyarrow as pa
+
+            def to_table(start):
+                return pa.Table.from_pandas(df.iloc[start:start + chunk_rows], schema=schema, preserve_index=False, nthreads=1)
+
+            if fmt == "parquet":
+                import pyarrow.parquet as pq
+                writer = pq.ParquetWriter(tmp, schema, compression=compression or "none")
+            else:
+                writer = pa.ipc.new_file(tmp, schema, options=pa.ipc.IpcWriteOptions(compression=compression))
+            with writer:
+                for table in _ordered_map(to_table, starts, workers):
+                    writer.write_table(table)
+                    advance(table.num_rows)
+        os.replace(tmp, path)
+    except BaseException:
+        FrameCache._remove(tmp)
+        raise
+    return os.path.getsize(path)
+
+
+# ---------- PDF report ----------
+REPORT_TITLE = "📊 Milo – Data Insight Pro - Report"
+REPORT_HISTOGRAMS = 3             # histograms for the first N numeric columns
+
+# fpdf2 accepts file-like images; the original PyFPDF 1.x only takes paths
+FPDF_IN_MEMORY_IMAGES = not str(getattr(fpdf, "FPDF_VERSION", "1")).startswith("1.")
+RENDER_WORKERS = 4                # threads rendering report figures
+
+
+def report_figure_specs(profile):
+    """Every report figure as ``[(cache_key, make_spec), ...]``.
+
+    ``make_spec()`` returns a small dict holding only aggregated numbers (correlation
+    matrix, histogram counts), never the DataFrame, so rendering does not touch the data.
+    It is only called for figures missing from the cache.
+    """
+    specs = []
+    if len(profile.numeric_columns) >= 2:
+        def corr_spec():
+            c, note = heatmap_view(profile.corr)
+            return {"kind": "corr", "values": c.to_numpy(), "labels": [str(x) for x in c.columns], "note": note}
+        specs.append((("corr",), corr_spec))
+    for col in profile.numeric_columns[:REPORT_HISTOGRAMS]:
+        def hist_spec(col=col):
+            counts, edges = profile.histogram(col, bins=20)
+            return {"kind": "hist", "counts": counts, "edges": edges, "title": f"Histogram of {col}"}
+        specs.append((("hist", col, 20), hist_spec))
+    return specs
+
+
+def render_figure_png(spec):
+    """Render one figure spec to PNG bytes with the Agg canvas (safe in any thread or process)."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    if spec["kind"] == "corr":
+        fig = Figure(figsize=(6,4), dpi=120)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        im = draw_heatmap(ax, spec["values"], spec["labels"], "Correlation matrix", spec.get("note", ""))
+        fig.colorbar(im, ax=ax)
+    else:
+        fig = Figure(figsize=(6,3), dpi=120)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        edges = spec["edges"]
+        ax.hist(edges[:-1], bins=edges, weights=spec["counts"])
+        ax.set_title(spec["title"])
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    # FPDF splits alpha channels pixel by pixel in Python; an opaque RGB PNG embeds directly
+    out = io.BytesIO()
+    Image.open(buf).convert("RGB").save(out, format="PNG")
+    return out.getvalue()
+
+
+def render_figures(specs, cache, parallel=True):
+    """PNG bytes for every spec, in order. Cached entries are reused; the rest render in parallel.
+
+    Each figure owns its Agg canvas, so threads can draw side by side without pyplot's global
+    state; the pool lives only for this call. (Forking worker processes from the GUI's report
+    thread is not safe.)
+    """
+    missing = [(key, make_spec()) for key, make_spec in specs if key not in cache]
+    if parallel and len(missing) > 1:
+        with ThreadPoolExecutor(max_workers=min(RENDER_WORKERS, len(missing))) as pool:
+            for (key, _), png in zip(missing, pool.map(render_figure_png, [sp for _, sp in missing])):
+                cache[key] = png
+    for key, spec in missing:
+        if key not in cache:
+            cache[key] = render_figure_png(spec)
+    return [cache[key] for key, _ in specs]
+
+
+def _pdf_image(pdf, png, tmpdir, name, **kwargs):
+    """Place PNG bytes on the page; in memory with fpdf2, via a scratch file with PyFPDF 1.x."""
+    if FPDF_IN_MEMORY_IMAGES:
+        pdf.image(io.BytesIO(png), type="PNG", **kwargs)
+        return
+    path = os.path.join(tmpdir, name)
+    with open(path, "wb") as f:
+        f.write(png)
+    pdf.image(path, type="PNG", **kwargs)
+
+
+def _pdf_text(text):
+    """The built-in PDF fonts are latin-1 only; replace anything else (emoji, CJK) with '?'."""
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+def build_pdf_report(profile, path, source=None, parallel=True):
+    """Write the PDF report for ``profile`` to ``path``. Figures are cached on the profile.
+
+    ``parallel=False`` renders figures in the calling thread (used by batch workers).
+    """
+    pngs = render_figures(report_figure_specs(profile), profile.figure_cache, parallel=parallel)
+    name = os.path.basename(source) if source else "(in-memory)"
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=12)
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, _pdf_text(REPORT_TITLE), ln=True)
+    pdf.set_font("Arial", size=11)
+    pdf.cell(0, 8, _pdf_text(f"File: {name}"), ln=True)
+    pdf.cell(0, 8, f"Rows: {profile.rows} | Columns: {profile.cols}", ln=True)
+    pdf.ln(6)
+
+    lines = [REPORT_TITLE, f"File: {name}", f"Rows: {profile.rows} | Columns: {profile.cols}", ""]
+    lines += profile.describe_all.to_string().splitlines()
+    pdf.set_font("Arial", size=9)
+    for line in lines:
+        # wrap long lines
+        for chunk in [line[i:i+90] for i in range(0, len(line), 90)]:
+            pdf.cell(0, 5, _pdf_text(chunk), ln=True)
+    pdf.ln(6)
+
+    # the scratch dir is only used by PyFPDF 1.x and is removed on exit either way
+    with tempfile.TemporaryDirectory(prefix="milo_report_") as tmpdir:
+        for i, png in enumerate(pngs):
+            pdf.add_page()
+            try:
+                _pdf_image(pdf, png, tmpdir, f"figure_{i}.png", x=10, y=20, w=pdf.w - 20)
+            except Exception:
+                continue
+        pdf.output(path)
+
+
+# ---------- Instrumentation ----------
+PERF_LOG_LIMIT = 2000             # operations kept in memory
+PERF_PROFILE_LINES = 25           # cProfile rows kept per captured operation
+
+try:
+    import psutil  # optional, gives RSS on every platform
+except Exception:
+    psutil = None
+try:
+    import resource
+except ImportError:               # Windows
+    resource = None
+
+
+def rss_bytes():
+    """Current resident set size of this process, or None if it cannot be read."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_bytes():
+    """High-water mark of the resident set size, or None if it cannot be read."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    if psutil is not None:
+        return getattr(psutil.Process().memory_info(), "peak_wset", None)
+    return None
+
+
+def _delta(after, before):
+    return after - before if after is not None and before is not None else None
+
+
+class PerfLog:
+    """Per-operation timing log: wall and CPU time, memory and data shape.
+
+    ``with log.measure("clean", rows=n) as rec:`` records one operation; the body may add
+    fields to ``rec`` (``rows``, ``cols``, ...). CPU time is process-wide, so it includes
+    worker threads. ``rss_delta`` is the change in resident memory and ``peak_rss_delta``
+    how far the operation pushed the process high-water mark. Setting ``profile`` or
+    ``trace_memory`` additionally captures a cProfile listing or the Python-level
+    allocation peak (tracemalloc); both slow the operation down and, being process-wide,
+    only one cProfile capture runs at a time.
+    """
+
+    def __init__(self, limit=PERF_LOG_LIMIT):
+        self.records = collections.deque(maxlen=limit)
+        self.profile = False
+        self.trace_memory = False
+        self._lock = threading.Lock()
+        self._profiling = threading.Lock()
+
+    @contextmanager
+    def measure(self, op, **fields):
+        rec = {"op": op, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), **fields}
+        profiler = None
+        if self.profile and self._profiling.acquire(blocking=False):
+            profiler = cProfile.Profile()
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        rss0, peak0 = rss_bytes(), peak_rss_bytes()
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield rec
+        except BaseException as e:
+            rec["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            rec["wall_s"] = round(time.perf_counter() - wall0, 6)
+            rec["cpu_s"] = round(time.process_time() - cpu0, 6)
+            rec["rss_delta"] = _delta(rss_bytes(), rss0)
+            rec["peak_rss_delta"] = _delta(peak_rss_bytes(), peak0)
+            if tracing:
+                rec["py_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            if profiler is not None:
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PERF_PROFILE_LINES)
+                rec["profile"] = out.getvalue()
+                self._profiling.release()
+            with self._lock:
+                self.records.append(rec)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.records)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+    def summary(self):
+        """Per-operation count, mean / max wall time and largest peak RSS increase."""
+        df = pd.DataFrame(self.snapshot())
+        if df.empty:
+            return df
+        if "peak_rss_delta" not in df:
+            df["peak_rss_delta"] = np.nan
+        return df.groupby("op").agg(count=("wall_s", "size"), mean_wall_s=("wall_s", "mean"),
+                                    max_wall_s=("wall_s", "max"), max_peak_rss_delta=("peak_rss_delta", "max"))
+
+    def export_jsonl(self, path):
+        """Write every record as one JSON object per line; returns the number written."""
+        records = self.snapshot()
+        with open(path, "w", encoding="utf-8") as f:
+            for rec in records:
+                f.write(json.dumps(rec, default=str) + "\n")
+        return len(records)
+
+
+# ---------- Batch / command line ----------
+CLEAN_STEPS = CleaningPlan.STEPS
+
+
+def process_file(path, out_dir, clean=(), write_csv=False, write_pdf=False, streaming=False, optimize=False,
+                 dedup_keys=None, out_format="csv"):
+    """Load -> clean -> profile -> report for one file; returns a summary dict.
+
+    Runs in a worker process, so figures render in-process (no nested render pool).
+    ``write_csv`` writes the cleaned frame as ``<name>_clean.<out_format>`` (see ``EXPORT_FORMATS``).
+    With ``streaming`` the only cleaning step is dedup, done out-of-core by ``dedup_file``.
+    Each stage is timed; the ``PerfLog`` records come back under ``"perf"``.
+    """
+    started = time.perf_counter()
+    stem = os.path.splitext(os.path.basename(path))[0]
+    perf = PerfLog()
+    outputs = []
+    duplicates = None
+    if streaming:
+        source = path
+        if "dedup" in clean:
+            csv_path = os.path.join(out_dir, f"{stem}_clean.csv")
+            with perf.measure("dedup_file", file=path) as rec:
+                result = dedup_file(path, csv_path, subset=dedup_keys)
+                rec.update(rows=result["rows"], duplicates=result["duplicates"])
+            duplicates = result["duplicates"]
+            source = csv_path
+            outputs.append(csv_path)
+        with perf.measure("profile_file", file=source) as rec:
+            profile = profile_file(source)
+            rec.update(rows=profile.rows, cols=profile.cols)
+    else:
+        with perf.measure("load", file=path) as rec:
+            df = try_read_data(path, optimize=optimize)
+            rec.update(rows=len(df), cols=len(df.columns))
+        if clean:
+            with perf.measure("clean", file=path, steps=",".join(clean)) as rec:
+                plan = CleaningPlan(clean, dedup_keys)
+                df = plan.execute(df)
+                rec.update(rows=len(df), cols=len(df.columns))
+            duplicates = plan.removed.get("dedup")
+        if write_csv:
+            out_path = os.path.join(out_dir, f"{stem}_clean.{out_format}")
+            with perf.measure("export", file=out_path, rows=len(df), cols=len(df.columns)) as rec:
+                rec["bytes"] = export_frame(df, out_path)
+            outputs.append(out_path)
+        profile = DatasetProfile(df, 0)
+    if write_pdf:
+        pdf_path = os.path.join(out_dir, f"{stem}_report.pdf")
+        with perf.measure("pdf_report", file=pdf_path, rows=profile.rows, cols=profile.cols):
+            build_pdf_report(profile, pdf_path, path, parallel=False)
+        outputs.append(pdf_path)
+    return {"file": path, "rows": profile.rows, "cols": profile.cols, "duplicates": duplicates,
+            "outputs": outputs, "seconds": round(time.perf_counter() - started, 3), "perf": perf.snapshot()}
+
+
+def _expand_inputs(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        paths.extend(matches if matches else [pattern])
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="milo_engine", description="Headless Milo batch pipeline: load, clean, profile and report many files in parallel.")
+    parser.add_argument("inputs", nargs="+", help="input files or glob patterns")
+    parser.add_argument("-o", "--out", default=".", help="output directory (default: current directory)")
+    parser.add_argument("--clean", default="", help=f"comma separated cleaning steps: {', '.join(CLEAN_STEPS)}")
+    parser.add_argument("--dedup-keys", default="", help="comma separated key columns for dedup (default: all columns)")
+    parser.add_argument("--csv", action="store_true", help="write <name>_clean.csv (or the --format below)")
+    parser.add_argument("--format", default="csv", choices=[suffix.lstrip(".") for suffix in EXPORT_FORMATS],
+                        help="file format for --csv output (default: csv)")
+    parser.add_argument("--pdf", action="store_true", help="write <name>_report.pdf")
+    parser.add_argument("--streaming", action="store_true", help="profile out-of-core; only the dedup cleaning step is available")
+    parser.add_argument("--optimize", action="store_true", help="shrink dtypes after loading (category, Arrow strings, downcasts)")
+    parser.add_argument("--perf", metavar="PATH", help="append per-stage timings (JSON lines) to PATH")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="parallel worker processes")
+    args = parser.parse_args(argv)
+
+    clean = tuple(step for step in args.clean.split(",") if step)
+    unknown = [step for step in clean if step not in CLEAN_STEPS]
+    if unknown:
+        parser.error(f"unknown cleaning step(s): {', '.join(unknown)}")
+    if args.streaming and set(clean) - {"dedup"}:
+        parser.error("--streaming only supports the dedup cleaning step")
+    if args.streaming and bool(clean) != args.csv:
+        parser.error("with --streaming, --csv and --clean dedup go together")
+    if args.streaming and args.format != "csv":
+        parser.error("--streaming writes plain csv only")
+    os.makedirs(args.out, exist_ok=True)
+    paths = _expand_inputs(args.inputs)
+
+    failed = 0
+    dedup_keys = [k for k in args.dedup_keys.split(",") if k] or None
+    opts = dict(clean=clean, write_csv=args.csv, write_pdf=args.pdf, streaming=args.streaming, optimize=args.optimize,
+                dedup_keys=dedup_keys, out_format=args.format)
+    with ProcessPoolExecutor(max_workers=max(1, min(args.jobs, len(paths)))) as pool:
+        futures = {pool.submit(process_file, p, args.out, **opts): p for p in paths}
+        for fut in as_completed(futures):
+            try:
+                r = fut.result()
+                dups = f" duplicates={r['duplicates']}" if r["duplicates"] is not None else ""
+                print(f"ok    {r['file']}  rows={r['rows']} cols={r['cols']}{dups}  {r['seconds']}s  {' '.join(r['outputs'])}")
+                if args.perf:
+                    with open(args.perf, "a", encoding="utf-8") as f:
+                        for rec in r["perf"]:
+                            f.write(json.dumps(rec, default=str) + "\n")
+            except Exception as e:
+                failed += 1
+                print(f"FAIL  {futures[fut]}  {e}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import milo_engine as E
+
+
+@pytest.mark.parametrize("dtype", ["category", "str", object])
+def test_group_aggregate_on_text_and_category_x(dtype):
+    df = pd.DataFrame({"x": pd.Series(["a", "b", "a", "c", None, "b"], dtype=dtype),
+                       "y": [1.0, 2.0, 3.0, 4.0, 5.0, np.nan]})
+    # the Bar path takes this route for every x column that is not numeric
+    assert not pd.api.types.is_numeric_dtype(df["x"])
+    out = E.group_aggregate(df, "x", "y", "mean")
+    assert out.to_dict() == {"c": 4.0, "b": 2.0, "a": 2.0}
+
+
+def test_group_aggregate_folds_small_groups_into_other():
+    df = pd.DataFrame({"x": list("aabbbcd"), "y": [1, 1, 1, 1, 1, 1, 1]})
+    out = E.group_aggregate(df, "x", "y", "count", top_n=2)
+    assert out.to_dict() == {"b": 3.0, "a": 2.0, "Other (2 groups)": 2.0}
+
+
+@pytest.mark.parametrize("agg", ["mean", "count", "median"])
+def test_unused_categories_are_not_groups(agg):
+    x = pd.Categorical(list("abab") + ["c"], categories=list("zabcy"))[:4]   # z, c, y unused
+    df = pd.DataFrame({"x": x, "y": [1.0, 2.0, 3.0, np.nan]})
+    out = E.group_aggregate(df, "x", "y", agg, top_n=1)
+    expected = df.groupby("x", observed=True)["y"].agg(agg).astype(float)
+    assert out.iloc[0] == expected.max()
+    assert out.index.tolist() == [str(expected.idxmax()), "Other (1 group)"]
+    assert E.group_aggregate(df, "x", "y", agg).sort_index().to_dict() == expected.rename(str).to_dict()
@@ -0,0 +1,40 @@
+import json
+
+import milo_bench as B
+
+
+def result(op, wall_s, peak_mb=10.0):
+    return {"case": "c", "op": op, "wall_s": wall_s, "peak_mb": peak_mb}
+
+
+def test_compare_flags_changes_beyond_the_noise_floors():
+    baseline = {"results": [result("load", 1.0), result("clean", 1.0), result("export", 1.0),
+                            result("plot", 0.001), result("search", 1.0, peak_mb=100.0)]}
+    current = [result("load", 1.5), result("clean", 0.5), result("export", 1.1),
+               result("plot", 0.01), result("search", 1.0, peak_mb=150.0), result("report", 1.0)]
+    table = B.compare(current, baseline, tolerance=0.25).set_index("op")
+    assert table["status"].to_dict() == {"load": "slower", "clean": "faster", "export": "ok",
+                                         "plot": "ok", "search": "more memory", "report": "new"}
+
+
+def test_main_exit_code_follows_the_baseline(tmp_path, monkeypatch, capsys):
+    args = ["--rows", "2000", "--cols", "4", "--ops", "load", "--repeat", "1",
+            "--data-dir", str(tmp_path / "data")]
+    saved = tmp_path / "baseline.json"
+    assert B.main(args + ["--save", str(saved)]) == 0
+    baseline = json.loads(saved.read_text())
+    assert [r["op"] for r in baseline["results"]] == ["load"]
+
+    generous = tmp_path / "generous.json"
+    for r in baseline["results"]:
+        r["wall_s"] *= 100
+    generous.write_text(json.dumps(baseline))
+    assert B.main(args + ["--baseline", str(generous)]) == 0
+
+    strict = tmp_path / "strict.json"
+    for r in baseline["results"]:
+        r["wall_s"] /= 10_000
+    strict.write_text(json.dumps(baseline))
+    monkeypatch.setattr(B, "BENCH_MIN_DELTA_S", 0.0)
+    assert B.main(args + ["--baseline", str(strict)]) == 1
+    assert "regression" in capsys.readouterr().err
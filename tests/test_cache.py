@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import milo_engine as E
+
+pytestmark = pytest.mark.skipif(not E.HAS_PYARROW, reason="the frame cache needs pyarrow")
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "data.csv"
+    rows = ["id,name,score,when"] + [f"{i},{'' if i % 4 == 0 else f'n{i % 9}'},{i / 3},2024-02-{i % 28 + 1:02d}"
+                                     for i in range(200)]
+    path.write_text("\n".join(rows) + "\n")
+    return str(path)
+
+
+def test_round_trip_keeps_dtypes_and_attrs(tmp_path, source):
+    df = pd.DataFrame({
+        "text": pd.Series(["a", None, "c"], dtype="str"),
+        "obj": pd.Series(["a", np.nan, "c"], dtype=object),
+        "arrow": pd.Series(["a", None, "c"], dtype="string[pyarrow]"),
+        "cat": pd.Categorical(["x", "y", None]),
+        "when": pd.to_datetime(["2020-01-01", None, "2020-01-03"]),
+        "f": [1.0, np.nan, 2.0],
+        "small": np.int8([1, 2, 3]),
+        "flag": [True, False, True],
+    })
+    df.attrs = {"milo_format": "comma, utf-8", "milo_memory": "memory 1 KB -> 1 KB"}
+    cache = E.FrameCache(str(tmp_path / "cache"))
+    assert cache.put(source, df)
+    hit = cache.get(source)
+    pd.testing.assert_frame_equal(hit, df)
+    assert hit.attrs == df.attrs
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_hit_equals_miss(tmp_path, source, optimize):
+    cache = E.FrameCache(str(tmp_path / "cache"))
+    miss = E.read_data_cached(source, cache, optimize=optimize)
+    hit = E.read_data_cached(source, cache, optimize=optimize)
+    assert miss.attrs.pop("milo_cache") == "cache miss (stored)"
+    assert hit.attrs.pop("milo_cache") == "cache hit"
+    pd.testing.assert_frame_equal(hit, miss)
+    assert hit.attrs == miss.attrs
+
+
+def test_changed_file_is_a_miss(tmp_path, source):
+    cache = E.FrameCache(str(tmp_path / "cache"))
+    E.read_data_cached(source, cache)
+    with open(source, "a") as f:
+        f.write("999,zz,1.5,2024-03-01\n")
+    df = E.read_data_cached(source, cache)
+    assert df.attrs["milo_cache"] == "cache miss (stored)"
+    assert len(df) == 201
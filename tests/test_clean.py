@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import milo_engine as E
+
+
+def messy_frame():
+    return pd.DataFrame({
+        "id": [1, 2, 2, 3, 4, 4],
+        "name": [" a", "b ", "b ", None, "d", "d"],
+        "score": [1.5, np.nan, np.nan, 3.0, 4.0, 4.0],
+    })
+
+
+def test_dropna_and_dedup_match_pandas():
+    df = messy_frame()
+    before = df.copy()
+    plan = E.CleaningPlan(["dropna", "dedup"])
+    out = plan.execute(df)
+    expected = df.dropna().drop_duplicates().reset_index(drop=True)
+    pd.testing.assert_frame_equal(out, expected, check_dtype=False)
+    assert plan.removed == {"dropna": 3, "dedup": 1}
+    pd.testing.assert_frame_equal(df, before)         # the input is never modified
+
+
+def test_dedup_on_key_columns():
+    out = E.clean_frame(messy_frame(), dedup=True, dedup_subset=["id"])
+    assert out["id"].tolist() == [1, 2, 3, 4]
+    with pytest.raises(KeyError):
+        E.clean_frame(messy_frame(), dedup=True, dedup_subset=["nope"])
+
+
+def test_fill_after_drop_is_optimized_away():
+    assert E.CleaningPlan(["fillna", "dropna"]).explain() == ["dropna"]
+
+
+@pytest.mark.parametrize("dtype", ["Int64", "boolean", "int64[pyarrow]", "bool[pyarrow]"])
+def test_dedup_with_missing_values_in_nullable_columns(dtype):
+    values = [1, None, 1, None, 0, 1] if "bool" not in dtype else [True, None, True, None, False, True]
+    df = pd.DataFrame({"k": pd.array(values, dtype=dtype), "v": [1, 2, 1, 2, 3, 4]})
+    out = E.clean_frame(df, dedup=True)
+    pd.testing.assert_frame_equal(out, df.drop_duplicates().reset_index(drop=True))
+
+
+def test_history_undo_redo_and_revert():
+    loaded = messy_frame()
+    history = E.CleaningHistory(limit=2)
+    history.reset(loaded)
+    steps = [E.CleaningPlan([step]).execute(loaded) for step in ("dropna", "dedup", "trim")]
+    history.push(steps[0], "dropna")
+    history.push(steps[1], "dedup")
+    history.push(steps[2], "trim")          # over the limit: the oldest step goes, "Loaded" stays
+    assert [label for label, _ in history.states] == ["Loaded", "dedup", "trim"]
+    assert history.undo() is steps[1] and history.undo() is loaded and not history.can_undo()
+    assert history.redo() is steps[1] and history.can_redo()
+    history.push(steps[0], "dropna")        # a new step drops the redo branch
+    assert [label for label, _ in history.states] == ["Loaded", "dedup", "dropna"] and not history.can_redo()
+    assert history.revert() is loaded and history.redo() is steps[1]
+
+
+def test_cleaning_steps_share_untouched_columns():
+    df = pd.DataFrame({"name": pd.Series([" a", "b "] * 50, dtype=object), "score": np.arange(100.0)})
+    out = E.CleaningPlan(["trim"]).execute(df)
+    assert out["name"].tolist() == ["a", "b"] * 50
+    assert np.shares_memory(out["score"].to_numpy(), df["score"].to_numpy())
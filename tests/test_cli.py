@@ -0,0 +1,49 @@
+import json
+
+import pandas as pd
+import pytest
+
+import milo_engine as E
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    src = tmp_path / "in"
+    src.mkdir()
+    for name, rows in (("a", 40), ("b", 25)):
+        df = pd.DataFrame({"k": [i % 10 for i in range(rows)], "v": [float(i % 10) for i in range(rows)]})
+        df.to_csv(src / f"{name}.csv", index=False)
+    return src
+
+
+def test_batch_writes_cleaned_files_reports_and_timings(inputs, tmp_path, capsys):
+    out, perf = tmp_path / "out", tmp_path / "perf.jsonl"
+    code = E.main([str(inputs / "*.csv"), "-o", str(out), "--clean", "dedup", "--csv", "--format", "parquet",
+                   "--pdf", "--perf", str(perf), "-j", "2"])
+    assert code == 0
+    assert sorted(p.name for p in out.iterdir()) == ["a_clean.parquet", "a_report.pdf", "b_clean.parquet", "b_report.pdf"]
+    assert len(pd.read_parquet(out / "a_clean.parquet")) == 10
+    assert "duplicates=30" in capsys.readouterr().out
+    ops = [json.loads(line)["op"] for line in perf.read_text().splitlines()]
+    assert sorted(ops) == sorted(["load", "clean", "export", "pdf_report"] * 2)
+
+
+def test_streaming_dedup(inputs, tmp_path):
+    out = tmp_path / "out"
+    assert E.main([str(inputs / "a.csv"), "-o", str(out), "--streaming", "--clean", "dedup", "--csv"]) == 0
+    pd.testing.assert_frame_equal(pd.read_csv(out / "a_clean.csv"),
+                                  pd.read_csv(inputs / "a.csv").drop_duplicates(ignore_index=True))
+
+
+def test_a_failing_input_sets_the_exit_code(inputs, tmp_path, capsys):
+    code = E.main([str(inputs / "a.csv"), str(inputs / "missing.csv"), "-o", str(tmp_path / "out"), "--csv"])
+    assert code == 1
+    assert "FAIL" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("args", [["--clean", "bogus"], ["--streaming", "--clean", "dropna", "--csv"],
+                                  ["--streaming", "--csv"], ["--streaming", "--clean", "dedup", "--csv", "--format", "parquet"]])
+def test_invalid_options_are_rejected(inputs, args):
+    with pytest.raises(SystemExit) as exc:
+        E.main([str(inputs / "a.csv"), *args])
+    assert exc.value.code == 2
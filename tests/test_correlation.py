@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import milo_engine as E
+
+
+@pytest.fixture
+def numbers():
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=2_000)
+    df = pd.DataFrame({"x": x, "y": x * 0.5 + rng.normal(size=2_000), "z": rng.integers(0, 50, size=2_000)})
+    df.loc[::17, "y"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman", "kendall"])
+def test_exact_correlation_matches_pandas(numbers, method):
+    if method == "kendall":
+        pytest.importorskip("scipy")              # pandas' own Kendall needs scipy
+    result = E.correlation(numbers, method)
+    # Spearman ranks each column once, so pairs with missing values may differ slightly
+    atol = 1e-2 if method == "spearman" else 1e-9
+    pd.testing.assert_frame_equal(result.matrix, numbers.corr(method), atol=atol)
+    assert not result.sampled
+
+
+def test_sampled_preview_reports_its_bound(numbers):
+    result = E.correlation(numbers, sample_rows=500)
+    assert result.sampled and result.rows == 500 and 0 < result.bound < 1
+    low, high = result.interval()
+    assert (low.to_numpy() <= result.matrix.to_numpy() + 1e-12).all()
+
+
+def test_streamed_pearson_matches_in_memory(numbers):
+    stats = E.frame_stats(numbers, chunksize=300)
+    streamed = E.StreamingProfile(stats, 0).correlation()
+    pd.testing.assert_frame_equal(streamed.matrix, numbers.corr(), atol=1e-9)
+
+
+def test_kendall_matches_brute_force_tau_b():
+    rng = np.random.default_rng(2)
+    x = rng.integers(0, 20, 300).astype(float)
+    y = x + rng.integers(0, 10, 300)
+    r = E.correlation(pd.DataFrame({"x": x, "y": y}), "kendall").matrix.loc["x", "y"]
+    dx, dy = np.sign(x[:, None] - x[None, :]), np.sign(y[:, None] - y[None, :])
+    tau_b = (dx * dy).sum() / np.sqrt((dx != 0).sum() * (dy != 0).sum())
+    assert r == pytest.approx(tau_b)
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import milo_engine as E
+
+
+@pytest.fixture
+def dup_csv(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = 3_000
+    df = pd.DataFrame({"id": rng.integers(0, 800, size=rows), "k": rng.choice(list("ab"), size=rows),
+                       "v": rng.integers(0, 2, size=rows)})
+    path = tmp_path / "in.csv"
+    df.to_csv(path, index=False)
+    return path, pd.read_csv(path)
+
+
+@pytest.mark.parametrize("memory_budget", [E.DEDUP_MEMORY_BYTES, 1_000])
+def test_dedup_file_matches_drop_duplicates(dup_csv, tmp_path, memory_budget):
+    path, df = dup_csv
+    out = tmp_path / "out.csv"
+    result = E.dedup_file(str(path), str(out), memory_budget=memory_budget, chunksize=500)
+    expected = df.drop_duplicates(ignore_index=True)
+    assert result == {"rows": len(df), "duplicates": len(df) - len(expected),
+                      "spilled": memory_budget == 1_000}
+    pd.testing.assert_frame_equal(pd.read_csv(out), expected)
+
+
+def test_dedup_file_on_key_columns_keeps_first_rows(dup_csv, tmp_path):
+    path, df = dup_csv
+    out = tmp_path / "out.csv"
+    result = E.dedup_file(str(path), str(out), subset=["id", "k"], memory_budget=1_000, chunksize=500)
+    expected = df.drop_duplicates(subset=["id", "k"], ignore_index=True)
+    assert result["spilled"] and result["duplicates"] == len(df) - len(expected)
+    pd.testing.assert_frame_equal(pd.read_csv(out), expected)
@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+
+import milo_engine as E
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def styled_workbook(path, blank_from, blank_to, rows=10):
+    """``rows`` data rows with a gap of blank rows, then bold but empty rows up to row 40."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "S"
+    ws.append(["a", "b"])
+    r = 2
+    for i in range(rows):
+        if i == blank_from:
+            r += blank_to - blank_from
+        ws.cell(r, 1, i)
+        ws.cell(r, 2, f"s{i}")
+        r += 1
+    for row in range(r, 41):
+        ws.cell(row, 1).font = openpyxl.styles.Font(bold=True)
+    wb.save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("batch_rows", [3, 4, 100])
+def test_trailing_styled_rows_are_dropped_across_batches(tmp_path, batch_rows):
+    path = styled_workbook(tmp_path / "t.xlsx", blank_from=10, blank_to=10)
+    df = E.read_excel_fast(path, "S", batch_rows=batch_rows)
+    assert len(df) == 10
+    pd.testing.assert_frame_equal(df, pd.read_excel(path), check_dtype=False)
+
+
+def test_blank_rows_inside_the_data_are_kept(tmp_path):
+    # rows 6..14 are blank and span two 4-row batches
+    path = styled_workbook(tmp_path / "gap.xlsx", blank_from=4, blank_to=13)
+    df = E.read_excel_fast(path, "S", batch_rows=4)
+    expected = pd.read_excel(path)
+    assert len(df) == len(expected) == 19
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+
+
+def typed_workbook(path):
+    """Two sheets of numbers, text, dates, booleans and gaps, with the table at C3 on the first."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    ws["A1"] = "notes above the table"
+    header = ["id", "price", "name", "when", "ok"]
+    for j, h in enumerate(header):
+        ws.cell(3, 3 + j, h)
+    for i in range(30):
+        row = [i, None if i % 7 == 0 else i * 1.25, f"item {i}",
+               pd.Timestamp("2024-01-01") + pd.Timedelta(days=i), i % 2 == 0]
+        for j, v in enumerate(row):
+            if v is not None:
+                ws.cell(4 + i, 3 + j, v.to_pydatetime() if isinstance(v, pd.Timestamp) else v)
+    other = wb.create_sheet("More")
+    other.append(header)
+    for i in range(5):
+        other.append([100 + i, 1.0, "x", pd.Timestamp("2024-02-01").to_pydatetime(), True])
+    wb.save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("cell_range, read_kwargs", [
+    ("C3:G33", {"usecols": "C:G", "skiprows": 2}),
+    ("D3:E12", {"usecols": "D:E", "skiprows": 2, "nrows": 9}),
+    ("C3", {"usecols": "C:G", "skiprows": 2}),
+])
+def test_cell_range_matches_read_excel(tmp_path, cell_range, read_kwargs):
+    path = typed_workbook(tmp_path / "typed.xlsx")
+    df = E.read_excel_fast(path, "Data", cell_range=cell_range, batch_rows=7)
+    expected = pd.read_excel(path, sheet_name="Data", **read_kwargs)
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+    assert cell_range in df.attrs["milo_format"]
+
+
+def test_sheets_are_stacked_with_a_sheet_column(tmp_path):
+    path = typed_workbook(tmp_path / "typed.xlsx")
+    df = E.read_excel_fast(path, ["Data", "More"], cell_range="C3:G40")
+    # the range applies to every sheet: on "More" its row 3 is the header, rows 4-6 the data
+    assert df["sheet"].value_counts(sort=False).to_dict() == {"Data": 30, "More": 3}
+    df = E.read_excel_fast(path, ["More", "More"])
+    assert df["sheet"].tolist() == ["More"] * 5
+    pd.testing.assert_frame_equal(df.drop(columns="sheet"), pd.read_excel(path, sheet_name="More"),
+                                  check_dtype=False)
@@ -0,0 +1,93 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import milo_engine as E
+
+
+def sample_frame(rows=60):
+    i = np.arange(rows)
+    return pd.DataFrame({
+        "id": i,
+        "score": np.where(i % 7 == 0, np.nan, i / 4),
+        "name": pd.Series([None if k % 5 == 0 else f"n{k}" for k in i], dtype=object),
+        "flag": i % 2 == 0,
+        "when": pd.Timestamp("2024-01-01") + pd.to_timedelta(i, unit="h"),
+        "day": pd.Timestamp("2024-01-01") + pd.to_timedelta(i, unit="D"),
+        "group": pd.Categorical(np.array(["a", "b", "c"])[i % 3]),
+        # what the chunked loader used to produce: ints and strings in one object column
+        "mixed": pd.Series([k if k % 2 else f"x{k}" for k in i], dtype=object),
+    })
+
+
+def test_csv_matches_to_csv(tmp_path):
+    df = sample_frame()
+    path = tmp_path / "out.csv"
+    E.export_frame(df, str(path), chunk_rows=16)
+    assert path.read_text() == df.to_csv(index=False)
+
+
+def test_csv_with_quoted_text_reads_back_like_to_csv(tmp_path):
+    df = sample_frame()
+    df.loc[3, "name"] = 'has, comma and "quotes"'
+    path = tmp_path / "out.csv"
+    E.export_frame(df, str(path), chunk_rows=16)
+    expected = tmp_path / "expected.csv"
+    df.to_csv(expected, index=False)
+    pd.testing.assert_frame_equal(pd.read_csv(path), pd.read_csv(expected))
+
+
+@pytest.mark.parametrize("suffix", [".csv.gz", ".csv.zst"])
+def test_compressed_csv(tmp_path, suffix):
+    if suffix == ".csv.zst" and not E.HAS_PYARROW:
+        pytest.importorskip("zstandard")
+    df = sample_frame()
+    path = tmp_path / f"out{suffix}"
+    E.export_frame(df, str(path), chunk_rows=16)
+    if suffix == ".csv.gz":
+        back = pd.read_csv(path)
+    else:
+        import pyarrow as pa
+        with pa.CompressedInputStream(pa.OSFile(str(path)), "zstd") as f:
+            back = pd.read_csv(f)
+    plain = tmp_path / "plain.csv"
+    df.to_csv(plain, index=False)
+    pd.testing.assert_frame_equal(back, pd.read_csv(plain))
+
+
+@pytest.mark.skipif(not E.HAS_PYARROW, reason="needs pyarrow")
+@pytest.mark.parametrize("suffix", [".parquet", ".feather", ".arrow"])
+def test_columnar_formats_with_mixed_object_column(tmp_path, suffix):
+    df = sample_frame()
+    path = tmp_path / f"out{suffix}"
+    E.export_frame(df, str(path), chunk_rows=16)
+    back = pd.read_parquet(path) if suffix == ".parquet" else pd.read_feather(path)
+    assert len(back) == len(df)
+    assert back["mixed"].tolist() == [str(v) for v in df["mixed"]]
+    pd.testing.assert_series_equal(back["score"], df["score"])
+
+
+def test_cancel_leaves_no_file(tmp_path):
+    cancel = threading.Event()
+    cancel.set()
+    path = tmp_path / "out.csv"
+    with pytest.raises(E.ExportCancelled):
+        E.export_frame(sample_frame(), str(path), cancel=cancel, chunk_rows=16)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.skipif(not E.HAS_PYARROW, reason="needs pyarrow")
+def test_csv_chunk_that_arrow_cannot_write_fails_the_export(tmp_path, monkeypatch):
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    def refuse(*args, **kwargs):
+        raise pa.ArrowInvalid("unsupported value")
+
+    monkeypatch.setattr(pa_csv, "write_csv", refuse)
+    path = tmp_path / "out.csv"
+    with pytest.raises(pa.ArrowInvalid, match="unsupported value"):
+        E.export_frame(sample_frame(), str(path), chunk_rows=16)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import milo_engine as E
+
+
+def test_append_rows_extends_categoricals():
+    df = pd.DataFrame({"k": pd.Categorical(["a", "b"]), "v": [1, 2]})
+    out = E.append_rows(df, pd.DataFrame({"k": ["b", "c"], "v": [3, 4]}))
+    assert isinstance(out["k"].dtype, pd.CategoricalDtype)
+    assert out["k"].tolist() == ["a", "b", "b", "c"]
+    assert list(out.index) == [0, 1, 2, 3]
+    assert df["k"].cat.categories.tolist() == ["a", "b"]   # the original is untouched
+
+
+def test_append_buffer_defers_the_concat(monkeypatch):
+    monkeypatch.setattr(E, "FOLLOW_COMPACT_ROWS", 10)
+    df = pd.DataFrame({"a": np.arange(100), "k": pd.Categorical(["x"] * 100)})
+    buffer = E.AppendBuffer(df)
+    batches = [pd.DataFrame({"a": np.arange(100 + 5 * i, 105 + 5 * i), "k": ["x", "y", "x", "z", "x"]})
+               for i in range(6)]
+    for batch in batches[:4]:
+        buffer.append(batch)
+        assert buffer.df is df and not buffer.due()
+    buffer.append(batches[4])
+    assert len(buffer) == 125 and buffer.due()     # 25 buffered rows >= 0.25 * 100
+    out = buffer.compact()
+    assert buffer.pending_rows == 0 and buffer.compact() is out
+    assert out["a"].tolist() == list(range(125))
+    assert isinstance(out["k"].dtype, pd.CategoricalDtype)
+    # memory is accounted from the batches alone, close to a full rescan
+    assert buffer.nbytes == pytest.approx(E.frame_bytes(out), rel=0.1)
+
+
+def test_file_tail_reads_only_complete_new_lines(tmp_path):
+    path = tmp_path / "grow.csv"
+    path.write_text("a,b\n1,x\n2,y\n")
+    df = E.try_read_data(str(path))
+    tail = E.FileTail(str(path), df.columns, df.dtypes, os.path.getsize(path))
+    assert tail.poll() is None
+    with open(path, "a") as f:
+        f.write("3,z\n4,")
+    batch = tail.poll()
+    assert batch["a"].tolist() == [3] and batch["a"].dtype == df["a"].dtype
+    with open(path, "a") as f:
+        f.write("w\n")
+    assert tail.poll()["b"].tolist() == ["w"]
+    path.write_text("a,b\n")
+    with pytest.raises(E.FileTruncated):
+        tail.poll()
+
+
+@pytest.mark.parametrize("engine", ["streaming pyarrow", "chunked c"])
+def test_rows_appended_during_a_load_are_tailed_once(tmp_path, monkeypatch, engine):
+    monkeypatch.setattr(E, "LOAD_BLOCK_BYTES", 1024)
+    if engine == "chunked c":
+        monkeypatch.setattr(E, "_arrow_csv_supported", lambda fmt: False)
+    path = tmp_path / "grow.csv"
+    path.write_text("a,b\n" + "".join(f"{i},v{i}\n" for i in range(2_000)))
+    appended = []
+
+    def progress(done, total, rows):
+        if not appended:                        # the file grows while it is being parsed
+            with open(path, "a") as f:
+                f.write("".join(f"{i},v{i}\n" for i in range(2_000, 2_500)))
+            appended.append(True)
+
+    df = E.try_read_data(str(path), progress=progress, chunksize=300)
+    tail = E.FileTail(str(path), df.columns, df.dtypes, df.attrs["milo_bytes"])
+    out = E.append_rows(df, tail.poll())
+    assert engine in df.attrs["milo_format"]
+    assert out["a"].tolist() == list(range(2_500))
@@ -0,0 +1,51 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import milo_engine as E
+
+
+@pytest.fixture
+def drifting_csv(tmp_path):
+    """Ints for more than one chunk, then text: each chunk alone infers a different dtype."""
+    path = tmp_path / "drift.csv"
+    rows = ["a,b,c"] + [f"{i},{i % 3 == 0},1.5" for i in range(300)] + ["x1,maybe,2"]
+    path.write_text("\n".join(rows) + "\n")
+    return str(path)
+
+
+def test_chunked_read_matches_one_shot(drifting_csv, monkeypatch):
+    # small pyarrow blocks: the text after the first block fails its types -> C-engine chunks
+    monkeypatch.setattr(E, "LOAD_BLOCK_BYTES", 1024)
+    one_shot = E.try_read_data(drifting_csv)
+    chunked = E.try_read_data(drifting_csv, cancel=threading.Event(), chunksize=100)
+    pd.testing.assert_frame_equal(chunked, one_shot)
+    assert chunked["a"].map(type, na_action="ignore").eq(str).all()
+    assert "chunked c" in chunked.attrs["milo_format"]
+
+
+@pytest.mark.skipif(not E.HAS_PYARROW, reason="needs pyarrow")
+def test_background_load_streams_through_pyarrow(tmp_path):
+    path = tmp_path / "mixed.csv"
+    rows = ["id,score,name,flag,empty,when"]
+    rows += [f"{i},{i / 7:.4f},{'' if i % 5 == 0 else f'n{i}'},{i % 2 == 0},,2024-01-{i % 28 + 1:02d}" for i in range(500)]
+    path.write_text("\n".join(rows) + "\n")
+    one_shot = E.try_read_data(str(path))
+    streamed = E.try_read_data(str(path), cancel=threading.Event())
+    pd.testing.assert_frame_equal(streamed, one_shot)
+    assert "streaming pyarrow" in streamed.attrs["milo_format"]
+
+
+def test_chunked_read_reports_progress(drifting_csv):
+    seen = []
+    df = E.try_read_data(drifting_csv, progress=lambda done, total, rows: seen.append((done, total, rows)),
+                         chunksize=100)
+    assert seen[-1] == (seen[-1][1], seen[-1][1], len(df))
+
+
+def test_cancelled_load_raises(drifting_csv):
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(E.LoadCancelled):
+        E.try_read_data(drifting_csv, cancel=cancel, chunksize=100)
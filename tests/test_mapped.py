@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import milo_engine as E
+
+
+def sample_frame(rows=1_000):
+    i = np.arange(rows)
+    return pd.DataFrame({
+        "id": i,
+        "x": i / 7,
+        "name": pd.Series([None if k % 9 == 0 else f"n{k}" for k in i], dtype="str"),
+        "obj": pd.Series([f"o{k}" for k in i], dtype=object),
+        "f": np.where(i % 5 == 0, np.nan, i * 1.5),
+        "when": pd.Timestamp("2024-01-01") + pd.to_timedelta(i, unit="min"),
+    })
+
+
+@pytest.mark.skipif(not E.HAS_PYARROW, reason="needs pyarrow")
+@pytest.mark.parametrize("compression", ["uncompressed", "lz4"])
+def test_feather_opens_through_a_memory_map(tmp_path, compression):
+    df = sample_frame()
+    path = tmp_path / "data.feather"
+    df.to_feather(path, compression=compression)
+    out = E.try_read_data(str(path))
+    pd.testing.assert_frame_equal(out, df)
+    assert out.attrs["milo_format"] == "memory-mapped, zero-copy"
+    if compression == "uncompressed":
+        # null-free numbers are views of the mapped file, not copies
+        assert not out["id"].to_numpy().flags.writeable
+        assert not out["x"].to_numpy().flags.writeable
+
+
+@pytest.mark.parametrize("kind", ["2d", "1d", "structured"])
+def test_npy_opens_through_a_memory_map(tmp_path, kind):
+    path = tmp_path / "data.npy"
+    if kind == "structured":
+        arr = np.zeros(100, dtype=[("a", "i4"), ("b", "f8")])
+        arr["a"], arr["b"] = np.arange(100), np.arange(100) / 2
+        expected = pd.DataFrame({"a": arr["a"], "b": arr["b"]})
+    else:
+        arr = np.arange(300, dtype=float).reshape(100, 3) if kind == "2d" else np.arange(100)
+        table = arr.reshape(100, -1)
+        expected = pd.DataFrame(table, columns=[f"col_{i + 1}" for i in range(table.shape[1])])
+    np.save(path, arr)
+    out = E.try_read_data(str(path))
+    pd.testing.assert_frame_equal(out, expected)
+    assert not out.iloc[:, 0].to_numpy().flags.writeable
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import milo_engine as E
+
+
+def test_numeric_downcasts_are_lossless():
+    df = pd.DataFrame({"small": np.arange(100, dtype=np.int64), "half": np.arange(100) / 2,
+                       "precise": np.arange(100) / 3})
+    out = E.optimize_dtypes(df)
+    assert out["small"].dtype == np.int8
+    assert out["half"].dtype == np.float32
+    assert out["precise"].dtype == np.float64
+    pd.testing.assert_frame_equal(out.astype(np.float64), df.astype(np.float64))
+    assert "milo_memory" in out.attrs
+
+
+def test_low_cardinality_text_becomes_category():
+    s = pd.Series(np.array(["red", "green", "blue"], dtype=object)[np.arange(1000) % 3])
+    out = E.optimize_dtypes(pd.DataFrame({"c": s}))
+    assert isinstance(out["c"].dtype, pd.CategoricalDtype)
+    assert out["c"].astype(object).tolist() == s.tolist()
+
+
+def test_nearly_unique_text_is_not_categorized():
+    s = pd.Series([f"id-{i // 2}" for i in range(1000)], dtype=object)   # 50% distinct
+    out = E.optimize_dtypes(pd.DataFrame({"c": s}))
+    assert not isinstance(out["c"].dtype, pd.CategoricalDtype)
+
+
+@pytest.mark.skipif(not E.HAS_PYARROW, reason="needs pyarrow")
+def test_object_strings_become_arrow_strings_but_mixed_objects_stay():
+    text = pd.Series([f"v{i}" for i in range(100)] + [None], dtype=object)
+    mixed = pd.Series([f"v{i}" for i in range(100)] + [5], dtype=object)
+    out = E.optimize_dtypes(pd.DataFrame({"text": text, "mixed": mixed}))
+    assert out["text"].dtype == "string[pyarrow]"
+    assert out["mixed"].dtype == object
+
+
+def test_date_text_is_parsed():
+    s = pd.Series([f"2024-01-{d:02d}" for d in range(1, 29)] * 3, dtype=object)
+    out = E.optimize_dtypes(pd.DataFrame({"d": s}))
+    assert pd.api.types.is_datetime64_any_dtype(out["d"])
@@ -0,0 +1,53 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import milo_engine as E
+
+
+def test_measure_records_timings_fields_and_errors():
+    log = E.PerfLog(limit=3)
+    with log.measure("load", file="a.csv") as rec:
+        np.ones(1_000_000).sum()
+        rec["rows"] = 10
+    with pytest.raises(ValueError):
+        with log.measure("clean"):
+            raise ValueError("bad step")
+    first, second = log.snapshot()
+    assert first["op"] == "load" and first["file"] == "a.csv" and first["rows"] == 10
+    assert first["wall_s"] > 0 and first["cpu_s"] >= 0 and "error" not in first
+    assert second["error"] == "ValueError: bad step" and "wall_s" in second
+    for _ in range(3):
+        with log.measure("plot"):
+            pass
+    assert [r["op"] for r in log.snapshot()] == ["plot"] * 3      # bounded by the limit
+
+
+def test_profile_and_trace_memory_captures():
+    log = E.PerfLog()
+    log.profile = log.trace_memory = True
+    with log.measure("work"):
+        blocks = [bytearray(1_000_000) for _ in range(3)]
+        del blocks
+    rec = log.snapshot()[0]
+    assert "cumulative" in rec["profile"] and rec["py_peak_bytes"] >= 3_000_000
+
+
+def test_concurrent_measures_summary_and_export(tmp_path):
+    log = E.PerfLog()
+
+    def work(i):
+        with log.measure("even" if i % 2 == 0 else "odd", i=i):
+            pass
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(work, range(40)))
+    summary = log.summary()
+    assert summary["count"].to_dict() == {"even": 20, "odd": 20}
+    path = tmp_path / "perf.jsonl"
+    assert log.export_jsonl(str(path)) == 40
+    assert sorted(json.loads(line)["i"] for line in path.read_text().splitlines()) == list(range(40))
+    log.clear()
+    assert log.summary().empty
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import milo_engine as E
+
+
+def axes(width_in=4, dpi=100):
+    fig = Figure(figsize=(width_in, 3), dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig.add_subplot(111)
+
+
+def test_minmax_decimate_keeps_every_bucket_extreme():
+    y = np.random.default_rng(0).normal(size=10_007)
+    idx = E.minmax_decimate(y, 100)
+    assert np.all(np.diff(idx) > 0) and len(idx) <= 2 * 101
+    size = len(y) // 100
+    for b in range(100):
+        run = slice(b * size, (b + 1) * size)
+        assert b * size + y[run].argmin() in idx and b * size + y[run].argmax() in idx
+    assert len(y) - 7 + y[-7:].argmax() in idx       # the short tail counts as a bucket
+    assert y[idx].min() == y.min() and y[idx].max() == y.max()
+    np.testing.assert_array_equal(E.minmax_decimate(y[:150], 100), np.arange(150))
+
+
+def test_line_lod_decimates_and_redecimates_on_zoom(monkeypatch):
+    monkeypatch.setattr(E, "LOD_MIN_POINTS", 1_000)
+    n = 200_000
+    x = pd.Series(np.arange(n))
+    y = pd.Series(np.sin(np.arange(n) / 500.0))
+    ax = axes()
+    lod = E.LineLOD(ax, x, y)
+    shown = len(lod.line.get_xdata())
+    assert shown <= 2 * (int(ax.bbox.width) + 1)
+    ax.set_xlim(1_000, 1_400)                       # few enough rows to draw them all
+    xs = lod.line.get_xdata()
+    assert xs[0] <= 1_000 and xs[-1] >= 1_400 and len(xs) == 403
+
+
+def test_scatter_raster_bins_every_point_in_view():
+    rng = np.random.default_rng(1)
+    x, y = pd.Series(rng.normal(size=50_000)), pd.Series(rng.normal(size=50_000))
+    ax = axes()
+    raster = E.ScatterRaster(ax, x, y)
+    assert raster.image.get_array().sum() == len(x)
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    inside = ((x >= 0) & (x <= 1) & (y >= 0) & (y <= 1)).sum()
+    assert raster.image.get_array().sum() == inside
+    assert tuple(raster.image.get_extent()) == (0, 1, 0, 1)
@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import milo_engine as E
+
+
+def sample_profile(rows=20_000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "x": rng.normal(size=rows),
+        "y": rng.normal(size=rows),
+        "g": rng.choice(list("abcdef"), size=rows),
+    })
+    return E.DatasetProfile(df, 1)
+
+
+def test_concurrent_cache_fills_agree():
+    profile = sample_profile()
+    calls = [
+        lambda: profile.bins("x"),
+        lambda: profile.group_aggregate("g", "x"),
+        lambda: profile.top_values("g"),
+        lambda: profile.correlation(),
+    ]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: calls[i % len(calls)](), range(64)))
+    # every caller of a key gets the single stored object
+    for i, call in enumerate(calls):
+        stored = call()
+        for result in results[i::len(calls)]:
+            if isinstance(stored, pd.Series):
+                pd.testing.assert_series_equal(result, stored)
+            else:
+                assert result is stored
+
+
+def test_preview_correlation_reuses_exact_result():
+    profile = sample_profile()
+    exact = profile.correlation()
+    assert profile.correlation(sample_rows=1000) is exact
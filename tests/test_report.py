@@ -0,0 +1,40 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+import milo_engine as E
+
+
+def sample_profile(rows=5_000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"x": rng.normal(size=rows), "y": rng.normal(size=rows), "z": rng.normal(size=rows)})
+    return E.DatasetProfile(df, 1)
+
+
+def test_figures_render_on_scoped_threads(monkeypatch):
+    profile = sample_profile()
+    specs = E.report_figure_specs(profile)
+    threads = set()
+    render = E.render_figure_png
+
+    def record(spec):
+        threads.add(threading.current_thread())
+        return render(spec)
+
+    monkeypatch.setattr(E, "render_figure_png", record)
+    before = threading.active_count()
+    pngs = E.render_figures(specs, profile.figure_cache)
+    assert len(pngs) == len(specs) == 4
+    assert all(png.startswith(b"\x89PNG") for png in pngs)
+    assert threading.current_thread() not in threads
+    assert threading.active_count() == before          # no pool outlives the call
+    # cached figures are not rendered again
+    threads.clear()
+    assert E.render_figures(specs, profile.figure_cache) == pngs and not threads
+
+
+def test_pdf_report_is_written(tmp_path):
+    path = tmp_path / "report.pdf"
+    E.build_pdf_report(sample_profile(), str(path), "data.csv")
+    assert path.read_bytes().startswith(b"%PDF")
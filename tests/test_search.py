@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+import milo_engine as E
+
+
+def expected_rows(df, q):
+    hit = np.zeros(len(df), dtype=bool)
+    for c in df.columns:
+        hit |= df[c].astype(str).str.lower().str.contains(q.lower(), regex=False).to_numpy() & df[c].notna().to_numpy()
+    return np.flatnonzero(hit)
+
+
+def test_search_and_refine_match_a_full_scan():
+    df = pd.DataFrame({
+        "city": ["Berlin", "Bern", None, "Boston", "berlin"] * 20,
+        "n": [10, 210, 3, 41, 100] * 20,
+    })
+    index = E.SearchIndex(df)
+    for q in ["b", "ber", "berl", "10", "zzz"]:   # each extends or replaces the last query
+        np.testing.assert_array_equal(index.search(q), expected_rows(df, q))
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import milo_engine as E
+
+
+def test_text_after_numeric_chunks_demotes_the_column():
+    rng = np.random.default_rng(0)
+    first = pd.DataFrame({"x": rng.normal(size=500), "code": np.arange(500), "y": rng.normal(size=500)})
+    second = pd.DataFrame({"x": rng.normal(size=500), "code": ["n/a"] * 3 + list(range(497)),
+                           "y": rng.normal(size=500)})
+    stats = E.StreamingStats()
+    stats.update(first)
+    stats.update(second)
+    assert stats.numeric == ["x", "y"] and stats.categorical == ["code"]
+    assert stats.demoted == {"code": 500}
+    assert stats.hitters["code"].top(1).to_dict() == {"n/a": 3}
+    both = pd.concat([first, second], ignore_index=True)
+    profile = E.StreamingProfile(stats, 0)
+    assert profile.describe_all.loc["code", "count"] == 1000
+    assert profile.describe_numeric.loc["y", "mean"] == pytest.approx(both["y"].mean())
+    assert profile.describe_numeric.loc["y", "std"] == pytest.approx(both["y"].std())
+    np.testing.assert_allclose(stats.corr().to_numpy(), both[["x", "y"]].corr().to_numpy(), atol=1e-12)
+
+
+def test_numbers_as_strings_stay_numeric():
+    stats = E.StreamingStats()
+    stats.update(pd.DataFrame({"x": [1.0, 2.0]}))
+    stats.update(pd.DataFrame({"x": ["3", None]}, dtype=object))
+    assert stats.numeric == ["x"] and not stats.demoted
+    assert stats.mean[0] == pytest.approx(2.0)
+
+
+def rank_error(values, q, estimate):
+    return abs(np.searchsorted(np.sort(values), estimate) / len(values) - q)
+
+
+def test_quantile_sketch_rank_error():
+    values = np.random.default_rng(1).lognormal(size=200_000)
+    sketch, left, right = E.QuantileSketch(), E.QuantileSketch(seed=1), E.QuantileSketch(seed=2)
+    for chunk in np.array_split(values, 50):
+        sketch.update(chunk)
+    left.update(values[:120_000])
+    right.update(values[120_000:])
+    left.merge(right)
+    qs = [0.01, 0.25, 0.5, 0.75, 0.99]
+    for s in (sketch, left):
+        assert s.count == len(values)
+        assert sum(len(level) for level in s.levels) < 10_000
+        for q, estimate in zip(qs, s.quantiles(qs)):
+            assert rank_error(values, q, estimate) < 0.01
+    edges = np.quantile(values, [0.1, 0.5, 0.9])
+    np.testing.assert_allclose(sketch.cdf(edges) / len(values), [0.1, 0.5, 0.9], atol=0.01)
+
+
+def test_heavy_hitters_keep_frequent_values():
+    rng = np.random.default_rng(2)
+    values = np.concatenate([np.repeat(["a", "b", "c"], [5_000, 3_000, 2_000]),
+                             rng.integers(0, 10**6, size=20_000).astype(str)])
+    rng.shuffle(values)
+    hitters = E.HeavyHitters(capacity=100)
+    for chunk in np.array_split(values, 30):
+        hitters.update(chunk)
+    top = hitters.top(3)
+    assert top.index.tolist() == ["a", "b", "c"]
+    exact = pd.Series(values).value_counts()
+    assert all(exact[v] - len(values) / 101 <= top[v] <= exact[v] for v in top.index)
+
+
+def test_profile_file_matches_the_in_memory_profile(tmp_path):
+    rng = np.random.default_rng(3)
+    rows = 50_000
+    df = pd.DataFrame({"x": rng.normal(size=rows), "y": rng.exponential(size=rows),
+                       "g": rng.choice(list("abcd"), size=rows, p=[0.4, 0.3, 0.2, 0.1])})
+    df.loc[::17, "y"] = np.nan
+    path = tmp_path / "big.csv"
+    df.to_csv(path, index=False)
+    streamed = E.profile_file(str(path), chunksize=4_000)
+    exact = E.DatasetProfile(pd.read_csv(path), 0)
+    assert (streamed.rows, streamed.cols, streamed.missing_pct) == (exact.rows, exact.cols, exact.missing_pct)
+    s, e = streamed.describe_numeric, exact.describe_numeric
+    for stat in ("count", "mean", "std", "min", "max"):
+        np.testing.assert_allclose(s[stat], e[stat], rtol=1e-9)
+    values = df["y"].dropna().to_numpy()
+    for q, stat in ((0.25, "25%"), (0.5, "50%"), (0.75, "75%")):
+        assert rank_error(values, q, s.loc["y", stat]) < 0.01
+    np.testing.assert_allclose(streamed.corr.to_numpy(), exact.corr.to_numpy(), atol=1e-9)
+    assert streamed.describe_all.loc["g", "top"] == "a"
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+tk = pytest.importorskip("tkinter")
+pytest.importorskip("customtkinter")
+
+
+@pytest.fixture
+def table():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("needs a display")
+    import DataInsight
+
+    widget = DataInsight.VirtualTable(root, formatter=lambda v: f"<{v}>")
+    widget.pack(fill="both", expand=True)
+    widget.tree.winfo_height = lambda: 26 + 10 * 20       # ten lines at the default row height
+    widget._resize_pool()
+    yield widget
+    root.destroy()
+
+
+def shown(table):
+    return [table.tree.item(iid, "values") for iid in table._items]
+
+
+def test_item_pool_does_not_grow_with_the_frame(table):
+    df = pd.DataFrame({"a": np.arange(1_000_000), "b": np.arange(1_000_000) % 7})
+    table.set_data(df)
+    n = len(table._items)
+    assert n >= 1 and len(table.tree.get_children()) == n
+    assert shown(table)[0] == ("<0>", "<0>")
+    table.scroll(500_000)
+    assert table.top == 500_000 and shown(table)[0] == ("<500000>", f"<{500_000 % 7}>")
+    table.scroll(10**9)                                       # clamped to the last page
+    assert table.top == len(df) - n and shown(table)[-1][0] == "<999999>"
+    assert table.info.cget("text") == f"Rows {len(df) - n + 1:,}–{len(df):,} of {len(df):,}"
+
+
+def test_positions_and_limit_restrict_the_rows(table):
+    df = pd.DataFrame({"a": np.arange(100)})
+    table.set_data(df, positions=np.array([5, 50, 95]))
+    assert table.total_rows() == 3
+    assert [values for values in shown(table) if values][:3] == [("<5>",), ("<50>",), ("<95>",)]
+    table.set_data(df, limit=2)
+    assert table.total_rows() == 2 and sum(1 for values in shown(table) if values) == min(2, len(table._items))
@@ -0,0 +1,72 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import milo_engine as E
+
+pytestmark = pytest.mark.skipif(not E.HAS_PYARROW, reason="spilling needs pyarrow")
+
+
+def frame(seed, rows=10_000):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"x": rng.normal(size=rows), "k": rng.integers(0, 9, size=rows)})
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    ws = E.Workspace(memory_budget=E.frame_bytes(frame(0)) * 2, directory=str(tmp_path))
+    yield ws
+    ws.close()
+
+
+def test_spill_runs_off_the_calling_thread(workspace, monkeypatch):
+    writers = []
+    to_feather = pd.DataFrame.to_feather
+
+    def record(df, *args, **kwargs):
+        writers.append(threading.current_thread())
+        return to_feather(df, *args, **kwargs)
+
+    monkeypatch.setattr(pd.DataFrame, "to_feather", record)
+    frames = {name: frame(i) for i, name in enumerate("abc")}
+    for name, df in frames.items():
+        workspace.add(name, df)
+    workspace.wait()
+    assert writers and threading.current_thread() not in writers
+    assert [(name, spilled) for name, _, _, spilled in workspace.status()] == [
+        ("a", True), ("b", False), ("c", False)]
+    assert workspace.resident_bytes() <= workspace.memory_budget
+    pd.testing.assert_frame_equal(workspace.get("a"), frames["a"])
+
+
+def test_touching_a_queued_frame_keeps_it(workspace, monkeypatch):
+    release = threading.Event()
+    to_feather = pd.DataFrame.to_feather
+
+    def slow(df, *args, **kwargs):
+        release.wait(5)
+        return to_feather(df, *args, **kwargs)
+
+    monkeypatch.setattr(pd.DataFrame, "to_feather", slow)
+    a = frame(0)
+    workspace.add("a", a)
+    workspace.add("b", frame(1))
+    workspace.add("c", frame(2))
+    assert workspace.get("a") is a       # still in memory while its spill is queued
+    release.set()
+    workspace.wait()
+    assert workspace.get("a") is a
+    assert workspace.status()[-1][3]     # the finished spill is kept for a free re-eviction
+
+
+def test_replaced_frame_discards_its_spill(workspace, tmp_path):
+    workspace.add("a", frame(0))
+    workspace.add("b", frame(1))
+    workspace.put("a", frame(3))
+    workspace.add("c", frame(2))
+    workspace.remove("b")
+    workspace.wait()
+    spilled = {name for name, _, _, s in workspace.status() if s}
+    assert len(list(tmp_path.glob("*.feather"))) == len(spilled)